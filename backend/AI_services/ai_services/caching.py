@@ -0,0 +1,360 @@
+"""
+This module defines the result cache used by processing pipelines.
+
+Components:
+    - ``StepCache``: Two-tier (memory, disk) cache of pipeline step outputs.
+    - ``step_fingerprint``: Stable description of a step configuration.
+"""
+
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import re
+import tempfile
+import threading
+
+from collections import OrderedDict, defaultdict
+from types import CodeType
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+__all__ = (
+    "StepCache",
+    "step_fingerprint",
+)
+
+_SIMPLE_TYPES = (str, bytes, int, float, complex, bool, type(None))
+_MAX_DEPTH = 16
+
+
+def _describe_code(code: CodeType) -> str:
+    # nested code objects (inner functions, comprehensions) are described by content, not by address
+    consts = [_describe_code(const) if isinstance(const, CodeType) else repr(const) for const in code.co_consts]
+    payload = code.co_code + repr((consts, code.co_names)).encode()
+    return hashlib.sha1(payload).hexdigest()
+
+
+def _describe(value: Any, depth: int) -> str:
+    if depth > _MAX_DEPTH:
+        raise TypeError("Step configuration is too deeply nested to be fingerprinted")
+    depth += 1
+
+    custom = getattr(value, "cache_key", None)
+    if custom is not None and not isinstance(value, type):
+        return str(custom() if callable(custom) else custom)
+
+    if isinstance(value, _SIMPLE_TYPES):
+        return repr(value)
+    if isinstance(value, (list, tuple)):
+        items = ", ".join(_describe(item, depth) for item in value)
+        return f"{type(value).__name__}[{items}]"
+    if isinstance(value, (set, frozenset)):
+        items = ", ".join(sorted(_describe(item, depth) for item in value))
+        return f"{type(value).__name__}{{{items}}}"
+    if isinstance(value, dict):
+        items = ", ".join(sorted(f"{_describe(k, depth)}: {_describe(v, depth)}" for k, v in value.items()))
+        return f"{type(value).__name__}{{{items}}}"
+    if isinstance(value, re.Pattern):
+        return f"re.compile({value.pattern!r}, {value.flags})"
+    if isinstance(value, type):
+        return f"{value.__module__}.{value.__qualname__}"
+    if isinstance(value, functools.partial):
+        return (
+            f"partial({_describe(value.func, depth)}, "
+            f"{_describe(value.args, depth)}, {_describe(value.keywords, depth)})"
+        )
+
+    if inspect.ismethod(value) or (inspect.isbuiltin(value) and not inspect.ismodule(getattr(value, "__self__", None))):
+        owner = getattr(value, "__self__", None)
+        if owner is None:
+            return f"{value.__module__}.{value.__qualname__}"
+        return f"{value.__qualname__}|{_describe(owner, depth)}"
+    if inspect.isbuiltin(value):
+        return f"{value.__module__}.{value.__qualname__}"
+
+    if inspect.isfunction(value):
+        closure = [cell.cell_contents for cell in value.__closure__ or ()]
+        return (
+            f"{value.__module__}.{value.__qualname__}:{_describe_code(value.__code__)}"
+            f"|{_describe(value.__defaults__, depth)}|{_describe(value.__kwdefaults__, depth)}"
+            f"|{_describe(closure, depth)}"
+        )
+
+    cls = type(value)
+    representation = repr(value)
+    if hasattr(value, "__dict__") or " at 0x" in representation:
+        # attributes mix configuration with runtime state, only the step knows which is which
+        raise TypeError(f"Can not fingerprint {cls.__qualname__} objects, define a cache_key")
+    return representation
+
+
+def step_fingerprint(func: Callable) -> str:
+    """
+    Describe the configuration of a step in a way that is stable across processes.
+    A step can define its own description with a ``cache_key`` attribute or method.
+    Otherwise, functions are described by their qualified name, bytecode, defaults and
+    closure, partials by their function and arguments, and containers by their items,
+    recursively. Other objects are not described by their attributes, since these mix
+    configuration with runtime state: they must define a ``cache_key``.
+
+    Args:
+        func (Callable): The step to describe.
+    Returns:
+        str: The description of the step.
+    Raises:
+        TypeError: If part of the configuration can not be described. Such steps
+            must define a ``cache_key`` to be cached.
+    """
+    return _describe(func, 0)
+
+
+class StepCache(object):
+    """
+    A cache of pipeline step outputs.
+    Entries are keyed by a hash of the step name, the step configuration and
+    the step input. Values are stored pickled, so callers never share mutable
+    outputs, in a bounded in-memory LRU tier and, optionally, in a directory
+    on disk. Inputs or outputs that can not be pickled are never cached.
+    """
+
+    def __init__(self, max_size: int = 1024, directory: str = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size (int): Maximum number of entries kept in memory.
+            directory (str): Directory of the on-disk tier. The disk tier is disabled if None.
+
+        Raises:
+            ValueError: If ``max_size`` is negative.
+        """
+        if max_size < 0:
+            raise ValueError("Cache size must be a non-negative number.")
+        self.max_size: int = max_size
+        self.directory: Optional[str] = directory
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        # steps may run in executor threads, e.g. under ``AsyncPipelineRunner``
+        self._lock: threading.Lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(name: str, func: Callable, data: Any, fingerprint: str = None) -> Optional[str]:
+        """
+        Compute the cache key of a step input.
+
+        Args:
+            name (str): The name of the step.
+            func (Callable): The step.
+            data (Any): The input of the step.
+            fingerprint (str): The ``step_fingerprint`` of the step, computed if None.
+                Callers keying many inputs of the same step compute it once.
+        Returns:
+            Optional[str]: The key, or None if the input can not be pickled
+            or the step can not be fingerprinted.
+        """
+        try:
+            if fingerprint is None:
+                fingerprint = step_fingerprint(func)
+            payload = pickle.dumps((name, fingerprint, data), protocol=5)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, name: str, key: str) -> Tuple[bool, Any]:
+        """
+        Look a step output up.
+
+        Args:
+            name (str): The name of the step, used for hit/miss accounting.
+            key (str): The key returned by ``make_key``.
+        Returns:
+            Tuple[bool, Any]: Whether the key was found, and the cached output.
+        """
+        with self._lock:
+            payload = self._memory.get(key)
+            if payload is not None:
+                self._memory.move_to_end(key)
+        if payload is None and self.directory is not None:
+            payload = self._read(key)
+            if payload is not None:
+                self._remember(key, payload)
+
+        with self._lock:
+            if payload is None:
+                self.misses[name] += 1
+                return False, None
+            self.hits[name] += 1
+        return True, pickle.loads(payload)
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a step output. Outputs that can not be pickled are ignored.
+
+        Args:
+            key (str): The key returned by ``make_key``.
+            value (Any): The output of the step.
+        """
+        try:
+            payload = pickle.dumps(value, protocol=5)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        self._remember(key, payload)
+        if self.directory is not None:
+            self._write(key, payload)
+
+    def call(self, name: str, func: Callable[[Any], Any], data: Any) -> Any:
+        """
+        Run a step through the cache.
+
+        Args:
+            name (str): The name of the step.
+            func (Callable): The step.
+            data (Any): The input of the step.
+        Returns:
+            Any: The cached or freshly computed output.
+        """
+        key = self.make_key(name, func, data)
+        if key is None:
+            with self._lock:
+                self.misses[name] += 1
+            return func(data)
+        found, value = self.get(name, key)
+        if found:
+            return value
+        value = func(data)
+        self.set(key, value)
+        return value
+
+    async def call_async(self, name: str, func: Callable[[Any], Awaitable[Any]], data: Any) -> Any:
+        """
+        Run a coroutine step through the cache.
+
+        Args:
+            name (str): The name of the step.
+            func (Callable): The coroutine step.
+            data (Any): The input of the step.
+        Returns:
+            Any: The cached or freshly computed output.
+        """
+        key = self.make_key(name, func, data)
+        if key is None:
+            with self._lock:
+                self.misses[name] += 1
+            return await func(data)
+        found, value = self.get(name, key)
+        if found:
+            return value
+        value = await func(data)
+        self.set(key, value)
+        return value
+
+    def call_batch(
+        self,
+        name: str,
+        func: Callable[[Any], Any],
+        batch_func: Callable[[List[Any]], List[Any]],
+        items: List[Any]
+    ) -> List[Any]:
+        """
+        Run a batch step through the cache. Only the items missing from
+        the cache are passed to ``batch_func``.
+
+        Args:
+            name (str): The name of the step.
+            func (Callable): The step, used for the cache keys.
+            batch_func (Callable): The batch implementation of the step.
+            items (List[Any]): The inputs of the step.
+        Returns:
+            List[Any]: The outputs of the step, in the input order.
+        """
+        outputs: List[Any] = [None] * len(items)
+        missing: List[Tuple[int, Optional[str]]] = []
+        try:
+            fingerprint: Optional[str] = step_fingerprint(func)
+        except (TypeError, AttributeError):
+            fingerprint = None
+        for i, item in enumerate(items):
+            key = None if fingerprint is None else self.make_key(name, func, item, fingerprint)
+            found, value = (False, None) if key is None else self.get(name, key)
+            if key is None:
+                with self._lock:
+                    self.misses[name] += 1
+            if found:
+                outputs[i] = value
+            else:
+                missing.append((i, key))
+
+        if missing:
+            computed = batch_func([items[i] for i, _ in missing])
+            if len(computed) != len(missing):
+                raise ValueError(
+                    f"Step '{name}' returned {len(computed)} outputs for {len(missing)} inputs"
+                )
+            for (i, key), value in zip(missing, computed):
+                outputs[i] = value
+                if key is not None:
+                    self.set(key, value)
+        return outputs
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the hit/miss statistics of every step.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Hits, misses and hit ratio per step.
+        """
+        return {
+            name: {
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+                "hit_ratio": self.hits[name] / ((self.hits[name] + self.misses[name]) or 1),
+            }
+            for name in sorted(set(self.hits) | set(self.misses))
+        }
+
+    def clear(self) -> None:
+        """
+        Drop the in-memory tier and reset the statistics. The disk tier is kept.
+        """
+        with self._lock:
+            self._memory.clear()
+            self.hits.clear()
+            self.misses.clear()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def __repr__(self):
+        return f"StepCache(l={len(self._memory)}, max_size={self.max_size}, directory={self.directory!r})"
+
+    def _remember(self, key: str, payload: bytes) -> None:
+        if self.max_size == 0:
+            return
+        with self._lock:
+            self._memory[key] = payload
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.pkl")
+
+    def _read(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, payload: bytes) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temporary file first, so concurrent readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+        os.replace(tmp_path, path)
@@ -0,0 +1,353 @@
+"""
+This module defines execution engines running a ``Pipeline`` outside of the calling thread.
+
+Components:
+    - ``ProcessPoolPipelineExecutor``: Shards inputs across a pool of worker processes.
+    - ``AsyncPipelineRunner``: Runs every step as an asyncio stage with its own workers.
+"""
+
+import asyncio
+import dataclasses
+import functools
+import inspect
+import itertools
+import multiprocessing
+import signal
+
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+from .instrumentation import StepMetrics, measure_step, measure_step_async
+from .preprocessing import Pipeline
+from .threads import ThreadBudget, set_thread_budget, split_thread_budget
+
+__all__ = (
+    "PipelineFactoryType",
+    "ProcessPoolPipelineExecutor",
+    "AsyncPipelineRunner",
+)
+
+PipelineFactoryType = Callable[[], Pipeline]
+
+# pipeline built once per worker process by ``_init_worker``
+_worker_pipeline: Optional[Pipeline] = None
+
+
+def _init_worker(pipeline_factory: PipelineFactoryType, thread_budget: Optional[ThreadBudget]) -> None:
+    global _worker_pipeline
+    # interrupts are handled by the parent, which shuts the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if thread_budget is not None:
+        set_thread_budget(thread_budget)
+    _worker_pipeline = pipeline_factory()
+
+
+def _run_batch(items: List[Any]) -> List[Any]:
+    return _worker_pipeline.batch(items)
+
+
+class ProcessPoolPipelineExecutor(object):
+    """
+    An execution engine sharding pipeline inputs across worker processes.
+    Every worker builds its own pipeline once, when it starts, with the given
+    factory, so models are loaded once per process and never pickled.
+    Inputs are dispatched in chunks and results are yielded in the input order.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: PipelineFactoryType,
+        n_workers: int = None,
+        *,
+        chunk_size: int = 32,
+        max_pending_chunks: int = None,
+        mp_context: str = "spawn",
+        thread_budget: Optional[ThreadBudget] = None,
+    ):
+        """
+        Initialize the executor and start its worker processes.
+
+        Args:
+            pipeline_factory (Callable[[], Pipeline]): A picklable callable, e.g. a module level
+                function, building the pipeline inside each worker.
+            n_workers (int): Number of worker processes. Defaults to the number of CPUs.
+            chunk_size (int): Number of inputs sent to a worker at once.
+            max_pending_chunks (int): Maximum number of chunks dispatched but not yet consumed.
+                Defaults to twice the number of workers.
+            mp_context (str): The multiprocessing start method. "spawn" is safe with CUDA.
+            thread_budget (ThreadBudget): Threads given to torch, FAISS and BLAS in each worker.
+                Defaults to an equal share of the cores, so workers do not oversubscribe them.
+
+        Raises:
+            ValueError: If ``chunk_size`` or ``n_workers`` is lower than 1.
+        """
+        if n_workers is None:
+            n_workers = multiprocessing.cpu_count()
+        if n_workers < 1:
+            raise ValueError("Number of workers must be at least 1.")
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be at least 1.")
+        self.n_workers: int = n_workers
+        self.chunk_size: int = chunk_size
+        self.max_pending_chunks: int = max_pending_chunks or 2 * n_workers
+        self.thread_budget: ThreadBudget = thread_budget or split_thread_budget(n_workers)
+        self._executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=multiprocessing.get_context(mp_context),
+            initializer=_init_worker,
+            initargs=(pipeline_factory, self.thread_budget),
+        )
+
+    def map(self, iterable: Iterable[Any]) -> Iterator[Any]:
+        """
+        Lazily execute the pipeline on every item of an iterable.
+        At most ``max_pending_chunks`` chunks are in flight, so the iterable
+        is never read far ahead of the consumer.
+
+        Args:
+            iterable (Iterable[Any]): The inputs to be processed.
+        Returns:
+            Iterator[Any]: The processed items, in the input order.
+        Raises:
+            RuntimeError: If the executor has been shut down.
+        """
+        if self._executor is None:
+            raise RuntimeError("Executor has been shut down")
+        pending: Deque[Future] = deque()
+        try:
+            for chunk in itertools.batched(iterable, self.chunk_size):
+                pending.append(self._executor.submit(_run_batch, list(chunk)))
+                if len(pending) >= self.max_pending_chunks:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # the consumer stopped early or a chunk failed
+            for future in pending:
+                future.cancel()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker processes.
+        Chunks that have not started yet are cancelled.
+
+        Args:
+            wait (bool): Whether to wait for running chunks to finish.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "ProcessPoolPipelineExecutor":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown(wait=exc_type is None)
+
+    def __repr__(self):
+        return f"ProcessPoolPipelineExecutor(n_workers={self.n_workers}, chunk_size={self.chunk_size})"
+
+
+class AsyncPipelineRunner(object):
+    """
+    An asyncio runner turning every step of a pipeline into a stage.
+    Stages are connected by bounded queues and each one has its own number of
+    workers, so different inputs can be in different steps at the same time.
+    Blocking steps run in an executor, coroutine steps are awaited directly.
+    Both are measured for the sinks of the pipeline, awaiting included.
+    When a queue is full, submitting waits, which gives backpressure under load.
+    """
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        *,
+        workers: Dict[str, int] = None,
+        queue_size: int = 16,
+        executor: Executor = None,
+    ):
+        """
+        Initialize the runner. Stages are started by ``start`` or ``async with``.
+
+        Args:
+            pipeline (Pipeline): The pipeline to run.
+            workers (Dict[str, int]): Number of workers per step name. Steps not listed get one.
+            queue_size (int): Capacity of the queue in front of every stage.
+            executor (Executor): Executor of the blocking steps. Defaults to the loop's default executor.
+
+        Raises:
+            ValueError: If ``workers`` names an unknown step or a count lower than 1.
+        """
+        workers = dict(workers or {})
+        unknown_steps = set(workers) - {name for name, _ in pipeline}
+        if unknown_steps:
+            raise ValueError(f"Pipeline does not contain steps {sorted(unknown_steps)}")
+        if any(count < 1 for count in workers.values()):
+            raise ValueError("Number of workers must be at least 1.")
+        self.pipeline: Pipeline = pipeline
+        self.workers: Dict[str, int] = workers
+        self.queue_size: int = queue_size
+        self.executor: Optional[Executor] = executor
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._started: bool = False
+
+    async def start(self) -> None:
+        """
+        Start the workers of every stage.
+
+        Raises:
+            RuntimeError: If the runner is already started.
+        """
+        if self._started:
+            raise RuntimeError("Runner is already started")
+        self._started = True
+        steps = list(self.pipeline)
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in steps]
+        for index, (name, func) in enumerate(steps):
+            for _ in range(self.workers.get(name, 1)):
+                self._tasks.append(asyncio.create_task(self._stage_worker(index, name, func)))
+
+    async def submit(self, data: Any) -> Any:
+        """
+        Run one input through the pipeline.
+
+        Args:
+            data (Any): The input to be processed.
+        Returns:
+            Any: The processed input.
+        Raises:
+            RuntimeError: If the runner is not started.
+        """
+        if not self._started:
+            raise RuntimeError("Runner is not started")
+        if not self._queues:
+            return data
+        future = asyncio.get_running_loop().create_future()
+        await self._queues[0].put((future, data))
+        return await future
+
+    async def map(self, iterable: Iterable[Any]) -> AsyncIterator[Any]:
+        """
+        Run every item of an iterable through the pipeline.
+        At most ``queue_size`` items are in flight and results are yielded in the input order.
+
+        Args:
+            iterable (Iterable[Any]): The inputs to be processed.
+        Returns:
+            AsyncIterator[Any]: The processed items.
+        """
+        pending: Deque[asyncio.Task] = deque()
+        try:
+            for item in iterable:
+                pending.append(asyncio.ensure_future(self.submit(item)))
+                if len(pending) >= self.queue_size:
+                    yield await pending.popleft()
+            while pending:
+                yield await pending.popleft()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def close(self) -> None:
+        """
+        Wait for the queued inputs to be processed, then stop the workers.
+        """
+        for queue in self._queues:
+            await queue.join()
+        await self._cancel()
+
+    async def _cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks, self._queues = [], []
+        self._started = False
+
+    async def __aenter__(self) -> "AsyncPipelineRunner":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        if exc_type is None:
+            await self.close()
+        else:
+            await self._cancel()
+
+    def __repr__(self):
+        return f"AsyncPipelineRunner(l={len(self.pipeline)}, queue_size={self.queue_size})"
+
+    async def _stage_worker(self, index: int, name: str, func: Callable[[Any], Any]) -> None:
+        queue = self._queues[index]
+        next_queue = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        # checked on the step itself, a cache wrapper would hide that it is a coroutine function
+        is_coroutine = inspect.iscoroutinefunction(func) \
+            or inspect.iscoroutinefunction(getattr(func, "__call__", None))
+        cache = self.pipeline.cache if self.pipeline.is_cached(name) else None
+        if is_coroutine:
+            step = func if cache is None else functools.partial(cache.call_async, name, func)
+        else:
+            step = func if cache is None else functools.partial(cache.call, name, func)
+        while True:
+            future, data = await queue.get()
+            try:
+                if future.done():
+                    # the caller gave up on this input
+                    continue
+                try:
+                    if is_coroutine:
+                        output = await self._run_async(name, step, data)
+                    else:
+                        output = await self._run_blocking(name, step, data)
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if next_queue is None:
+                    if not future.done():
+                        future.set_result(output)
+                else:
+                    await next_queue.put((future, output))
+            finally:
+                queue.task_done()
+
+    async def _run_async(self, name: str, step: Callable[[Any], Any], data: Any) -> Any:
+        if not self.pipeline.sinks:
+            return await step(data)
+
+        output, metrics = await measure_step_async(name, step, data, trace_memory=self.pipeline.trace_memory)
+        self._report(metrics)
+        return output
+
+    async def _run_blocking(self, name: str, step: Callable[[Any], Any], data: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        if not self.pipeline.sinks:
+            output = await loop.run_in_executor(self.executor, step, data)
+            while inspect.isawaitable(output):
+                # e.g. a plain callable returning a coroutine
+                output = await output
+            return output
+
+        output, metrics = await loop.run_in_executor(
+            self.executor,
+            functools.partial(measure_step, name, step, data, trace_memory=self.pipeline.trace_memory)
+        )
+        if inspect.isawaitable(output):
+            # the awaiting is part of the step, it is added to the call
+            output, awaited = await measure_step_async(
+                name, lambda _: output, data, trace_memory=self.pipeline.trace_memory
+            )
+            metrics = dataclasses.replace(
+                metrics,
+                wall_time=metrics.wall_time + awaited.wall_time,
+                cpu_time=metrics.cpu_time + awaited.cpu_time,
+                output_size=awaited.output_size,
+                memory_peak=None if metrics.memory_peak is None else max(metrics.memory_peak, awaited.memory_peak),
+            )
+        self._report(metrics)
+        return output
+
+    def _report(self, metrics: StepMetrics) -> None:
+        for sink in self.pipeline.sinks:
+            sink(metrics)
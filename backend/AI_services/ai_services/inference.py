@@ -0,0 +1,688 @@
+"""
+This module defines a standalone inference server owning the models and the vector storage,
+and the thin clients used by processes that do not load them.
+
+The server speaks the protocol of ``ipc`` over a Unix socket or local TCP. A request
+is ``{"id": int, "op": str, "kwargs": dict}`` and a response is ``{"id": int, "result": Any}``
+or ``{"id": int, "error": {"type": str, "message": str}}``. ``embed`` and ``nli``
+requests from all clients are merged into shared model batches.
+
+Components:
+    - ``InferenceServer``: Serve ``embed``, ``search``, ``nli``, ``coref`` and ``explain``.
+    - ``InferenceClient``: Blocking client of the server.
+    - ``InferenceError``: Error raised by the server while handling a request.
+    - ``RemoteVectorStorage``: ``VectorStorageInterface`` backed by the server.
+    - ``RemoteLLM``: ``LLMInterface`` backed by the server.
+    - ``RemoteCorefResolver``: Processing pipeline step backed by the server.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import itertools
+import logging
+import os
+import stat
+import threading
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Self, Sequence, Tuple
+
+import numpy as np
+
+from .instrumentation import WarmupTiming
+from .interfaces import LLMInterface, VectorStorageInterface
+from .ipc import AddressType, open_socket, read_frame, recv_frame, send_frame, write_frame
+from .sentence import SentenceProposal
+from .typing import DeviceType, DocumentMetadataType
+
+__all__ = (
+    "InferenceServer",
+    "InferenceClient",
+    "InferenceError",
+    "RemoteVectorStorage",
+    "RemoteLLM",
+    "RemoteCorefResolver",
+)
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceError(RuntimeError):
+    """
+    An error raised by the inference server while handling a request.
+
+    Attributes:
+        error_type (str): The name of the exception raised on the server.
+    """
+
+    def __init__(self, error_type: str, message: str):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type: str = error_type
+
+
+class _MicroBatcher(object):
+    """
+    Merge the items of concurrent requests into one call of a batch function.
+    A batch is run when it reaches ``max_batch_size`` items or ``max_delay``
+    seconds after its first request, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        func: Callable[[List[Any]], Sequence[Any]],
+        run_blocking: Callable[..., Awaitable[Any]],
+        *,
+        max_batch_size: int,
+        max_delay: float,
+    ):
+        self.func = func
+        self.run_blocking = run_blocking
+        self.max_batch_size: int = max_batch_size
+        self.max_delay: float = max_delay
+        self._pending: List[Tuple[List[Any], asyncio.Future]] = []
+        self._size: int = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    async def submit(self, items: List[Any]) -> Sequence[Any]:
+        if not items:
+            return []
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((items, future))
+        self._size += len(items)
+        if self._size >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._size = self._pending, [], 0
+        if pending:
+            asyncio.get_running_loop().create_task(self._run(pending))
+
+    async def _run(self, pending: List[Tuple[List[Any], asyncio.Future]]) -> None:
+        try:
+            outputs = await self.run_blocking(self.func, [item for items, _ in pending for item in items])
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for items, future in pending:
+            if not future.done():
+                future.set_result(outputs[start:start + len(items)])
+            start += len(items)
+
+
+class InferenceServer(object):
+    """
+    A server process owning the models and the vector storage.
+    Models run in a small thread pool, so the event loop keeps accepting
+    requests, and the ``embed`` and ``nli`` requests of all clients are
+    merged into shared model batches. Operations whose model is not given
+    are answered with an error.
+
+    Examples:
+        server = InferenceServer(vector_storage=storage, nli_model=FactCheckingModel(device="cuda"))
+        server.serve_forever("/run/ai_services/inference.sock")
+    """
+
+    def __init__(
+        self,
+        *,
+        vector_storage: Any = None,
+        embedder: Callable[..., Any] = None,
+        nli_model: Any = None,
+        coref: Any = None,
+        llm: LLMInterface = None,
+        max_batch_size: int = 64,
+        max_delay: float = 0.005,
+        n_threads: int = 1,
+        storage_directory: str = None,
+    ):
+        """
+        Initialize the server.
+
+        Args:
+            vector_storage (VectorStorage): The storage answering ``search`` and the storage operations.
+            embedder (Callable): The embedder answering ``embed``. Defaults to the embedder of the storage.
+            nli_model (FactCheckingModel): The model answering ``nli``.
+            coref (CorefResolver): The resolver answering ``coref``.
+            llm (LLMInterface): The language model answering ``explain``.
+            max_batch_size (int): Maximum number of items merged into one ``embed`` or ``nli`` batch.
+            max_delay (float): Maximum time, in seconds, a request waits for a batch to fill up.
+            n_threads (int): Number of threads running the models. Models are not assumed thread-safe.
+            storage_directory (str): Directory ``save`` and ``load`` are confined to. Paths sent by
+                clients are resolved relative to it. Both operations are refused if None, since
+                loading unpickles the metadata file.
+        """
+        self.vector_storage = vector_storage
+        self.embedder = embedder or getattr(vector_storage, "embedder", None)
+        self.nli_model = nli_model
+        self.coref = coref
+        self.llm = llm
+        self.max_batch_size: int = max_batch_size
+        self.max_delay: float = max_delay
+        self.storage_directory: Optional[str] = storage_directory
+        # requests other than ``ping`` are refused while the models warm up
+        self.ready: bool = True
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=n_threads, thread_name_prefix="inference"
+        )
+        self._embed_batcher = _MicroBatcher(
+            self._embed, self._run_blocking, max_batch_size=max_batch_size, max_delay=max_delay
+        )
+        self._nli_batcher = _MicroBatcher(
+            self._nli, self._run_blocking, max_batch_size=max_batch_size, max_delay=max_delay
+        )
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.operations: Dict[str, Callable[..., Awaitable[Any]]] = {
+            "ping": self._op_ping,
+            "embed": self._op_embed,
+            "search": self._op_search,
+            "nli": self._op_nli,
+            "coref": self._op_coref,
+            "explain": self._op_explain,
+            "add_documents": self._op_add_documents,
+            "delete_documents": self._op_delete_documents,
+            "save": self._op_save,
+            "load": self._op_load,
+        }
+
+    async def start(self, address: AddressType) -> None:
+        """
+        Start listening.
+
+        Args:
+            address (AddressType): A Unix socket path or a (host, port) pair.
+        """
+        if isinstance(address, str):
+            self._remove_stale_socket(address)
+            self._server = await asyncio.start_unix_server(self._handle_connection, path=address)
+        else:
+            host, port = address
+            self._server = await asyncio.start_server(self._handle_connection, host=host, port=port)
+        logger.info("Inference server listening on %s", address)
+
+    @staticmethod
+    def _remove_stale_socket(path: str) -> None:
+        try:
+            mode = os.stat(path).st_mode
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(mode):
+            raise FileExistsError(f"{path} exists and is not a socket")
+        try:
+            open_socket(path, timeout=1.0).close()
+        except ConnectionRefusedError:
+            # left behind by a server that did not shut down cleanly
+            os.unlink(path)
+            return
+        raise OSError(f"Another server is listening on {path}")
+
+    @property
+    def address(self) -> Optional[AddressType]:
+        """
+        The address the server listens on, with the actual port if 0 was requested.
+        """
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()
+
+    async def warm_up(self, batch_sizes: Sequence[int] = (1,)) -> List[WarmupTiming]:
+        """
+        Warm up every model of the server. The server is not ready in the meantime.
+
+        Args:
+            batch_sizes (Sequence[int]): Batch sizes to warm up.
+        Returns:
+            List[WarmupTiming]: The duration of every warm-up run.
+        """
+        self.ready = False
+        timings = []
+        warmed_up = set()
+        for model in (self.vector_storage, self.nli_model, self.coref, self.llm):
+            if not hasattr(model, "warm_up") or id(model) in warmed_up:
+                continue
+            warmed_up.add(id(model))
+            timings.extend(await self._run_blocking(model.warm_up, batch_sizes) or [])
+        self.ready = True
+        return timings
+
+    async def serve(self, address: AddressType, *, warm_up_batch_sizes: Sequence[int] = None) -> None:
+        """
+        Start listening and serve until cancelled.
+
+        Args:
+            address (AddressType): A Unix socket path or a (host, port) pair.
+            warm_up_batch_sizes (Sequence[int]): Batch sizes to warm up once listening.
+                ``ping`` reports the server as not ready until the warm-up completes.
+        """
+        await self.start(address)
+        try:
+            if warm_up_batch_sizes:
+                await self.warm_up(warm_up_batch_sizes)
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    def serve_forever(self, address: AddressType, *, warm_up_batch_sizes: Sequence[int] = None) -> None:
+        """
+        Blocking entry point of the server process.
+
+        Args:
+            address (AddressType): A Unix socket path or a (host, port) pair.
+            warm_up_batch_sizes (Sequence[int]): Batch sizes to warm up once listening.
+        """
+        try:
+            asyncio.run(self.serve(address, warm_up_batch_sizes=warm_up_batch_sizes))
+        except KeyboardInterrupt:
+            pass
+
+    async def close(self) -> None:
+        """
+        Stop listening and release the model threads.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                # requests of one connection may be pipelined, responses carry their id
+                task = asyncio.create_task(self._respond(request, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _respond(self, request: Any, writer: asyncio.StreamWriter, write_lock: asyncio.Lock) -> None:
+        request_id = request.get("id") if isinstance(request, dict) else None
+        try:
+            if not isinstance(request, dict) or request.get("op") not in self.operations:
+                raise ValueError(f"Unknown operation: {request.get('op') if isinstance(request, dict) else request!r}")
+            if not self.ready and request["op"] != "ping":
+                raise RuntimeError("Server is warming up")
+            result = await self.operations[request["op"]](**(request.get("kwargs") or {}))
+            response = {"id": request_id, "result": result}
+        except Exception as e:
+            response = {"id": request_id, "error": {"type": type(e).__name__, "message": str(e)}}
+        async with write_lock:
+            try:
+                try:
+                    await write_frame(writer, response)
+                except (TypeError, ValueError) as e:
+                    # the result can not be packed or exceeds the frame size, nothing was written yet
+                    await write_frame(writer, {"id": request_id, "error": {"type": type(e).__name__, "message": str(e)}})
+            except ConnectionError:
+                pass
+
+    async def _run_blocking(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
+
+    @staticmethod
+    def _require(model: Any, op: str) -> Any:
+        if model is None:
+            raise ValueError(f"Operation '{op}' is not served by this server")
+        return model
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        embedder = self._require(self.embedder, "embed")
+        return np.asarray(embedder(texts, show_progress_bar=False), dtype="float32")
+
+    def _nli(self, pairs: List[Tuple[str, str]]) -> List[int]:
+        return self._require(self.nli_model, "nli").batch(pairs)
+
+    async def _op_ping(self) -> Dict[str, Any]:
+        models = {
+            "embed": self.embedder,
+            "search": self.vector_storage,
+            "nli": self.nli_model,
+            "coref": self.coref,
+            "explain": self.llm,
+        }
+        return {"pid": os.getpid(), "ready": self.ready, "operations": [op for op, model in models.items() if model is not None]}
+
+    async def _op_embed(self, texts: List[str]) -> np.ndarray:
+        self._require(self.embedder, "embed")
+        return await self._embed_batcher.submit(texts)
+
+    async def _op_search(
+        self,
+        texts: List[str],
+        k: int = 5,
+        threshold: float = 1.0,
+        ner: List[List[str]] = None
+    ) -> List[List[DocumentMetadataType]]:
+        storage = self._require(self.vector_storage, "search")
+        if hasattr(storage, "search_many"):
+            return await self._run_blocking(storage.search_many, texts, k=k, threshold=threshold, ner=ner)
+        ner = ner or [None] * len(texts)
+        return await self._run_blocking(
+            lambda: [storage.search(text, k=k, threshold=threshold, ner=entities) for text, entities in zip(texts, ner)]
+        )
+
+    async def _op_nli(self, pairs: List[Tuple[str, str]]) -> List[int]:
+        self._require(self.nli_model, "nli")
+        return list(await self._nli_batcher.submit(pairs))
+
+    async def _op_coref(self, texts: List[str], contexts: List[str] = None) -> List[List[SentenceProposal]]:
+        coref = self._require(self.coref, "coref")
+        return await self._run_blocking(coref.batch, texts, contexts)
+
+    async def _op_explain(self, claim: str, evidence: str, **kwargs: Any) -> str:
+        llm = self._require(self.llm, "explain")
+        return await self._run_blocking(llm, claim=claim, evidence=evidence, **kwargs)
+
+    async def _op_add_documents(self, ids: List[int], texts: List[str], metadata: List[DocumentMetadataType]) -> None:
+        storage = self._require(self.vector_storage, "add_documents")
+        await self._run_blocking(storage.add_documents, ids, texts, metadata)
+
+    async def _op_delete_documents(self, document_ids: List[int]) -> None:
+        storage = self._require(self.vector_storage, "delete_documents")
+        await self._run_blocking(storage.delete_documents, document_ids)
+
+    def _storage_path(self, filepath: str, op: str) -> str:
+        if self.storage_directory is None:
+            raise PermissionError(f"Operation '{op}' requires a storage directory")
+        directory = os.path.realpath(self.storage_directory)
+        path = os.path.realpath(os.path.join(directory, filepath))
+        if os.path.commonpath([directory, path]) != directory:
+            raise PermissionError(f"Path {filepath!r} is outside of the storage directory")
+        return path
+
+    async def _op_save(self, filepath: str) -> None:
+        storage = self._require(self.vector_storage, "save")
+        path = self._storage_path(filepath, "save")
+        await self._run_blocking(storage.save, path)
+
+    async def _op_load(self, filepath: str) -> None:
+        storage = self._require(self.vector_storage, "load")
+        path = self._storage_path(filepath, "load")
+        await self._run_blocking(storage.load, path)
+
+    def __repr__(self):
+        return f"InferenceServer(address={self.address!r}, max_batch_size={self.max_batch_size})"
+
+
+class InferenceClient(object):
+    """
+    A blocking client of ``InferenceServer``.
+    The connection is opened on the first request and reopened after a failure.
+    A client can be shared between threads; requests are sent one at a time.
+    """
+
+    def __init__(self, address: AddressType, *, timeout: float = None):
+        """
+        Initialize the client.
+
+        Args:
+            address (AddressType): A Unix socket path or a (host, port) pair.
+            timeout (float): Timeout of a request, in seconds. None waits forever.
+        """
+        self.address: AddressType = address
+        self.timeout: Optional[float] = timeout
+        self._socket = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+
+    def call(self, op: str, **kwargs: Any) -> Any:
+        """
+        Send a request and wait for its response.
+
+        Args:
+            op (str): The operation.
+            **kwargs (Any): The arguments of the operation.
+        Returns:
+            Any: The result of the operation.
+        Raises:
+            InferenceError: If the server failed to handle the request.
+            OSError: If the server can not be reached.
+        """
+        with self._lock:
+            request_id = next(self._ids)
+            try:
+                if self._socket is None:
+                    self._socket = open_socket(self.address, timeout=self.timeout)
+                send_frame(self._socket, {"id": request_id, "op": op, "kwargs": kwargs})
+                response = recv_frame(self._socket)
+            except (OSError, ValueError):
+                self._close()
+                raise
+        if response.get("id") != request_id:
+            raise InferenceError("ProtocolError", f"Response to request {response.get('id')} instead of {request_id}")
+        if "error" in response:
+            raise InferenceError(response["error"]["type"], response["error"]["message"])
+        return response.get("result")
+
+    def ping(self) -> Dict[str, Any]:
+        """
+        Check that the server is up.
+
+        Returns:
+            Dict[str, Any]: The pid of the server, whether it is ready and the operations it serves.
+        """
+        return self.call("ping")
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts (List[str]): The texts to embed.
+        Returns:
+            np.ndarray: One embedding per text.
+        """
+        return self.call("embed", texts=list(texts))
+
+    def search(
+        self,
+        texts: List[str],
+        *,
+        k: int = 5,
+        threshold: float = 1.0,
+        ner: List[List[str]] = None
+    ) -> List[List[DocumentMetadataType]]:
+        """
+        Search the vector storage of the server for many texts.
+
+        Args:
+            texts (List[str]): The texts to search for.
+            k (int): The number of nearest neighbors to return for each text.
+            threshold (float): The distance threshold for filtering results.
+            ner (List[List[str]]): Named entities to filter the results of each text.
+        Returns:
+            List[List[Dict[str, Any]]]: The results of each text, in input order.
+        """
+        return self.call("search", texts=list(texts), k=k, threshold=threshold, ner=ner)
+
+    def nli(self, pairs: List[Tuple[str, str]]) -> List[int]:
+        """
+        Classify (claim, evidence) pairs.
+
+        Args:
+            pairs (List[Tuple[str, str]]): The pairs to classify.
+        Returns:
+            List[int]: The label index of each pair.
+        """
+        return self.call("nli", pairs=[list(pair) for pair in pairs])
+
+    def coref(self, texts: List[str], contexts: List[str] = None) -> List[List[SentenceProposal]]:
+        """
+        Resolve the coreferences of texts.
+
+        Args:
+            texts (List[str]): The texts to resolve.
+            contexts (List[str]): Context for each text.
+        Returns:
+            List[List[SentenceProposal]]: The resolved sentences of each text.
+        """
+        return self.call("coref", texts=list(texts), contexts=contexts)
+
+    def explain(self, claim: str, evidence: str, **kwargs: Any) -> str:
+        """
+        Generate an explanation for a claim and its evidence.
+
+        Args:
+            claim (str): The claim.
+            evidence (str): The evidence.
+            **kwargs (Any): Generation arguments of the language model.
+        Returns:
+            str: The generated explanation.
+        """
+        return self.call("explain", claim=str(claim), evidence=evidence, **kwargs)
+
+    def close(self) -> None:
+        """
+        Close the connection.
+        """
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def __enter__(self) -> "InferenceClient":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __repr__(self):
+        return f"InferenceClient(address={self.address!r})"
+
+
+class RemoteVectorStorage(VectorStorageInterface):
+    """
+    A vector storage living in an inference server.
+    Paths given to ``load`` and ``save`` are relative to the storage directory of the server.
+    """
+
+    def __init__(self, client: InferenceClient):
+        """
+        Args:
+            client (InferenceClient): The client of the server owning the storage.
+        """
+        self.client: InferenceClient = client
+
+    def add_document(self, index: int, text: str, metadata: DocumentMetadataType) -> None:
+        self.add_documents([index], [text], [metadata])
+
+    def add_documents(self, ids: List[int], texts: List[str], metadata: List[DocumentMetadataType]) -> None:
+        self.client.call("add_documents", ids=list(ids), texts=list(texts), metadata=list(metadata))
+
+    def search(
+        self,
+        text: str,
+        *,
+        k: int = 5,
+        threshold: float = 1.0,
+        ner: List[str] = None
+    ) -> List[DocumentMetadataType]:
+        return self.client.search([str(text)], k=k, threshold=threshold, ner=[ner] if ner else None)[0]
+
+    def search_many(
+        self,
+        texts: List[str],
+        *,
+        k: int = 5,
+        threshold: float = 1.0,
+        ner: List[List[str]] = None
+    ) -> List[List[DocumentMetadataType]]:
+        return self.client.search([str(text) for text in texts], k=k, threshold=threshold, ner=ner)
+
+    def delete_document(self, document_id: int) -> None:
+        self.delete_documents([document_id])
+
+    def delete_documents(self, document_ids: List[int]) -> None:
+        self.client.call("delete_documents", document_ids=list(document_ids))
+
+    def load(self, filepath: str) -> None:
+        self.client.call("load", filepath=filepath)
+
+    def save(self, filepath: str) -> None:
+        self.client.call("save", filepath=filepath)
+
+
+class RemoteLLM(LLMInterface):
+    """
+    A language model living in an inference server.
+    """
+
+    def __init__(self, client: InferenceClient):
+        """
+        Args:
+            client (InferenceClient): The client of the server owning the model.
+        """
+        super().__init__(device="cpu")
+        self.client: InferenceClient = client
+
+    def __call__(
+        self,
+        claim: str,
+        evidence: str,
+        *,
+        max_new_tokens: int = 256,
+        do_sample: bool = False,
+        temperature: float = 0.1
+    ) -> str:
+        return self.client.explain(
+            claim, evidence, max_new_tokens=max_new_tokens, do_sample=do_sample, temperature=temperature
+        )
+
+    def to(self, device: DeviceType) -> Self:
+        # the device of the model is chosen by the server
+        self._device = device
+        return self
+
+
+class RemoteCorefResolver(object):
+    """
+    A processing pipeline step resolving coreferences in an inference server.
+    Supports ``set_context`` like ``CorefResolver``, and ``batch`` for ``Pipeline.batch``.
+    """
+
+    # its configuration is described by ``cache_key``
+    cacheable: bool = True
+
+    def __init__(self, client: InferenceClient):
+        """
+        Args:
+            client (InferenceClient): The client of the server owning the resolver.
+        """
+        self.client: InferenceClient = client
+        self._context: str = ""
+
+    def __call__(self, text: str) -> List[SentenceProposal]:
+        return self.batch([text])[0]
+
+    def batch(self, texts: List[str]) -> List[List[SentenceProposal]]:
+        return self.client.coref(texts, [self._context] * len(texts))
+
+    def set_context(self, context: str) -> None:
+        self._context = context
+
+    def cache_key(self) -> str:
+        return f"{type(self).__qualname__}|{self.client.address!r}|{self._context}"
+
+    def to(self, device: DeviceType) -> "RemoteCorefResolver":
+        return self
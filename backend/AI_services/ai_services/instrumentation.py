@@ -0,0 +1,331 @@
+"""
+This module defines the instrumentation used to measure processing pipelines.
+
+Components:
+    - ``StepMetrics``: Measurements of a single pipeline step execution.
+    - ``MetricsSink``: Abstract base class for consumers of step measurements.
+    - ``LoggingSink``: Writes every measurement to a logger.
+    - ``CounterSink``: Accumulates Prometheus-style counters per step.
+    - ``HistogramSink``: Keeps step durations in memory and summarises them.
+    - ``WarmupTiming``: Duration of a model warm-up run.
+"""
+
+import inspect
+import logging
+import time
+import tracemalloc
+
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = (
+    "StepMetrics",
+    "MetricsSink",
+    "LoggingSink",
+    "CounterSink",
+    "HistogramSink",
+    "measure_step",
+    "measure_step_async",
+    "WarmupTiming",
+)
+
+
+@dataclass(frozen=True)
+class StepMetrics:
+    """
+    Measurements of a single pipeline step execution.
+
+    Attributes:
+        step (str): The name of the step.
+        wall_time (float): Elapsed wall-clock time, in seconds.
+        cpu_time (float): CPU time consumed by the process, in seconds.
+        input_size (Optional[int]): ``len`` of the step input, if it has one.
+        output_size (Optional[int]): ``len`` of the step output, if it has one.
+        memory_peak (Optional[int]): Peak of memory allocated during the step, in bytes.
+            Only measured when memory tracing is enabled. When ``tracemalloc`` was already
+            tracing, it is the memory still allocated at the end of the step instead.
+    """
+    step: str
+    wall_time: float
+    cpu_time: float
+    input_size: Optional[int] = None
+    output_size: Optional[int] = None
+    memory_peak: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class WarmupTiming:
+    """
+    Duration of a model warm-up run.
+
+    Attributes:
+        model (str): The name of the warmed-up model.
+        batch_size (int): Number of dummy inputs run at once.
+        wall_time (float): Elapsed wall-clock time, in seconds.
+    """
+    model: str
+    batch_size: int
+    wall_time: float
+
+
+class MetricsSink(ABC):
+    """
+    Defines the interface for a consumer of pipeline step measurements.
+    """
+
+    @abstractmethod
+    def __call__(self, metrics: StepMetrics) -> None:
+        """
+        Consume the measurements of one step execution.
+
+        Args:
+            metrics (StepMetrics): The measurements to consume.
+        """
+        ...
+
+
+class LoggingSink(MetricsSink):
+    """
+    A sink writing every step measurement to a logger.
+    """
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        """
+        Initialize the sink.
+
+        Args:
+            logger (logging.Logger): The logger to write to. Defaults to this module's logger.
+            level (int): The logging level of the records.
+        """
+        self.logger: logging.Logger = logger or logging.getLogger(__name__)
+        self.level: int = level
+
+    def __call__(self, metrics: StepMetrics) -> None:
+        self.logger.log(
+            self.level,
+            "step=%s wall=%.6fs cpu=%.6fs in=%s out=%s memory_peak=%s",
+            metrics.step,
+            metrics.wall_time,
+            metrics.cpu_time,
+            metrics.input_size,
+            metrics.output_size,
+            metrics.memory_peak,
+        )
+
+
+class CounterSink(MetricsSink):
+    """
+    A sink accumulating monotonically increasing counters per step,
+    which can be rendered in the Prometheus text exposition format.
+    """
+
+    def __init__(self, prefix: str = "pipeline_step"):
+        """
+        Initialize the sink.
+
+        Args:
+            prefix (str): Prefix of the exported metric names.
+        """
+        self.prefix: str = prefix
+        self.counters: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+
+    def __call__(self, metrics: StepMetrics) -> None:
+        counters = self.counters[metrics.step]
+        counters["calls_total"] += 1
+        counters["wall_seconds_total"] += metrics.wall_time
+        counters["cpu_seconds_total"] += metrics.cpu_time
+        if metrics.input_size is not None:
+            counters["input_items_total"] += metrics.input_size
+        if metrics.output_size is not None:
+            counters["output_items_total"] += metrics.output_size
+
+    def render(self) -> str:
+        """
+        Render the counters in the Prometheus text exposition format.
+
+        Returns:
+            str: One ``<prefix>_<counter>{step="<name>"} <value>`` line per counter.
+        """
+        lines = []
+        for step, counters in self.counters.items():
+            for name, value in counters.items():
+                lines.append(f'{self.prefix}_{name}{{step="{step}"}} {value:g}')
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """
+        Reset all counters.
+        """
+        self.counters.clear()
+
+
+class HistogramSink(MetricsSink):
+    """
+    A sink keeping the wall time of every step execution in memory.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def __call__(self, metrics: StepMetrics) -> None:
+        self.samples[metrics.step].append(metrics.wall_time)
+
+    def percentile(self, step: str, q: float) -> float:
+        """
+        Get a percentile of the wall time of a step.
+
+        Args:
+            step (str): The name of the step.
+            q (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The nearest-rank percentile, in seconds.
+
+        Raises:
+            ValueError: If the percentile is out of range or the step was never measured.
+        """
+        if not 0 <= q <= 100:
+            raise ValueError("Percentile must be between 0 and 100.")
+        samples = sorted(self.samples.get(step, ()))
+        if not samples:
+            raise ValueError(f"No samples recorded for step '{step}'")
+        rank = max(0, int(round(q / 100 * len(samples))) - 1)
+        return samples[rank]
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Summarise the wall time of every measured step.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Count, mean, p50, p95 and max per step.
+        """
+        return {
+            step: {
+                "count": len(samples),
+                "mean": sum(samples) / len(samples),
+                "p50": self.percentile(step, 50),
+                "p95": self.percentile(step, 95),
+                "max": max(samples),
+            }
+            for step, samples in self.samples.items()
+        }
+
+    def reset(self) -> None:
+        """
+        Drop all recorded samples.
+        """
+        self.samples.clear()
+
+
+def _size(data: Any) -> Optional[int]:
+    try:
+        return len(data)
+    except TypeError:
+        return None
+
+
+class _Measurement(object):
+    """
+    Wall time, CPU time and, optionally, allocation peak of a step, from creation to ``stop``.
+    """
+
+    def __init__(self, trace_memory: bool):
+        self.trace_memory: bool = trace_memory
+        self.started_tracing: bool = False
+        self.memory_before: int = 0
+        self.memory_peak: Optional[int] = None
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self.started_tracing = True
+            self.memory_before, _ = tracemalloc.get_traced_memory()
+        self.wall_start, self.cpu_start = time.perf_counter(), time.process_time()
+        self.wall_time: float = 0.0
+        self.cpu_time: float = 0.0
+
+    def stop(self) -> None:
+        self.wall_time = time.perf_counter() - self.wall_start
+        self.cpu_time = time.process_time() - self.cpu_start
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # the peak only belongs to the step when tracing started with it
+            self.memory_peak = max(0, (peak if self.started_tracing else current) - self.memory_before)
+            if self.started_tracing:
+                tracemalloc.stop()
+
+    def metrics(self, name: str, input_size: Optional[int], output: Any) -> StepMetrics:
+        return StepMetrics(
+            step=name,
+            wall_time=self.wall_time,
+            cpu_time=self.cpu_time,
+            input_size=input_size,
+            output_size=_size(output),
+            memory_peak=self.memory_peak,
+        )
+
+
+def measure_step(
+    name: str,
+    func: Callable[[Any], Any],
+    data: Any,
+    *,
+    trace_memory: bool = False
+) -> Tuple[Any, StepMetrics]:
+    """
+    Run a single step and measure it.
+
+    Args:
+        name (str): The name of the step.
+        func (Callable): The step to run.
+        data (Any): The input of the step.
+        trace_memory (bool): Whether to measure the allocation peak with ``tracemalloc``.
+            Tracing is started for the step, and stopped after it, if it is not running already.
+            The peak of ``tracemalloc`` is global, so it is only reset when tracing was started
+            here. Otherwise, the peak of the other user is left alone and the step reports the
+            growth of the traced memory, a lower bound of its peak.
+
+    Returns:
+        Tuple[Any, StepMetrics]: The output of the step and its measurements.
+    """
+    input_size = _size(data)
+    measurement = _Measurement(trace_memory)
+    try:
+        output = func(data)
+    finally:
+        measurement.stop()
+    return output, measurement.metrics(name, input_size, output)
+
+
+async def measure_step_async(
+    name: str,
+    func: Callable[[Any], Any],
+    data: Any,
+    *,
+    trace_memory: bool = False
+) -> Tuple[Any, StepMetrics]:
+    """
+    Run a single coroutine step, or a step returning an awaitable, and measure it until
+    its output is awaited. Like ``measure_step``, but the times and the memory also
+    include the other tasks of the event loop running while the step waits.
+
+    Args:
+        name (str): The name of the step.
+        func (Callable): The step to run.
+        data (Any): The input of the step.
+        trace_memory (bool): Whether to measure the allocation peak with ``tracemalloc``,
+            see ``measure_step``.
+
+    Returns:
+        Tuple[Any, StepMetrics]: The awaited output of the step and its measurements.
+    """
+    input_size = _size(data)
+    measurement = _Measurement(trace_memory)
+    try:
+        output = func(data)
+        while inspect.isawaitable(output):
+            output = await output
+    finally:
+        measurement.stop()
+    return output, measurement.metrics(name, input_size, output)
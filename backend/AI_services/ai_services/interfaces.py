@@ -8,10 +8,13 @@ Interfaces:
 """
 
 import functools
+import logging
+import time
 
 from abc import ABC, abstractmethod, ABCMeta
-from typing import List, Dict, Self
+from typing import List, Dict, Self, Sequence
 
+from .instrumentation import WarmupTiming
 from .response import SuggestionResponse
 from .typing import DeviceType, PromptType, DocumentMetadataType
 
@@ -23,6 +26,8 @@ __all__ = (
     "LLMInterface"
 )
 
+logger = logging.getLogger(__name__)
+
 
 class _CatchKIMeta(ABCMeta):
     @staticmethod
@@ -87,6 +92,7 @@ class DeviceAwareModel(ABC, metaclass=_CatchKIMeta):
             device (Literal["cpu", "cuda"]): Target device for model operations.
         """
         self._device = device
+        self._ready: bool = False
 
     @abstractmethod
     def to(self, device: DeviceType) -> Self:
@@ -114,6 +120,43 @@ class DeviceAwareModel(ABC, metaclass=_CatchKIMeta):
         """
         return self._device
 
+    @property
+    def is_ready(self) -> bool:
+        """
+        Returns whether the model has been warmed up.
+
+        Returns:
+            bool: True once ``warm_up`` has completed.
+        """
+        return self._ready
+
+    def warm_up(self, batch_sizes: Sequence[int] = (1,)) -> List[WarmupTiming]:
+        """
+        Runs representative dummy inputs through the model, so that lazy initialisation
+        (kernels, tokenizers, vocabularies, memory pages) is not paid by the first request,
+        then marks the model as ready.
+
+        Parameters:
+            batch_sizes (Sequence[int]): Batch sizes to warm up, e.g. the sizes used in production.
+
+        Returns:
+            List[WarmupTiming]: The duration of every warm-up run.
+        """
+        timings = []
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            self._warm_up_batch(batch_size)
+            timing = WarmupTiming(type(self).__name__, batch_size, time.perf_counter() - start)
+            logger.info("Warmed up %s with batch size %d in %.3fs", timing.model, batch_size, timing.wall_time)
+            timings.append(timing)
+        self._ready = True
+        return timings
+
+    def _warm_up_batch(self, batch_size: int) -> None:
+        """
+        Runs one batch of dummy inputs through the model. Nothing to warm up by default.
+        """
+
 
 class FactCheckerInterface(DeviceAwareModel):
     """
@@ -0,0 +1,200 @@
+"""
+This module defines the binary protocol spoken between the inference server and its clients.
+
+Every message is a frame: a 4-byte big-endian length followed by a msgpack payload.
+numpy arrays travel as raw buffers (dtype, shape and the bytes of the array) and
+are decoded without a copy. ``SentenceProposal`` keeps its tokens and their spans.
+
+Components:
+    - ``pack`` / ``unpack``: Encode and decode a message.
+    - ``send_frame`` / ``recv_frame``: Blocking framing over a socket.
+    - ``write_frame`` / ``read_frame``: Framing over asyncio streams.
+    - ``AddressType``: A Unix socket path or a (host, port) pair.
+"""
+
+import asyncio
+import socket
+import struct
+
+from typing import Any, Final, Tuple, TypeAlias, Union
+
+import msgpack
+import numpy as np
+
+from .sentence import SentenceProposal, Token
+
+__all__ = (
+    "AddressType",
+    "MAX_FRAME_SIZE",
+    "pack",
+    "unpack",
+    "send_frame",
+    "recv_frame",
+    "write_frame",
+    "read_frame",
+    "open_socket",
+)
+
+AddressType: TypeAlias = Union[str, Tuple[str, int]]
+
+HEADER: Final[struct.Struct] = struct.Struct("!I")
+MAX_FRAME_SIZE: Final[int] = 256 * 1024 * 1024
+
+_NDARRAY_EXT: Final[int] = 1
+_SENTENCE_EXT: Final[int] = 2
+
+
+def _encode(obj: Any) -> Any:
+    if isinstance(obj, np.ndarray):
+        array = np.ascontiguousarray(obj)
+        if array.dtype.hasobject:
+            raise TypeError("numpy arrays of objects can not be sent")
+        meta = msgpack.packb((array.dtype.str, array.shape))
+        return msgpack.ExtType(_NDARRAY_EXT, HEADER.pack(len(meta)) + meta + array.tobytes())
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, SentenceProposal):
+        tokens = [(token.text, token.start, token.end) for token in obj.tokens]
+        return msgpack.ExtType(_SENTENCE_EXT, msgpack.packb((obj.index, tokens)))
+    if isinstance(obj, tuple):
+        # tuples are not packed as arrays in strict mode, which is needed for ``str`` subclasses
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} can not be sent")
+
+
+def _decode_ext(code: int, data: bytes) -> Any:
+    if code == _NDARRAY_EXT:
+        (meta_size,) = HEADER.unpack_from(data)
+        dtype, shape = msgpack.unpackb(data[HEADER.size:HEADER.size + meta_size])
+        return np.frombuffer(data, dtype=np.dtype(dtype), offset=HEADER.size + meta_size).reshape(shape)
+    if code == _SENTENCE_EXT:
+        index, tokens = msgpack.unpackb(data)
+        return SentenceProposal([Token(*token) for token in tokens], index)
+    return msgpack.ExtType(code, data)
+
+
+def pack(message: Any) -> bytes:
+    """
+    Encode a message.
+
+    Args:
+        message (Any): msgpack types, numpy arrays and scalars, or sentence proposals.
+    Returns:
+        bytes: The encoded message.
+    Raises:
+        TypeError: If the message contains an object that can not be sent.
+    """
+    return msgpack.packb(message, default=_encode, strict_types=True, use_bin_type=True)
+
+
+def unpack(payload: bytes) -> Any:
+    """
+    Decode a message encoded by ``pack``. Decoded numpy arrays are read-only views of the payload.
+
+    Args:
+        payload (bytes): The encoded message.
+    Returns:
+        Any: The decoded message.
+    """
+    return msgpack.unpackb(payload, ext_hook=_decode_ext, raw=False, strict_map_key=False)
+
+
+def _check_size(size: int) -> None:
+    if size > MAX_FRAME_SIZE:
+        raise ValueError(f"Frame of {size} bytes exceeds the maximum of {MAX_FRAME_SIZE} bytes")
+
+
+def send_frame(sock: socket.socket, message: Any) -> None:
+    """
+    Send a message over a connected socket.
+
+    Args:
+        sock (socket.socket): The socket.
+        message (Any): The message to send.
+    """
+    payload = pack(message)
+    _check_size(len(payload))
+    sock.sendall(HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytearray:
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Connection closed by the peer")
+        received += n
+    return buffer
+
+
+def recv_frame(sock: socket.socket) -> Any:
+    """
+    Receive a message from a connected socket.
+
+    Args:
+        sock (socket.socket): The socket.
+    Returns:
+        Any: The received message.
+    Raises:
+        ConnectionError: If the peer closes the connection.
+    """
+    (size,) = HEADER.unpack(_recv_exactly(sock, HEADER.size))
+    _check_size(size)
+    return unpack(_recv_exactly(sock, size))
+
+
+async def write_frame(writer: asyncio.StreamWriter, message: Any) -> None:
+    """
+    Send a message over an asyncio stream.
+
+    Args:
+        writer (asyncio.StreamWriter): The stream.
+        message (Any): The message to send.
+    """
+    payload = pack(message)
+    _check_size(len(payload))
+    writer.write(HEADER.pack(len(payload)))
+    writer.write(payload)
+    await writer.drain()
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    """
+    Receive a message from an asyncio stream.
+
+    Args:
+        reader (asyncio.StreamReader): The stream.
+    Returns:
+        Any: The received message.
+    Raises:
+        asyncio.IncompleteReadError: If the peer closes the connection.
+    """
+    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+    _check_size(size)
+    return unpack(await reader.readexactly(size))
+
+
+def open_socket(address: AddressType, timeout: float = None) -> socket.socket:
+    """
+    Connect to a Unix socket path or to a (host, port) pair.
+
+    Args:
+        address (AddressType): The address of the server.
+        timeout (float): Timeout of socket operations, in seconds. None blocks.
+    Returns:
+        socket.socket: The connected socket.
+    """
+    if isinstance(address, str):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(address)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+    sock = socket.create_connection(tuple(address), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
@@ -0,0 +1,162 @@
+"""
+    Linguistic annotation shared by the processing steps.
+    This module provides a class `LinguisticAnnotator` that parses a text once with spaCy
+    and serves the same parse to every step needing sentences or named entities.
+"""
+
+import threading
+
+import spacy
+
+from collections import OrderedDict
+from typing import List, Optional
+
+from spacy.language import Language
+from spacy.tokens import Doc
+
+from ..interfaces import DeviceAwareModel
+from ..static import WARMUP_TEXT
+from ..typing import DeviceType
+
+__all__ = ("LinguisticAnnotator",)
+
+
+class LinguisticAnnotator(DeviceAwareModel):
+    """
+    Linguistic annotation with a single spaCy model.
+    The parse of a text gives both its sentence boundaries and its named entities.
+    The last parsed documents are kept, so that steps called one after the other
+    on the same text (e.g. NER in `FactCheckerPipeline` and sentence splitting in
+    `CorefResolver`) share one parse instead of running spaCy twice.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "en_core_web_sm",
+        *,
+        batch_size: int = 64,
+        n_process: int = 1,
+        cache_size: int = 64,
+        device: DeviceType = "cpu",
+    ):
+        """
+        Initialize the annotator.
+
+        Args:
+            model_name (str): The spaCy model to load. Defaults to "en_core_web_sm".
+            batch_size (int): Number of texts buffered by ``nlp.pipe``.
+            n_process (int): Number of processes used by ``nlp.pipe``.
+            cache_size (int): Number of parsed documents kept for reuse.
+            device (DeviceType): Device to run the model on ("cpu" or "cuda").
+        """
+        super().__init__(device=device)
+        self.model_name: str = model_name
+        self.batch_size: int = batch_size
+        self.n_process: int = n_process
+        self.cache_size: int = cache_size
+        self.nlp: Language = spacy.load(model_name)
+        if "sentencizer" not in self.nlp.pipe_names:
+            self.nlp.add_pipe("sentencizer")
+        self._docs: OrderedDict[str, Doc] = OrderedDict()
+        # steps may run in executor threads, e.g. under ``AsyncPipelineRunner``
+        self._lock: threading.Lock = threading.Lock()
+
+    def __call__(self, text: str) -> Doc:
+        """
+        Parse a text, or return the kept parse of the same text.
+
+        Args:
+            text (str): The text to parse.
+
+        Returns:
+            Doc: The parsed text.
+        """
+        doc = self._get(text)
+        if doc is None:
+            doc = self.nlp(text)
+            self._remember(text, doc)
+        return doc
+
+    def batch(
+        self,
+        texts: List[str],
+        *,
+        batch_size: Optional[int] = None,
+        n_process: Optional[int] = None,
+    ) -> List[Doc]:
+        """
+        Parse many texts with ``nlp.pipe``. Texts parsed recently are not parsed again.
+
+        Args:
+            texts (List[str]): The texts to parse.
+            batch_size (Optional[int]): Overrides the ``batch_size`` of the annotator.
+            n_process (Optional[int]): Overrides the ``n_process`` of the annotator.
+
+        Returns:
+            List[Doc]: The parsed texts, in input order.
+        """
+        docs: List[Optional[Doc]] = [self._get(text) for text in texts]
+        missing = [i for i, doc in enumerate(docs) if doc is None]
+        if missing:
+            parsed = self.nlp.pipe(
+                (texts[i] for i in missing),
+                batch_size=batch_size or self.batch_size,
+                n_process=n_process or self.n_process,
+            )
+            for i, doc in zip(missing, parsed):
+                docs[i] = doc
+                self._remember(texts[i], doc)
+        return docs
+
+    def entities(self, text: str) -> List[str]:
+        """
+        Get the named entities of a text.
+
+        Args:
+            text (str): The text to annotate.
+
+        Returns:
+            List[str]: The text of every entity, in order of appearance.
+        """
+        return [entity.text for entity in self(text).ents]
+
+    def clear(self) -> None:
+        """
+        Drop the kept parses.
+        """
+        with self._lock:
+            self._docs.clear()
+
+    def to(self, device: DeviceType) -> "LinguisticAnnotator":
+        """
+        Move the annotator to the specified device.
+
+        Args:
+            device (DeviceType): The target device ("cpu" or "cuda").
+
+        Returns:
+            LinguisticAnnotator: self
+        """
+        self._device = device
+        return self
+
+    def _warm_up_batch(self, batch_size: int) -> None:
+        # bypasses the kept parses, which would answer every text but the first
+        for _ in self.nlp.pipe([WARMUP_TEXT] * batch_size, batch_size=batch_size):
+            pass
+
+    def _get(self, text: str) -> Optional[Doc]:
+        with self._lock:
+            doc = self._docs.get(text)
+            if doc is not None:
+                self._docs.move_to_end(text)
+        return doc
+
+    def _remember(self, text: str, doc: Doc) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._lock:
+            self._docs[text] = doc
+            self._docs.move_to_end(text)
+            while len(self._docs) > self.cache_size:
+                self._docs.popitem(last=False)
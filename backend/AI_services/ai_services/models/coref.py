@@ -5,12 +5,16 @@
 
 import logging
 import re
-import spacy
 
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from fastcoref import LingMessCoref
+from fastcoref.modeling import CorefResult
+from spacy.language import Language
+from spacy.tokens import Doc
 
+from .annotation import LinguisticAnnotator
 from ..interfaces import DeviceAwareModel
+from ..static import WARMUP_TEXT
 from ..typing import DeviceType
 from ..sentence import SentenceProposal, Token
 
@@ -26,6 +30,9 @@ class CorefResolver(DeviceAwareModel):
     and return the resolved sentences as `SentenceProposal` objects.
     """
 
+    # its configuration is described by ``cache_key``
+    cacheable: bool = True
+
     @staticmethod
     def _set_fastcoref_logger(enabled: bool) -> None:
         """
@@ -43,6 +50,7 @@ class CorefResolver(DeviceAwareModel):
         use_logger: bool = False,
         context_token: str = "</CONTEXT>",
         sentence_splitter: str = "en_core_web_sm",
+        annotator: LinguisticAnnotator = None,
     ):
         """
         Initialize the coreference model.
@@ -54,6 +62,9 @@ class CorefResolver(DeviceAwareModel):
             use_logger (bool): Whether to enable the fastcoref logger.
             context_token (str): Token indicating context in text.
             sentence_splitter (str): Sentence splitter model to use. Defaults to "en_core_web_sm".
+                Ignored if ``annotator`` is given.
+            annotator (LinguisticAnnotator): Annotator used for sentence splitting. Sharing one
+                with other steps lets them reuse the same spaCy parse.
         """
         super().__init__(device=device)
         self._set_fastcoref_logger(use_logger)
@@ -66,8 +77,7 @@ class CorefResolver(DeviceAwareModel):
             enable_progress_bar=enable_progress_bar,
             device=device
         )
-        self.nlp = spacy.load(sentence_splitter)
-        self.nlp.add_pipe("sentencizer")
+        self.annotator: LinguisticAnnotator = annotator or LinguisticAnnotator(sentence_splitter)
         self._context_token: str = context_token
         self._context: str = ""
 
@@ -83,18 +93,228 @@ class CorefResolver(DeviceAwareModel):
             text (str): The input text to resolve coreferences in.
         """
         raw_text = text
-        prefix = f"{self._context}\n\n{self._context_token} "
+        prefix = self._get_prefix(self._context)
         full_text = prefix + raw_text
 
         result = self.model.predict(full_text)
 
+        return self._clusters2proposals(raw_text, *self._adjust_clusters(result, len(prefix)), self.annotator(raw_text))
+
+    def batch(
+        self,
+        texts: List[str],
+        contexts: Optional[List[str]] = None,
+        *,
+        max_tokens_in_batch: int = 10000,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> List[List[SentenceProposal]]:
+        """
+        Perform coreference resolution on many texts at once.
+        All texts are resolved by a single ``LingMessCoref.predict`` call, which
+        groups inputs of similar length into the same model batch. Sentence
+        splitting is then done with ``nlp.pipe`` instead of one parse per text.
+
+        Args:
+            texts (List[str]): The input texts to resolve coreferences in.
+            contexts (Optional[List[str]]): Context for each text. If None, the context
+                set by ``set_context`` is used for every text.
+            max_tokens_in_batch (int): Token budget of a single model batch.
+            batch_size (int): Number of texts buffered by ``nlp.pipe``.
+            n_process (int): Number of processes used by ``nlp.pipe``.
+
+        Returns:
+            List[List[SentenceProposal]]: Resolved sentences for each text, in input order.
+
+        Raises:
+            ValueError: If the number of contexts does not match the number of texts.
+        """
+        if not texts:
+            return []
+        if contexts is None:
+            contexts = [self._context] * len(texts)
+        if len(contexts) != len(texts):
+            raise ValueError("The number of contexts must match the number of texts.")
+
+        prefixes = [self._get_prefix(context) for context in contexts]
+        # longest first, so the model batches are filled with texts of similar length
+        order = sorted(range(len(texts)), key=lambda i: len(prefixes[i]) + len(texts[i]), reverse=True)
+        sorted_results = self.model.predict(
+            [prefixes[i] + texts[i] for i in order],
+            max_tokens_in_batch=max_tokens_in_batch
+        )
+        results = [None] * len(texts)
+        for i, result in zip(order, sorted_results):
+            results[i] = result
+
+        docs = self.annotator.batch(texts, batch_size=batch_size, n_process=n_process)
+        return [
+            self._clusters2proposals(text, *self._adjust_clusters(result, len(prefix)), doc)
+            for text, result, prefix, doc in zip(texts, results, prefixes, docs)
+        ]
+
+    def resolve_document(
+        self,
+        paragraphs: List[str],
+        *,
+        overlap: int = 1,
+        context: Optional[str] = None,
+        max_tokens_in_batch: int = 10000,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> List[List[SentenceProposal]]:
+        """
+        Perform coreference resolution over a whole document, paragraph by paragraph.
+        Every paragraph is resolved in a window that also holds the ``overlap``
+        preceding paragraphs, instead of the whole text seen so far, so the cost
+        grows linearly with the document length. Canonical mentions chosen in one
+        window are carried into the next one through the overlapping paragraphs,
+        which keeps entity names consistent across the document.
+
+        Args:
+            paragraphs (List[str]): The paragraphs of the document, in order.
+            overlap (int): Number of preceding paragraphs included in each window.
+            context (Optional[str]): Context placed before the first paragraphs of the
+                document. If None, the context set by ``set_context`` is used.
+            max_tokens_in_batch (int): Token budget of a single model batch.
+            batch_size (int): Number of texts buffered by ``nlp.pipe``.
+            n_process (int): Number of processes used by ``nlp.pipe``.
+
+        Returns:
+            List[List[SentenceProposal]]: Resolved sentences for each paragraph.
+
+        Raises:
+            ValueError: If ``overlap`` is negative.
+        """
+        if overlap < 0:
+            raise ValueError("Overlap must be a non-negative number of paragraphs.")
+        if not paragraphs:
+            return []
+        if context is None:
+            context = self._context
+
+        separator = "\n\n"
+        document_starts: List[int] = []
+        position = 0
+        for paragraph in paragraphs:
+            document_starts.append(position)
+            position += len(paragraph) + len(separator)
+
+        prefixes: List[str] = []
+        # (paragraph index, start inside the window) for every overlapping paragraph
+        window_layouts: List[List[Tuple[int, int]]] = []
+        for k in range(len(paragraphs)):
+            first = max(0, k - overlap)
+            parts = [context] if first == 0 and context else []
+            layout: List[Tuple[int, int]] = []
+            window_position = sum(len(part) + len(separator) for part in parts)
+            for j in range(first, k):
+                layout.append((j, window_position))
+                parts.append(paragraphs[j])
+                window_position += len(paragraphs[j]) + len(separator)
+            prefixes.append(self._get_prefix(separator.join(parts)))
+            window_layouts.append(layout)
+
+        results = self.model.predict(
+            [prefix + paragraph for prefix, paragraph in zip(prefixes, paragraphs)],
+            max_tokens_in_batch=max_tokens_in_batch
+        )
+        docs = self.annotator.batch(paragraphs, batch_size=batch_size, n_process=n_process)
+
+        carried_canonical_mentions: Dict[int, str] = {}
+        proposals: List[List[SentenceProposal]] = []
+        for k, (paragraph, result, prefix, doc) in enumerate(zip(paragraphs, results, prefixes, docs)):
+            offset = len(prefix)
+            clusters: List[List[str]] = []
+            clusters_spans: List[List[tuple]] = []
+            for mentions, spans in zip(result.get_clusters(), result.get_clusters(as_strings=False)):
+                mentions, spans = self._drop_crossing_mentions(mentions, spans, offset)
+                if not spans:
+                    continue
+                document_positions = [
+                    self._window2document_position(
+                        start, offset, k, window_layouts[k], paragraphs, document_starts
+                    )
+                    for start, _ in spans
+                ]
+                canonical_mention = next(
+                    (
+                        carried_canonical_mentions[document_position]
+                        for (start, _), document_position in zip(spans, document_positions)
+                        if start < offset and document_position in carried_canonical_mentions
+                    ),
+                    mentions[0]
+                )
+                paragraph_spans = [
+                    (start - offset, end - offset)
+                    for start, end in spans
+                    if start >= offset
+                ]
+                for (start, _), document_position in zip(spans, document_positions):
+                    if start >= offset:
+                        carried_canonical_mentions[document_position] = canonical_mention
+                if paragraph_spans:
+                    clusters.append([canonical_mention, *mentions])
+                    clusters_spans.append(paragraph_spans)
+
+            proposals.append(self._clusters2proposals(paragraph, clusters, clusters_spans, doc))
+
+            # mentions of paragraphs that no later window overlaps can not be carried anymore
+            next_first = k + 1 - overlap
+            if next_first > 0:
+                horizon = document_starts[next_first] if next_first < len(paragraphs) else position
+                carried_canonical_mentions = {
+                    document_position: mention
+                    for document_position, mention in carried_canonical_mentions.items()
+                    if document_position >= horizon
+                }
+        return proposals
+
+    def _warm_up_batch(self, batch_size: int) -> None:
+        self.batch([WARMUP_TEXT] * batch_size, [""] * batch_size)
+
+    def _get_prefix(self, context: str) -> str:
+        return f"{context}\n\n{self._context_token} "
+
+    @staticmethod
+    def _window2document_position(
+        start: int,
+        offset: int,
+        paragraph_index: int,
+        window_layout: List[Tuple[int, int]],
+        paragraphs: List[str],
+        document_starts: List[int]
+    ) -> Optional[int]:
+        if start >= offset:
+            return document_starts[paragraph_index] + start - offset
+        for j, window_start in window_layout:
+            if window_start <= start < window_start + len(paragraphs[j]):
+                return document_starts[j] + start - window_start
+        # mention inside the document context or the context token
+        return None
+
+    @staticmethod
+    def _drop_crossing_mentions(
+        mentions: List[str],
+        spans: List[tuple],
+        offset: int
+    ) -> Tuple[List[str], List[tuple]]:
+        # a mention crossing the context token belongs to neither the prefix nor the text
+        kept = [(mention, (start, end)) for mention, (start, end) in zip(mentions, spans) if not start < offset < end]
+        return [mention for mention, _ in kept], [span for _, span in kept]
+
+    @staticmethod
+    def _adjust_clusters(
+        result: CorefResult,
+        offset: int
+    ) -> Tuple[List[List[str]], List[List[tuple]]]:
         clusters = result.get_clusters()
         clusters_spans = result.get_clusters(as_strings=False)
 
         adjusted_clusters: List[List[str]] = []
         adjusted_spans: List[List[tuple]] = []
-        offset = len(prefix)
         for mentions, spans in zip(clusters, clusters_spans):
+            mentions, spans = CorefResolver._drop_crossing_mentions(mentions, spans, offset)
             new_spans = [
                 (start - offset, end - offset)
                 for (start, end) in spans
@@ -103,21 +323,29 @@ class CorefResolver(DeviceAwareModel):
             if new_spans:
                 adjusted_clusters.append(mentions)
                 adjusted_spans.append(new_spans)
+        return adjusted_clusters, adjusted_spans
 
+    def _clusters2proposals(
+        self,
+        raw_text: str,
+        clusters: List[List[str]],
+        clusters_spans: List[List[tuple]],
+        doc: Optional[Doc] = None
+    ) -> List[SentenceProposal]:
         antecedents = [
             mention
-            for cluster in adjusted_clusters
+            for cluster in clusters
             for mention in cluster
             if " " in mention
         ]
         antecedents.extend(self.system_tokens)
 
-        tokens_grouped_by_sentences = self._tokenize_text_by_sentences(raw_text, antecedents)
+        tokens_grouped_by_sentences = self._tokenize_text_by_sentences(raw_text, antecedents, doc)
 
         tokens_with_replacements = self._replace_coreference_by_spans(
             tokens_grouped_by_sentences,
-            adjusted_clusters,
-            adjusted_spans
+            clusters,
+            clusters_spans
         )
 
         return [
@@ -125,6 +353,23 @@ class CorefResolver(DeviceAwareModel):
             for i, sent_tokens in enumerate(tokens_with_replacements)
         ]
 
+    def cache_key(self) -> str:
+        """
+        Describe the configuration of the resolver for ``StepCache``.
+        The context is part of the description, since it changes the resolution.
+
+        Returns:
+            str: The description of the resolver.
+        """
+        return repr((
+            self.__class__.__qualname__,
+            self.model_name,
+            self._context,
+            self._context_token,
+            tuple(self.system_tokens),
+            self.annotator.model_name,
+        ))
+
     def set_context(self, context: str) -> None:
         """
         Set the context for coreference resolution.
@@ -137,6 +382,27 @@ class CorefResolver(DeviceAwareModel):
         """
         self._context = context
 
+    def set_annotator(self, annotator: LinguisticAnnotator) -> None:
+        """
+        Set the annotator used for sentence splitting.
+        Sharing the annotator of another step lets both reuse the same spaCy parse.
+
+        Args:
+            annotator (LinguisticAnnotator): The annotator to set.
+
+        """
+        self.annotator = annotator
+
+    @property
+    def nlp(self) -> Language:
+        """
+        Returns the spaCy model used for sentence splitting.
+
+        Returns:
+            Language: The spaCy model of the annotator.
+        """
+        return self.annotator.nlp
+
     def set_context_token(self, context_token: str) -> None:
         """
         Set the context token for coreference resolution.
@@ -164,9 +430,9 @@ class CorefResolver(DeviceAwareModel):
         return self
 
     @staticmethod
-    def _tokenize_text_with_antecedents(text: str, antecedents: List[str]) -> List[Token]:
+    def _compile_antecedents_pattern(antecedents: List[str]) -> re.Pattern:
         escaped_antecedents = sorted(
-            (re.escape(antecedent) for antecedent in antecedents),
+            dict.fromkeys(re.escape(antecedent) for antecedent in antecedents),
             key=len,
             reverse=True
         )
@@ -175,32 +441,38 @@ class CorefResolver(DeviceAwareModel):
             r"|(\w+[^\w\s]*)"
             r"|([^\w\s])"
         )
-        compiled_pattern = re.compile(pattern)
-
-        tokens: List[Token] = []
+        return re.compile(pattern)
 
-        for match in compiled_pattern.finditer(text):
-            token_text = match.group(0)
-            token_start, token_end = match.span(0)
-            tokens.append(Token(token_text, token_start, token_end))
-
-        return tokens
+    @staticmethod
+    def _tokenize_text_with_antecedents(
+        text: str,
+        antecedents_pattern: re.Pattern,
+        start: int = 0,
+        end: Optional[int] = None
+    ) -> List[Token]:
+        if end is None:
+            end = len(text)
+        return [
+            Token(match.group(0), *match.span(0))
+            for match in antecedents_pattern.finditer(text, start, end)
+        ]
 
     def _tokenize_text_by_sentences(
         self,
         text: str,
-        antecedents: List[str]
+        antecedents: List[str],
+        doc: Optional[Doc] = None
     ) -> List[List[Token]]:
-        tokens_grouped_by_sentences: List[List[Token]] = []
-        doc = self.nlp(text)
-        for sent in doc.sents:
-            sent_text = sent.text
-            tokens_in_sentence = self._tokenize_text_with_antecedents(sent_text, antecedents)
-            for token in tokens_in_sentence:
-                token.start += sent.start_char
-                token.end += sent.start_char
-            tokens_grouped_by_sentences.append(tokens_in_sentence)
-        return tokens_grouped_by_sentences
+        if doc is None:
+            doc = self.annotator(text)
+        # compiled once per text, the pattern is an alternation over every antecedent
+        antecedents_pattern = self._compile_antecedents_pattern(antecedents)
+        # matching inside [start_char, end_char) of the full text gives the same tokens as
+        # matching the sentence alone, but with offsets that are already absolute
+        return [
+            self._tokenize_text_with_antecedents(text, antecedents_pattern, sent.start_char, sent.end_char)
+            for sent in doc.sents
+        ]
 
     @staticmethod
     def _replace_coreference_by_spans(
@@ -209,27 +481,17 @@ class CorefResolver(DeviceAwareModel):
         coreference_clusters_spans: List[List[tuple]]
     ) -> List[List[Token]]:
 
-        start_position_to_canonical_mention = {}
+        start_position_to_replacement: Dict[int, Tuple[str, int]] = {}
         for cluster_mentions, cluster_spans in zip(coreference_clusters, coreference_clusters_spans):
             canonical_mention = cluster_mentions[0]
-            for span in cluster_spans:
-                start_position = span[0]
-                start_position_to_canonical_mention[start_position] = canonical_mention
+            for span_start, span_end in cluster_spans:
+                start_position_to_replacement[span_start] = (canonical_mention, span_end - span_start)
 
         for sentence_tokens in tokens_grouped_by_sentence:
             for token in sentence_tokens:
-                if token.start in start_position_to_canonical_mention:
-                    canonical_mention = start_position_to_canonical_mention[token.start]
-
-                    matching_span = next(
-                        span
-                        for spans_list in coreference_clusters_spans
-                        for span in spans_list
-                        if span[0] == token.start
-                    )
-
-                    original_span_length = matching_span[1] - matching_span[0]
-                    suffix_text = token.text[original_span_length:]
-                    token.text = canonical_mention + suffix_text
+                replacement = start_position_to_replacement.get(token.start)
+                if replacement is not None:
+                    canonical_mention, original_span_length = replacement
+                    token.text = canonical_mention + token.text[original_span_length:]
 
         return tokens_grouped_by_sentence
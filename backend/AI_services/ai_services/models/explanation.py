@@ -3,6 +3,7 @@ from typing import Union
 
 from ..utils import FactCheckerPrompt, PromptGeneratorType
 from ..interfaces import PromptInterface, LLMInterface
+from ..static import WARMUP_CLAIM, WARMUP_EVIDENCE
 from ..typing import DeviceType
 
 __all__ = (
@@ -99,3 +100,7 @@ class ExplanationLLM(LLMInterface):
             temperature=temperature
         )
         return response[0]['generated_text']
+
+    def _warm_up_batch(self, batch_size: int) -> None:
+        # explanations are generated one at a time, a single token is enough to load every kernel
+        self(WARMUP_CLAIM, WARMUP_EVIDENCE, max_new_tokens=1)
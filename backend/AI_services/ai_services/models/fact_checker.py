@@ -1,9 +1,10 @@
-import spacy
+import torch
 
 from tqdm.auto import tqdm
-from typing import List, Callable, Self, Union
+from typing import List, Callable, Optional, Self, Sequence, Tuple, Union
 from sentence_transformers import CrossEncoder
 
+from .annotation import LinguisticAnnotator
 from .explanation import ExplanationLLM
 from ..interfaces import (
     FactCheckerInterface,
@@ -11,8 +12,11 @@ from ..interfaces import (
     VectorStorageInterface,
     LLMInterface
 )
+from ..instrumentation import WarmupTiming
+from ..normalisation import normalise_text
 from ..response import SuggestionResponse, SuggestionPosition
 from ..preprocessing import Pipeline, get_default_paragraph_processing_pipeline
+from ..static import WARMUP_CLAIM, WARMUP_EVIDENCE
 from ..typing import DeviceType, DocumentMetadataType
 from ..sentence import SentenceProposal
 
@@ -38,10 +42,37 @@ class FactCheckingModel(DeviceAwareModel):
         # print(self.model.model.config.id2label[label_idx], score)
         return label_idx
 
+    def batch(self, pairs: List[Tuple[str, str]], *, batch_size: int = 32) -> List[int]:
+        """
+        Classify many (claim, evidence) pairs with one ``CrossEncoder.predict`` call.
+
+        Args:
+            pairs (List[Tuple[str, str]]): The (claim, evidence) pairs.
+            batch_size (int): Number of pairs per forward pass.
+        Returns:
+            List[int]: The label index of each pair, in input order.
+        """
+        if not pairs:
+            return []
+        scores = self.model.predict(
+            [tuple(pair) for pair in pairs],
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            apply_softmax=True
+        )
+        if scores.ndim == 1:
+            # single-label models return one score per pair, like in ``__call__``
+            return [int(score) for score in scores]
+        return [int(label_idx) for label_idx in scores.argmax(axis=-1)]
+
     def to(self, device: DeviceType) -> Self:
         self.model.to(device)
         return self
 
+    def _warm_up_batch(self, batch_size: int) -> None:
+        self.batch([(WARMUP_CLAIM, WARMUP_EVIDENCE)] * batch_size, batch_size=batch_size)
+
 
 class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
     """
@@ -73,6 +104,7 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
         automatic_contextualisation: bool = False,
         enable_ner: bool = True,
         ner_corpus: str = "en_core_web_sm",
+        annotator: LinguisticAnnotator = None,
     ):
         """
         Initializes the FactCheckerPipeline with a pre-trained model and tokenizer.
@@ -95,6 +127,9 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
             get_explanation (bool): Whether to generate an explanation.
             automatic_contextualisation (bool): Whether to automatically contextualize the claim.
             ner_corpus (str): The NER corpus to use for named entity recognition.
+            annotator (LinguisticAnnotator): The annotator used for named entity recognition.
+                It is also handed to the processing pipeline, so a text is parsed by spaCy once.
+                Defaults to the annotator of the processing pipeline if it uses ``ner_corpus``.
         """
         super().__init__(
             model_name=model_name,
@@ -139,7 +174,9 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
         ).to(processing_device)
 
         self.cross_encoder = CrossEncoder('cross-encoder/stsb-roberta-base', device=device)
-        self.nlp = spacy.load(ner_corpus, enable=["transformer", "ner", "tok2vec"])
+        self.annotator: Optional[LinguisticAnnotator] = self._share_annotator(
+            self.processing_pipeline, annotator, ner_corpus, enable_ner
+        )
         self.vector_storage = vector_storage
         self.storage_search_k = storage_search_k
         self.storage_search_threshold = storage_search_threshold
@@ -151,9 +188,72 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
         self.use_tqdm = use_tqdm
         self.enable_ner = enable_ner
 
+    @staticmethod
+    def _share_annotator(
+        processing_pipeline: Pipeline,
+        annotator: Optional[LinguisticAnnotator],
+        ner_corpus: str,
+        enable_ner: bool
+    ) -> Optional[LinguisticAnnotator]:
+        if annotator is not None:
+            if hasattr(processing_pipeline, "set_annotator"):
+                getattr(processing_pipeline, "set_annotator")(annotator)
+            return annotator
+
+        pipeline_annotator = getattr(processing_pipeline, "annotator", None)
+        if isinstance(pipeline_annotator, LinguisticAnnotator) and pipeline_annotator.model_name == ner_corpus:
+            return pipeline_annotator
+
+        return LinguisticAnnotator(ner_corpus) if enable_ner else None
+
+    def warm_up(self, batch_sizes: Sequence[int] = (1,)) -> List[WarmupTiming]:
+        """
+        Warm up every model of the pipeline: the processing pipeline, the annotator,
+        the language model, the vector storage (embedder and index pages) and the
+        cross-encoders. The pipeline is ready once all of them are.
+
+        Args:
+            batch_sizes (Sequence[int]): Batch sizes to warm up, e.g. the sizes used in production.
+        Returns:
+            List[WarmupTiming]: The duration of every warm-up run.
+        """
+        self._ready = False
+        timings = []
+        warmed_up = set()
+        for component in (self.processing_pipeline, self.annotator, self.llm, self.vector_storage):
+            component_warm_up = getattr(component, "warm_up", None)
+            if component_warm_up is None or id(component) in warmed_up:
+                continue
+            warmed_up.add(id(component))
+            timings.extend(component_warm_up(batch_sizes) or [])
+        timings.extend(super().warm_up(batch_sizes) or [])
+        return timings
+
+    def _warm_up_batch(self, batch_size: int) -> None:
+        super()._warm_up_batch(batch_size)
+        self.cross_encoder.predict(
+            [(WARMUP_CLAIM, WARMUP_EVIDENCE)] * batch_size,
+            batch_size=batch_size,
+            show_progress_bar=False
+        )
+
+    @property
+    def nlp(self):
+        """
+        Returns the spaCy model used for named entity recognition.
+        """
+        return self.annotator.nlp if self.annotator is not None else None
+
     @staticmethod
     def _process_text(text):
-        return "".join([char for char in text.lower() if char.isalnum() or char.isspace()]).strip()
+        return normalise_text(text)
+
+    def _get_entities(self, text: str) -> List[str]:
+        if not self.enable_ner or self.annotator is None:
+            return []
+        # entities are looked up in the normalised storage, like the claim itself
+        entities = (self._process_text(entity) for entity in self.annotator.entities(text))
+        return [entity for entity in entities if entity]
 
     def _predict(
         self,
@@ -196,6 +296,8 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
             )
         ]
 
+    # grad mode is thread-local, the threads of a server calling the checker would keep it enabled
+    @torch.inference_mode()
     def evaluate_sentence(self, sentence: str, context: str = "") -> List[SuggestionResponse]:
         """
         Evaluate a single sentence.
@@ -221,6 +323,7 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
 
         return result
 
+    @torch.inference_mode()
     def evaluate_text(self, text: str, *, context: str = "") -> List[SuggestionResponse]:
         """
         Evaluate a given text and return a list of suggestion responses.
@@ -234,7 +337,7 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
         if self.context_setter is not None:
             self.context_setter(context)
 
-        entities = [entity.text for entity in self.nlp(self._process_text(text)).ents] if self.enable_ner else []
+        entities = self._get_entities(text)
 
         sentences = self.processing_pipeline(text)  # type: list[str]
 
@@ -250,6 +353,41 @@ class FactCheckerPipeline(FactCheckerInterface, FactCheckingModel):
                 results.extend(result)
         return results
 
+    @torch.inference_mode()
+    def evaluate_texts(
+        self,
+        texts: List[str],
+        *,
+        contexts: List[str] = None
+    ) -> List[List[SuggestionResponse]]:
+        """
+        Evaluate many texts. The texts are parsed by spaCy in batches with ``nlp.pipe``
+        before being evaluated one by one, so every step reuses the batched parse.
+
+        Args:
+            texts (List[str]): The texts to evaluate.
+            contexts (List[str]): Additional context for each text.
+        Returns:
+            List[List[SuggestionResponse]]: The suggestion responses of each text, in input order.
+        Raises:
+            ValueError: If the number of contexts does not match the number of texts.
+        """
+        if contexts is None:
+            contexts = [""] * len(texts)
+        if len(contexts) != len(texts):
+            raise ValueError("The number of contexts must match the number of texts.")
+
+        # parses beyond the annotator cache would be evicted before they are used
+        chunk_size = max(1, self.annotator.cache_size) if self.annotator is not None else len(texts) or 1
+        results = []
+        for start in range(0, len(texts), chunk_size):
+            chunk_texts = texts[start:start + chunk_size]
+            if self.annotator is not None:
+                self.annotator.batch(chunk_texts)
+            for text, context in zip(chunk_texts, contexts[start:start + chunk_size]):
+                results.append(self.evaluate_text(text, context=context))
+        return results
+
     @staticmethod
     def _metadata2text(metadata: List[DocumentMetadataType]) -> str:
         valid_texts = []
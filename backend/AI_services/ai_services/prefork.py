@@ -0,0 +1,396 @@
+"""
+This module defines a pre-fork launcher sharing loaded models between server workers.
+
+The models and the vector storage are loaded once in the master process, frozen,
+and the workers are forked afterwards. Pages that are never written again (model
+weights, the vector index) stay shared copy-on-write between the master
+and every worker, so memory does not grow with the number of workers.
+
+Components:
+    - ``MemoryUsage``: Shared and private memory of a process.
+    - ``memory_usage``: Read the memory usage of a process from ``/proc``.
+    - ``health_check``: Memory report of a worker and of its master.
+    - ``freeze_models``: Put models in inference mode and move them out of the garbage collector.
+    - ``PreforkServer``: Load models in the master and fork the workers serving them.
+    - ``uvicorn_worker``: Worker entry point serving an ASGI app with uvicorn.
+"""
+
+import gc
+import logging
+import os
+import signal
+import socket
+import types
+
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+
+from .threads import ThreadBudget, set_thread_budget, split_thread_budget
+
+__all__ = (
+    "MemoryUsage",
+    "memory_usage",
+    "health_check",
+    "freeze_models",
+    "PreforkServer",
+    "uvicorn_worker",
+)
+
+logger = logging.getLogger(__name__)
+
+LoaderType = Callable[[], Any]
+WorkerType = Callable[[Any, socket.socket], None]
+
+
+@dataclass(frozen=True)
+class MemoryUsage:
+    """
+    Memory of a process, in bytes.
+
+    Attributes:
+        rss (int): Resident memory.
+        shared (int): Resident memory also mapped by other processes (e.g. pages inherited at fork).
+        private (int): Resident memory only mapped by this process.
+        pss (int): Proportional share, where every shared page is divided between the processes mapping it.
+    """
+    rss: int
+    shared: int
+    private: int
+    pss: int
+
+
+def _parse_smaps(content: str) -> MemoryUsage:
+    fields: Dict[str, int] = {}
+    for line in content.splitlines():
+        name, _, value = line.partition(":")
+        parts = value.split()
+        if len(parts) == 2 and parts[1] == "kB":
+            fields[name] = fields.get(name, 0) + int(parts[0]) * 1024
+    return MemoryUsage(
+        rss=fields.get("Rss", 0),
+        shared=fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        private=fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+        pss=fields.get("Pss", 0),
+    )
+
+
+def memory_usage(pid: int = None) -> MemoryUsage:
+    """
+    Read the memory usage of a process. Linux only.
+
+    Args:
+        pid (int): The process to inspect. Defaults to the current process.
+
+    Returns:
+        MemoryUsage: The memory usage of the process.
+
+    Raises:
+        OSError: If ``/proc`` is not available or the process does not exist.
+    """
+    pid = os.getpid() if pid is None else pid
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as file:
+            return _parse_smaps(file.read())
+    except FileNotFoundError:
+        # kernels older than 4.14 only have the per-mapping file
+        with open(f"/proc/{pid}/smaps") as file:
+            return _parse_smaps(file.read())
+
+
+def health_check() -> Dict[str, Any]:
+    """
+    Report the memory usage of the current worker and of its master.
+    Meant to be returned by a health endpoint of the served app.
+
+    Returns:
+        Dict[str, Any]: The pids and the memory usage of the worker and of the master.
+    """
+    master_pid = os.getppid()
+    report: Dict[str, Any] = {"pid": os.getpid(), "memory": asdict(memory_usage())}
+    try:
+        report["master"] = {"pid": master_pid, "memory": asdict(memory_usage(master_pid))}
+    except OSError:
+        report["master"] = None
+    return report
+
+
+def _iter_modules(obj: Any, module_type: type, seen: Set[int]) -> Iterator[Any]:
+    # no depth limit: models sit deep in pipelines, e.g. checker -> pipeline -> steps -> resolver -> model
+    stack: List[Any] = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, types.ModuleType)):
+            continue
+        seen.add(id(obj))
+        if isinstance(obj, module_type):
+            # submodules are handled by ``eval`` and ``requires_grad_`` of the root module
+            yield obj
+            continue
+        if isinstance(obj, dict):
+            children = obj.values()
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            children = obj
+        else:
+            children = getattr(obj, "__dict__", {}).values()
+        # reversed, so children are visited in order
+        stack.extend(reversed(list(children)))
+
+
+def freeze_models(*objects: Any) -> int:
+    """
+    Prepare loaded models to be shared with forked workers.
+    Every torch module reachable from the given objects (e.g. the models held by a
+    ``FactCheckerPipeline``) is put in eval mode without gradients, gradients are
+    disabled in the calling thread, and every object alive is moved to the permanent
+    generation of the garbage collector (``gc.freeze``). The collector of a worker
+    then never writes to their headers, which would copy their pages.
+
+    Args:
+        *objects (Any): The objects holding the models.
+
+    Returns:
+        int: The number of torch modules frozen.
+
+    Note:
+        Grad mode is thread-local in torch: it is only disabled in the calling thread,
+        and in the main thread of the workers forked from it. Other threads, e.g. the
+        threadpool of a served app, keep it enabled, but record no graph since the
+        parameters do not require gradients. ``FactCheckerPipeline`` evaluates texts
+        in ``torch.inference_mode``, in whichever thread calls it.
+    """
+    n_modules = 0
+    try:
+        import torch
+    except ImportError:
+        pass
+    else:
+        torch.set_grad_enabled(False)
+        seen: Set[int] = set()
+        for obj in objects:
+            for module in _iter_modules(obj, torch.nn.Module, seen):
+                module.eval()
+                module.requires_grad_(False)
+                n_modules += 1
+    gc.collect()
+    gc.freeze()
+    return n_modules
+
+
+class PreforkServer(object):
+    """
+    A launcher loading the models once and forking the workers serving them.
+
+    The master binds the listening socket, calls ``loader`` to load the models,
+    freezes them and forks ``n_workers`` workers. Each worker calls ``worker``
+    with the loaded object and the listening socket. Workers that exit are
+    replaced by a new fork of the master, without loading the models again.
+
+    Examples:
+        def load():
+            storage = VectorStorage(dim=1024, embedder=embedder)
+            storage.load("storage/facts", mmap=True)
+            return FactCheckerPipeline(storage, device="cpu")
+
+        PreforkServer(load, uvicorn_worker(create_app), port=8000, n_workers=4).run()
+    """
+
+    def __init__(
+        self,
+        loader: LoaderType,
+        worker: WorkerType,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        n_workers: int = 2,
+        thread_budget: Optional[ThreadBudget] = None,
+        restart_workers: bool = True,
+    ):
+        """
+        Initialize the launcher.
+
+        Args:
+            loader (Callable[[], Any]): Loads the models in the master process.
+            worker (Callable[[Any, socket.socket], None]): Serves requests in a worker,
+                given the loaded object and the listening socket.
+            host (str): The host to listen on.
+            port (int): The port to listen on. 0 picks a free port.
+            n_workers (int): Number of worker processes.
+            thread_budget (ThreadBudget): Threads given to torch, FAISS and BLAS in each worker.
+                Defaults to an equal share of the cores.
+            restart_workers (bool): Whether to replace workers that exit.
+
+        Raises:
+            ValueError: If ``n_workers`` is lower than 1.
+        """
+        if n_workers < 1:
+            raise ValueError("Number of workers must be at least 1.")
+        self.loader: LoaderType = loader
+        self.worker: WorkerType = worker
+        self.host: str = host
+        self.port: int = port
+        self.n_workers: int = n_workers
+        self.thread_budget: ThreadBudget = thread_budget or split_thread_budget(n_workers)
+        self.restart_workers: bool = restart_workers
+        self.workers: Set[int] = set()
+        self.loaded: Any = None
+        self._socket: Optional[socket.socket] = None
+        self._stopping: bool = False
+
+    def bind(self) -> socket.socket:
+        """
+        Bind the listening socket shared by the workers.
+
+        Returns:
+            socket.socket: The listening socket.
+        """
+        if self._socket is None:
+            self._socket = socket.create_server((self.host, self.port), reuse_port=False, backlog=2048)
+            self.port = self._socket.getsockname()[1]
+        return self._socket
+
+    def load(self) -> Any:
+        """
+        Load and freeze the models in the master process.
+
+        Returns:
+            Any: The object returned by the loader.
+
+        Raises:
+            RuntimeError: If the loader initialised CUDA, which can not be used after a fork.
+        """
+        if self.loaded is None:
+            self.loaded = self.loader()
+            self._check_no_cuda()
+            n_modules = freeze_models(self.loaded)
+            logger.info("Loaded and froze %d torch modules in master %d", n_modules, os.getpid())
+        return self.loaded
+
+    def run(self) -> None:
+        """
+        Load the models, fork the workers and supervise them until the master
+        receives SIGINT or SIGTERM, or, without restarts, until every worker exits.
+        """
+        sock = self.bind()
+        self.load()
+        previous_handlers = {
+            sig: signal.signal(sig, self._handle_stop) for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            for _ in range(self.n_workers):
+                self._spawn(sock)
+            while self.workers:
+                try:
+                    pid, status = os.wait()
+                except ChildProcessError:
+                    break
+                except InterruptedError:
+                    continue
+                self.workers.discard(pid)
+                if self._stopping:
+                    continue
+                logger.warning("Worker %d exited with status %d", pid, os.waitstatus_to_exitcode(status))
+                if self.restart_workers:
+                    self._spawn(sock)
+        finally:
+            self.stop()
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+    def stop(self) -> None:
+        """
+        Terminate the workers and close the listening socket.
+        """
+        self._stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                self.workers.discard(pid)
+        for pid in list(self.workers):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.workers.discard(pid)
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Report the memory usage of the master and of every worker.
+
+        Returns:
+            Dict[str, Any]: The memory usage per pid and the totals of all processes.
+        """
+        processes = {os.getpid(): memory_usage()}
+        for pid in self.workers:
+            try:
+                processes[pid] = memory_usage(pid)
+            except OSError:
+                continue
+        return {
+            "processes": {pid: asdict(usage) for pid, usage in processes.items()},
+            "total_rss": sum(usage.rss for usage in processes.values()),
+            "total_pss": sum(usage.pss for usage in processes.values()),
+            "total_private": sum(usage.private for usage in processes.values()),
+        }
+
+    def _spawn(self, sock: socket.socket) -> int:
+        pid = os.fork()
+        if pid:
+            self.workers.add(pid)
+            return pid
+        exit_code = 0
+        try:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(sig, signal.SIG_DFL)
+            set_thread_budget(self.thread_budget)
+            self.worker(self.loaded, sock)
+        except BaseException:  # noqa
+            logger.exception("Worker %d failed", os.getpid())
+            exit_code = 1
+        finally:
+            # skip the atexit handlers and buffers inherited from the master
+            os._exit(exit_code)
+
+    def _handle_stop(self, signum, frame) -> None:
+        self._stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    @staticmethod
+    def _check_no_cuda() -> None:
+        try:
+            import torch
+        except ImportError:
+            return
+        if torch.cuda.is_available() and torch.cuda.is_initialized():
+            raise RuntimeError("CUDA can not be shared with forked workers, load the models on the CPU")
+
+    def __repr__(self):
+        return f"PreforkServer(host={self.host!r}, port={self.port}, n_workers={self.n_workers})"
+
+
+def uvicorn_worker(app_factory: Callable[[Any], Any], **config: Any) -> WorkerType:
+    """
+    Build a worker entry point serving an ASGI app with uvicorn on the shared socket.
+
+    Args:
+        app_factory (Callable[[Any], Any]): Builds the app from the loaded object.
+        **config (Any): Extra arguments of ``uvicorn.Config``.
+
+    Returns:
+        Callable[[Any, socket.socket], None]: The worker entry point.
+    """
+
+    def serve(loaded: Any, sock: socket.socket) -> None:
+        import uvicorn
+
+        server = uvicorn.Server(uvicorn.Config(app_factory(loaded), workers=1, **config))
+        server.run(sockets=[sock])
+
+    return serve
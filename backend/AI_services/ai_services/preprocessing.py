@@ -1,12 +1,17 @@
+import functools
 import inspect
+import itertools
 import re
 
 from collections import OrderedDict
-from typing import get_args, Iterator, List, Tuple, Any, Callable, TypeVar, Generic
+from typing import get_args, Iterable, Iterator, List, Sequence, Tuple, Any, Callable, TypeVar, Generic
 from tqdm.auto import tqdm
 
+from .caching import StepCache, step_fingerprint
 from .interfaces import DeviceAwareModel
+from .instrumentation import MetricsSink, WarmupTiming, measure_step
 from .typing import DeviceType
+from .models.annotation import LinguisticAnnotator
 from .models.coref import CorefResolver
 from .sentence import SentenceProposal
 
@@ -29,12 +34,18 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
     through each registered step.
     """
 
+    # a nested pipeline is only cached as a whole when registered with ``cacheable=True``
+    cacheable: bool = False
+
     def __init__(
         self,
         steps: List[Tuple[str, Callable[..., ...]]] = None,
         use_tqdm: bool = False,
         *,
         device: DeviceType = "cpu",
+        sinks: List[MetricsSink] = None,
+        trace_memory: bool = False,
+        cache: StepCache = None,
         **kwargs
     ):
         """
@@ -45,13 +56,21 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
                 a name (str) and a callable function. The functions will be executed in order.
             use_tqdm (bool): Whether to use tqdm for progress tracking.
             device (DeviceType): Device to load the model on ("cpu" or "cuda").
+            sinks (List[MetricsSink]): Consumers of per-step measurements.
+                Steps are not measured when no sink is registered.
+            trace_memory (bool): Whether to measure per-step allocation peaks with tracemalloc.
+            cache (StepCache): Cache of step outputs. Steps are not cached if None.
             **kwargs: Additional keyword arguments for registering steps.
         """
         super().__init__(device=device)
         if steps is None:
             steps = []
         self.use_tqdm: bool = use_tqdm
+        self.sinks: List[MetricsSink] = list(sinks or [])
+        self.trace_memory: bool = trace_memory
+        self.cache: StepCache = cache
         self.pipeline: OrderedDict[str, Any] = OrderedDict()
+        self._cached_steps: set[str] = set()
 
         for name, func in steps:
             self.register(name, func)
@@ -64,19 +83,46 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
             func.to(self.device)
         return func
 
-    def register(self, name: str, func: Callable):
+    def register(self, name: str, func: Callable, *, cacheable: bool = None):
         """
         Register a new step in the pipeline.
 
         Args:
             name (str): The name of the step.
             func (Callable): The function to be executed in this step.
+            cacheable (bool): Whether the outputs of the step may be cached. Defaults to
+                the ``cacheable`` attribute of the step, or False if it has none. Cached objects
+                must describe their configuration with a ``cache_key``, see ``step_fingerprint``.
         """
         if name in self.pipeline:
             raise ValueError(f"Pipeline already contains a step with name '{name}'")
         self.pipeline[name] = func
+        if cacheable is None:
+            cacheable = getattr(func, "cacheable", False)
+        if cacheable:
+            self._cached_steps.add(name)
         self._func2device(func)
 
+    def add_sink(self, sink: MetricsSink):
+        """
+        Register a consumer of per-step measurements.
+
+        Args:
+            sink (MetricsSink): The sink to register.
+        """
+        self.sinks.append(sink)
+
+    def remove_sink(self, sink: MetricsSink):
+        """
+        Remove a previously registered consumer of per-step measurements.
+
+        Args:
+            sink (MetricsSink): The sink to remove.
+        Raises:
+            ValueError: If the sink is not registered.
+        """
+        self.sinks.remove(sink)
+
     def unregister(self, name: str):
         """
         Unregister a step from the pipeline.
@@ -89,6 +135,7 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
         if name not in self.pipeline:
             raise ValueError(f"Pipeline does not contain a step with name '{name}'")
         del self.pipeline[name]
+        self._cached_steps.discard(name)
 
     def to(self, device: DeviceType) -> "Pipeline":
         """
@@ -102,6 +149,23 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
             self._func2device(func)
         return self
 
+    def warm_up(self, batch_sizes: Sequence[int] = (1,)) -> List[WarmupTiming]:
+        """
+        Warm up every step that supports it, e.g. the models of the pipeline.
+
+        Args:
+            batch_sizes (Sequence[int]): Batch sizes to warm up.
+
+        Returns:
+            List[WarmupTiming]: The duration of every warm-up run.
+        """
+        timings = []
+        for func in self.pipeline.values():
+            if hasattr(func, "warm_up"):
+                timings.extend(func.warm_up(batch_sizes) or [])
+        self._ready = True
+        return timings
+
     def __call__(self, data: T) -> U:
         """
         Execute the pipeline on the provided data.
@@ -119,10 +183,105 @@ class Pipeline(Generic[T, U], DeviceAwareModel):
             unit="step",
             disable=not self.use_tqdm,
         )
+        if not self.sinks:
+            for name, func in iterator:
+                data = self._get_step(name, func)(data)
+            return data
+
         for name, func in iterator:
-            data = func(data)
+            step = self._get_step(name, func)
+            data, metrics = measure_step(name, step, data, trace_memory=self.trace_memory)
+            for sink in self.sinks:
+                sink(metrics)
         return data
 
+    def batch(self, items: List[T]) -> List[U]:
+        """
+        Execute the pipeline on a list of inputs.
+        Steps exposing a ``batch`` method receive the whole list at once,
+        other steps are applied to every item in turn.
+
+        Args:
+            items (List[Any]): The inputs to be processed.
+        Returns:
+            List[Any]: The processed inputs, in the same order.
+        Raises:
+            ValueError: If a batch step does not return one output per input.
+        """
+        for name, func in self.pipeline.items():
+            step = self._get_batch_step(name, func)
+            if self.sinks:
+                outputs, metrics = measure_step(name, step, items, trace_memory=self.trace_memory)
+                for sink in self.sinks:
+                    sink(metrics)
+            else:
+                outputs = step(items)
+            if len(outputs) != len(items):
+                raise ValueError(
+                    f"Step '{name}' returned {len(outputs)} outputs for {len(items)} inputs"
+                )
+            items = outputs
+        return items
+
+    def map(self, iterable: Iterable[T], batch_size: int = 32) -> Iterator[U]:
+        """
+        Lazily execute the pipeline on every item of an iterable.
+        Items are read ``batch_size`` at a time and processed with ``batch``,
+        so at most one batch is held in memory and results are yielded as soon
+        as their batch is done.
+
+        Args:
+            iterable (Iterable[Any]): The inputs to be processed.
+            batch_size (int): The number of items processed together.
+        Returns:
+            Iterator[Any]: The processed items, in the input order.
+        Raises:
+            ValueError: If ``batch_size`` is lower than 1.
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1.")
+        with tqdm(desc="Processing", unit="item", disable=not self.use_tqdm) as progress:
+            for chunk in itertools.batched(iterable, batch_size):
+                yield from self.batch(list(chunk))
+                progress.update(len(chunk))
+
+    def cache_key(self) -> str:
+        """
+        Describe the configuration of the pipeline for ``StepCache``,
+        when the pipeline is itself a step of another pipeline.
+
+        Returns:
+            str: The names and descriptions of the steps.
+        """
+        return repr([(name, step_fingerprint(func)) for name, func in self.pipeline.items()])
+
+    def is_cached(self, name: str) -> bool:
+        """
+        Tell whether a step goes through the cache of the pipeline.
+
+        Args:
+            name (str): The name of the step.
+        Returns:
+            bool: True if the pipeline has a cache and the step was registered as cacheable.
+        """
+        return self.cache is not None and name in self._cached_steps
+
+    def _get_step(self, name: str, func: Callable) -> Callable[[Any], Any]:
+        if self.is_cached(name):
+            return functools.partial(self.cache.call, name, func)
+        return func
+
+    def _get_batch_step(self, name: str, func: Callable) -> Callable[[List[Any]], List[Any]]:
+        batch_func = getattr(func, "batch", None)
+        if not callable(batch_func):
+            def batch_func(items: List[Any]) -> List[Any]:
+                return [func(item) for item in items]
+
+        if self.is_cached(name):
+            # the step is fingerprinted once for the whole batch
+            return functools.partial(self.cache.call_batch, name, func, batch_func)
+        return batch_func
+
     def __getitem__(self, name: str) -> Callable:
         """
         Get a registered step by its name.
@@ -228,7 +387,11 @@ def get_default_paragraph_processing_pipeline() -> Pipeline:
     )
 
 
-def get_default_coref_pipeline(*, device: DeviceType = "cuda") -> Pipeline:
+def get_default_coref_pipeline(
+    *,
+    device: DeviceType = "cuda",
+    annotator: LinguisticAnnotator = None
+) -> Pipeline:
     """
     Create a default coreference resolution pipeline.
     This pipeline includes a coreference resolution step using the LingMessCoref model.
@@ -241,12 +404,13 @@ def get_default_coref_pipeline(*, device: DeviceType = "cuda") -> Pipeline:
 
     Args:
         device (DeviceType): The device to load the model on ("cpu" or "cuda").
+        annotator (LinguisticAnnotator): The annotator used for sentence splitting.
     Returns:
         Pipeline: The initialized pipeline with coreference resolution step.
     """
     return Pipeline[str, List[SentenceProposal]](
         steps=[
-            ("coref", CorefResolver(device=device)),
+            ("coref", CorefResolver(device=device, annotator=annotator)),
         ],
         device=device
     )
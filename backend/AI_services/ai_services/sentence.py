@@ -10,6 +10,9 @@ class Token(object):
     and end positions in the original text.
     """
 
+    # one token is created per word, so the instance ``__dict__`` is dropped
+    __slots__ = ("text", "start", "end")
+
     def __init__(self, text: str, start: int, end: int):
         """
         Initialize a Token instance.
@@ -46,21 +49,20 @@ class SentenceProposal(str):
     """
 
     def __new__(cls, tokens: List[Token], index: int):
-        sentence_text = ""
-        for i, token in enumerate(tokens):
-            if i == 0:
-                sentence_text += token.text
-                continue
-            if token.text and token.text[0].isalnum():
-                sentence_text += ' ' + token.text
-            else:
-                sentence_text += token.text
+        sentence_text = "".join(
+            ' ' + token.text if i and token.text and token.text[0].isalnum() else token.text
+            for i, token in enumerate(tokens)
+        )
 
         obj = super(SentenceProposal, cls).__new__(cls, sentence_text)
         obj.tokens = tokens
         obj.index = index
         return obj
 
+    def __reduce__(self):
+        # str pickles only its text, which does not match the signature of __new__
+        return self.__class__, (self.tokens, self.index)
+
     def __repr__(self) -> str:
         return f"SentenceProposal(index={self.index}, text={str(self)!r}, tokens={self.tokens})"
 
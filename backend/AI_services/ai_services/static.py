@@ -18,3 +18,11 @@ FACT_CHECKER_PROMPT = [
         )
     }
 ]
+
+# representative inputs run through the models by ``warm_up``
+WARMUP_CLAIM = "The Treaty of Brest-Litovsk was signed in March 1918."
+WARMUP_EVIDENCE = "Soviet Russia signed the Treaty of Brest-Litovsk with the Central Powers on 3 March 1918."
+WARMUP_TEXT = (
+    "In March 1918 Lenin moved the government to Moscow. "
+    "He believed the city was safer than Petrograd, and it remained the capital afterwards."
+)
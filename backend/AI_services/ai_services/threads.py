@@ -0,0 +1,198 @@
+"""
+This module manages the number of threads used by the native libraries of the models.
+
+torch, FAISS (OpenMP) and the BLAS libraries each size their thread pools after
+the number of cores. With several models, workers or concurrent requests in one
+node they oversubscribe the cores, and throughput collapses. The functions here
+apply one budget to all of them.
+
+Components:
+    - ``ThreadBudget``: Number of intra-op and inter-op threads given to the libraries.
+    - ``set_thread_budget``: Apply a budget to the whole process.
+    - ``get_thread_budget``: Get the budget currently applied.
+    - ``limit_threads``: Context manager applying a budget to a hot section only.
+    - ``split_thread_budget``: Share the cores of the node between workers.
+"""
+
+import contextlib
+import logging
+import os
+
+from dataclasses import dataclass
+from typing import Any, Final, Iterator, List, Optional, Tuple
+
+__all__ = (
+    "ThreadBudget",
+    "set_thread_budget",
+    "get_thread_budget",
+    "limit_threads",
+    "split_thread_budget",
+)
+
+logger = logging.getLogger(__name__)
+
+# read by OpenMP and the BLAS libraries when they are loaded, so setting them only
+# helps processes that have not imported torch / numpy / faiss yet (e.g. new workers)
+THREAD_ENV_VARIABLES: Final[Tuple[str, ...]] = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+@dataclass(frozen=True)
+class ThreadBudget:
+    """
+    Number of threads given to the native libraries.
+
+    Attributes:
+        intra_op (int): Threads used inside one operation (torch, OpenMP, BLAS).
+        inter_op (Optional[int]): Threads used to run independent torch operations.
+            Left untouched if None.
+    """
+    intra_op: int
+    inter_op: Optional[int] = None
+
+
+def _cpu_count() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def split_thread_budget(n_workers: int, total: int = None) -> ThreadBudget:
+    """
+    Share the cores available to the process between workers.
+
+    Args:
+        n_workers (int): Number of workers running models at the same time.
+        total (int): Number of threads to share. Defaults to the cores available to the process.
+
+    Returns:
+        ThreadBudget: The budget of one worker, at least one thread.
+
+    Raises:
+        ValueError: If ``n_workers`` is lower than 1.
+    """
+    if n_workers < 1:
+        raise ValueError("Number of workers must be at least 1.")
+    total = total or _cpu_count()
+    return ThreadBudget(intra_op=max(1, total // n_workers), inter_op=1 if n_workers > 1 else None)
+
+
+def _threadpool_limits(num_threads: int) -> Optional[Any]:
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return None
+    return threadpool_limits(limits=num_threads)
+
+
+def _set_torch_threads(budget: ThreadBudget) -> None:
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(budget.intra_op)
+    if budget.inter_op is not None and torch.get_num_interop_threads() != budget.inter_op:
+        try:
+            torch.set_num_interop_threads(budget.inter_op)
+        except RuntimeError:
+            # can only be set once, before any inter-op parallel work has started
+            logger.warning("torch inter-op threads are already in use and can not be changed")
+
+
+def _set_faiss_threads(num_threads: int) -> None:
+    try:
+        import faiss
+    except ImportError:
+        return
+    faiss.omp_set_num_threads(num_threads)
+
+
+def set_thread_budget(budget: ThreadBudget, *, set_environment: bool = True) -> None:
+    """
+    Apply a thread budget to torch, FAISS and the BLAS libraries of the process.
+    Libraries that are not installed are skipped. BLAS pools that are already loaded
+    are limited through ``threadpoolctl``, when it is installed.
+
+    Args:
+        budget (ThreadBudget): The budget to apply.
+        set_environment (bool): Whether to also export the thread environment variables,
+            which are inherited by child processes.
+
+    Raises:
+        ValueError: If the budget has less than one intra-op thread.
+    """
+    if budget.intra_op < 1:
+        raise ValueError("Thread budget must be at least 1 thread.")
+    if set_environment:
+        for variable in THREAD_ENV_VARIABLES:
+            os.environ[variable] = str(budget.intra_op)
+    _set_torch_threads(budget)
+    _set_faiss_threads(budget.intra_op)
+    _threadpool_limits(budget.intra_op)
+
+
+def get_thread_budget() -> ThreadBudget:
+    """
+    Get the thread budget currently applied to torch, or to OpenMP if torch is not installed.
+
+    Returns:
+        ThreadBudget: The current budget.
+    """
+    try:
+        import torch
+    except ImportError:
+        return ThreadBudget(intra_op=int(os.environ.get("OMP_NUM_THREADS", _cpu_count())))
+    return ThreadBudget(intra_op=torch.get_num_threads(), inter_op=torch.get_num_interop_threads())
+
+
+@contextlib.contextmanager
+def limit_threads(num_threads: int) -> Iterator[None]:
+    """
+    Limit the intra-op threads of torch, FAISS and BLAS inside a block,
+    and restore the previous limits afterwards.
+    The limits are process-global: they also apply to every other thread
+    while the block runs, and blocks nested or running concurrently in other
+    threads overwrite each other's limits. The block exiting last restores
+    the limits it saw when it was entered.
+
+    Args:
+        num_threads (int): Number of threads used inside the block.
+
+    Examples:
+        with limit_threads(2):
+            storage.search(query)
+    """
+    if num_threads < 1:
+        raise ValueError("Thread budget must be at least 1 thread.")
+    restore: List[Any] = []
+    try:
+        # limits already set are restored even if setting a later one fails
+        try:
+            import torch
+        except ImportError:
+            pass
+        else:
+            previous_torch = torch.get_num_threads()
+            torch.set_num_threads(num_threads)
+            restore.append(lambda: torch.set_num_threads(previous_torch))
+        try:
+            import faiss
+        except ImportError:
+            pass
+        else:
+            previous_faiss = faiss.omp_get_max_threads()
+            faiss.omp_set_num_threads(num_threads)
+            restore.append(lambda: faiss.omp_set_num_threads(previous_faiss))
+        limiter = _threadpool_limits(num_threads)
+        if limiter is not None:
+            restore.append(limiter.restore_original_limits)
+        yield
+    finally:
+        for restore_limit in reversed(restore):
+            restore_limit()
@@ -2,11 +2,14 @@ import faiss
 import torch
 import numpy as np
 import pickle
+import time
 
-from typing import Any, Dict, List, Callable, Union
+from typing import Any, Dict, List, Callable, Optional, Sequence, Union
 from tqdm.auto import tqdm
 
+from .instrumentation import WarmupTiming
 from .interfaces import VectorStorageInterface
+from .static import WARMUP_TEXT
 from .typing import DocumentMetadataType
 
 __all__ = (
@@ -43,6 +46,8 @@ class VectorStorage(VectorStorageInterface):
         self._metadata: Dict[int, Dict[str, Any]] = {}
         self._id_to_offset: Dict[int, int] = {}
         self._offset_to_id: List[int] = []
+        self._filepath: Optional[str] = None
+        self._ready: bool = False
 
     def add_document(self, index: int, text: str, metadata: DocumentMetadataType) -> None:
         """
@@ -124,9 +129,51 @@ class VectorStorage(VectorStorageInterface):
         query_vec = np.asarray([query_vec], dtype="float32")
 
         distances, ids = self.index.search(query_vec, k)
+        return self._collect_results(distances[0], ids[0], threshold)
+
+    def search_many(
+        self,
+        texts: List[str],
+        *,
+        k: int = 5,
+        threshold: float = 1.0,
+        ner: List[List[str]] = None
+    ) -> List[List[DocumentMetadataType]]:
+        """
+        Search for the nearest neighbors of many texts, with one embedder call
+        and one index search for the whole batch.
+        Args:
+            texts (List[str]): The texts to search for.
+            k (int): The number of nearest neighbors to return for each text.
+            threshold (float): The distance threshold for filtering results.
+            ner (List[List[str]], optional): Named entities to filter the results of each text.
+        Returns:
+            List[List[Dict[str, Any]]]: The results of each text, in input order.
+        Raises:
+            ValueError: If the embedder function is not provided, or if the number
+                of entity lists does not match the number of texts.
+        """
+        if self.embedder is None:
+            raise ValueError("Embedder function must be provided.")
+        if not texts:
+            return []
+        if ner is not None:
+            if len(ner) != len(texts):
+                raise ValueError("The number of entity lists must match the number of texts.")
+            texts = [f"{' '.join(entities)}\n{text}" if entities else text for text, entities in zip(texts, ner)]
+        query_vecs = np.asarray(self.embedder(texts, show_progress_bar=False), dtype="float32")
+        query_vecs /= np.linalg.norm(query_vecs, axis=1, keepdims=True)  # L2 normalization
+
+        distances, ids = self.index.search(query_vecs, k)
+        return [
+            self._collect_results(row_distances, row_ids, threshold)
+            for row_distances, row_ids in zip(distances, ids)
+        ]
+
+    def _collect_results(self, distances: np.ndarray, ids: np.ndarray, threshold: float) -> List[DocumentMetadataType]:
         results: List[Dict[str, Any]] = []
 
-        for dist, pos in zip(distances[0], ids[0]):
+        for dist, pos in zip(distances, ids):
             if pos == -1 or dist > threshold:
                 continue
             doc_id = self._offset_to_id[pos]
@@ -174,15 +221,60 @@ class VectorStorage(VectorStorageInterface):
                 }, file
             )
 
-    def load(self, filepath: str) -> None:
+    def load(self, filepath: str, *, mmap: bool = False) -> None:
         """
         Load the FAISS index and metadata from disk.
         Args:
             filepath (str): The base file path to load the index and metadata from.
+            mmap (bool): Whether to memory-map the index read-only instead of reading it.
+                ``IO_FLAG_MMAP`` only maps the inverted lists of IVF indexes. The codes of
+                flat indexes are mapped too with FAISS versions providing ``IO_FLAG_MMAP_IFC``,
+                and read into memory otherwise, where forked processes still share them
+                copy-on-write as long as the index is not modified.
         """
-        self.index = faiss.read_index(f"{filepath}.index")
+        io_flags = 0
+        if mmap:
+            io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        self.index = faiss.read_index(f"{filepath}.index", io_flags)
+        self._filepath = filepath
         with open(f"{filepath}.pkl", "rb") as file:
             data = pickle.load(file)
             self._metadata = data["metadata"]
             self._id_to_offset = data["id_to_offset"]
             self._offset_to_id = data["offset_to_id"]
+
+    @property
+    def is_ready(self) -> bool:
+        """
+        Returns whether the storage has been warmed up.
+        """
+        return self._ready
+
+    def warm_up(self, batch_sizes: Sequence[int] = (1,)) -> List[WarmupTiming]:
+        """
+        Pre-touch the pages of the index loaded from disk, so a memory-mapped index
+        is in the page cache, then run dummy searches through the embedder and the index.
+        Args:
+            batch_sizes (Sequence[int]): Numbers of texts searched at once.
+        Returns:
+            List[WarmupTiming]: The duration of the page touching and of every search.
+        """
+        timings = []
+        if self._filepath is not None:
+            start = time.perf_counter()
+            self._touch_file(f"{self._filepath}.index")
+            timings.append(WarmupTiming(f"{type(self).__name__}.index", 0, time.perf_counter() - start))
+        if self.embedder is not None:
+            for batch_size in batch_sizes:
+                start = time.perf_counter()
+                self.search_many([WARMUP_TEXT] * batch_size)
+                timings.append(WarmupTiming(type(self).__name__, batch_size, time.perf_counter() - start))
+        self._ready = True
+        return timings
+
+    @staticmethod
+    def _touch_file(filepath: str, chunk_size: int = 1 << 20) -> None:
+        buffer = bytearray(chunk_size)
+        with open(filepath, "rb", buffering=0) as file:
+            while file.readinto(buffer):
+                pass
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the coreference substitution step of ``CorefResolver``.
+
+Compares the previous implementation (regex recompiled for every sentence and
+a scan over all cluster spans for every replaced token) with the current one
+on synthetic texts of growing length. Only the pure-Python post-processing is
+measured, no model is loaded.
+
+Usage:
+    python -m benchmarks.coref_substitution
+"""
+import re
+import timeit
+
+from collections import namedtuple
+from typing import List
+
+from ai_services.models.coref import CorefResolver
+from ai_services.sentence import Token
+
+_Sentence = namedtuple("_Sentence", ("start_char", "end_char", "text"))
+_Doc = namedtuple("_Doc", ("sents",))
+
+ENTITIES = [f"the Council of People's Commissars No {i}" for i in range(200)]
+
+
+def _legacy_tokenize(text: str, antecedents: List[str]) -> List[Token]:
+    escaped_antecedents = sorted((re.escape(a) for a in antecedents), key=len, reverse=True)
+    pattern = rf"({'|'.join(escaped_antecedents)})|(\w+[^\w\s]*)|([^\w\s])"
+    return [Token(m.group(0), *m.span(0)) for m in re.compile(pattern).finditer(text)]
+
+
+def _legacy(text: str, doc: _Doc, clusters, clusters_spans, antecedents):
+    grouped = []
+    for sent in doc.sents:
+        tokens = _legacy_tokenize(sent.text, antecedents)
+        for token in tokens:
+            token.start += sent.start_char
+            token.end += sent.start_char
+        grouped.append(tokens)
+
+    start_to_canonical = {}
+    for mentions, spans in zip(clusters, clusters_spans):
+        for span in spans:
+            start_to_canonical[span[0]] = mentions[0]
+    for tokens in grouped:
+        for token in tokens:
+            if token.start in start_to_canonical:
+                span = next(s for spans in clusters_spans for s in spans if s[0] == token.start)
+                token.text = start_to_canonical[token.start] + token.text[span[1] - span[0]:]
+    return grouped
+
+
+def _current(resolver: CorefResolver, text: str, doc: _Doc, clusters, clusters_spans, antecedents):
+    grouped = resolver._tokenize_text_by_sentences(text, antecedents, doc)
+    return resolver._replace_coreference_by_spans(grouped, clusters, clusters_spans)
+
+
+def _make_case(n_sentences: int):
+    sentences, clusters_spans = [], [[] for _ in ENTITIES]
+    position = 0
+    for i in range(n_sentences):
+        entity = ENTITIES[i % len(ENTITIES)]
+        sentence = f"{entity} met with delegates. They signed it."
+        clusters_spans[i % len(ENTITIES)].append((position, position + len(entity)))
+        clusters_spans[i % len(ENTITIES)].append((position + len(entity) + 21, position + len(entity) + 25))
+        sentences.append(_Sentence(position, position + len(sentence), sentence))
+        position += len(sentence) + 1
+    text = " ".join(sentence.text for sentence in sentences)
+    clusters = [[entity, "They"] for entity in ENTITIES]
+    antecedents = list(ENTITIES) + ["</CONTEXT>"]
+    return text, _Doc(sentences), clusters, clusters_spans, antecedents
+
+
+def main() -> None:
+    resolver = CorefResolver.__new__(CorefResolver)
+    print(f"{'sentences':>10} {'legacy, s':>10} {'current, s':>11} {'speed-up':>9}")
+    for n_sentences in (100, 1_000, 5_000):
+        case = _make_case(n_sentences)
+        expected = [[t.text for t in s] for s in _legacy(*case)]
+        actual = [[t.text for t in s] for s in _current(resolver, *case)]
+        assert expected == actual, "implementations disagree"
+        legacy = min(timeit.repeat(lambda: _legacy(*case), number=1, repeat=3))
+        current = min(timeit.repeat(lambda: _current(resolver, *case), number=1, repeat=3))
+        print(f"{n_sentences:>10} {legacy:>10.4f} {current:>11.4f} {legacy / current:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
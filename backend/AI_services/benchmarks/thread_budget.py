@@ -0,0 +1,137 @@
+"""
+Benchmark of throughput versus thread allocation.
+
+Runs the same CPU workload in ``W`` worker processes, each given ``T`` threads
+for torch, FAISS and BLAS, for every allocation in a grid, and reports the
+number of requests served per second by all workers together. The last column
+of every worker count is the oversubscribed case, where every worker keeps the
+library defaults (one thread per core).
+
+The default workload is a cross-encoder sized forward pass (two linear layers
+on a batch of token embeddings) followed by a flat FAISS search. Pass
+``--model`` to use a real ``CrossEncoder`` instead.
+
+Usage:
+    python -m benchmarks.thread_budget
+    python -m benchmarks.thread_budget --workers 1 2 4 --requests 64
+    python -m benchmarks.thread_budget --model cross-encoder/nli-deberta-v3-base
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+from typing import List, Optional, Tuple
+
+from ai_services.threads import ThreadBudget, set_thread_budget
+
+DIMENSION = 768
+SEQUENCE_LENGTH = 128
+STORAGE_SIZE = 50_000
+
+
+def _build_workload(model_name: Optional[str]):
+    import numpy as np
+    import torch
+
+    if model_name is not None:
+        from sentence_transformers import CrossEncoder
+
+        model = CrossEncoder(model_name, device="cpu")
+        pairs = [("The treaty was signed in 1920.", "The treaty was signed in Moscow in 1920.")] * 8
+
+        def run_model() -> None:
+            model.predict(pairs, show_progress_bar=False)
+
+        return run_model
+
+    generator = torch.Generator().manual_seed(0)
+    hidden = torch.nn.Sequential(
+        torch.nn.Linear(DIMENSION, 4 * DIMENSION),
+        torch.nn.GELU(),
+        torch.nn.Linear(4 * DIMENSION, DIMENSION),
+    ).eval()
+    inputs = torch.randn(8, SEQUENCE_LENGTH, DIMENSION, generator=generator)
+
+    try:
+        import faiss
+    except ImportError:
+        index = None
+    else:
+        index = faiss.IndexFlatL2(DIMENSION)
+        index.add(np.random.default_rng(0).standard_normal((STORAGE_SIZE, DIMENSION), dtype=np.float32))
+
+    def run_synthetic() -> None:
+        with torch.inference_mode():
+            embeddings = hidden(inputs).mean(dim=1)
+        if index is not None:
+            index.search(embeddings.numpy(), 5)
+
+    return run_synthetic
+
+
+def _worker(budget: Optional[ThreadBudget], model_name: Optional[str], n_requests: int, barrier, queue) -> None:
+    # the budget is applied before torch is imported, like in ``ProcessPoolPipelineExecutor``
+    if budget is not None:
+        set_thread_budget(budget)
+    run = _build_workload(model_name)
+    run()  # warm-up
+    barrier.wait()
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        run()
+    queue.put(time.perf_counter() - start)
+
+
+def measure(n_workers: int, threads: Optional[int], model_name: Optional[str], n_requests: int) -> float:
+    """
+    Run the workload in ``n_workers`` processes and return the total requests per second.
+    """
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Barrier(n_workers)
+    queue = context.Queue()
+    budget = ThreadBudget(intra_op=threads, inter_op=1) if threads is not None else None
+    processes = [
+        context.Process(target=_worker, args=(budget, model_name, n_requests, barrier, queue))
+        for _ in range(n_workers)
+    ]
+    for process in processes:
+        process.start()
+    elapsed = [queue.get() for _ in processes]
+    for process in processes:
+        process.join()
+    return n_workers * n_requests / max(elapsed)
+
+
+def _allocations(n_workers: int, cores: int) -> List[Optional[int]]:
+    threads, allocations = 1, []
+    while threads * n_workers <= cores:
+        allocations.append(threads)
+        threads *= 2
+    return allocations + [None]
+
+
+def main(argv: List[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--model", default=None)
+    args = parser.parse_args(argv)
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    workers = args.workers or sorted({1, 2, max(1, cores // 4), max(1, cores // 2), cores})
+    print(f"{cores} cores, {args.requests} requests per worker, workload: {args.model or 'synthetic'}")
+    print(f"{'workers':>8} {'threads':>8} {'total':>6} {'req/s':>10}")
+    results: List[Tuple[int, Optional[int], float]] = []
+    for n_workers in workers:
+        for threads in _allocations(n_workers, cores):
+            throughput = measure(n_workers, threads, args.model, args.requests)
+            results.append((n_workers, threads, throughput))
+            total = "over" if threads is None else str(n_workers * threads)
+            print(f"{n_workers:>8} {threads or 'default':>8} {total:>6} {throughput:>10.1f}")
+    best = max(results, key=lambda result: result[2])
+    print(f"best: {best[0]} workers x {best[1] or 'default'} threads ({best[2]:.1f} req/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from backend.AI_services.ai_services.models import annotation
+from backend.AI_services.ai_services.models.annotation import LinguisticAnnotator
+
+RAW_TEXT = "Vladimir Lenin returned to Petrograd in April 1917. He spoke at the Finland Station."
+
+
+class _Doc(object):
+    def __init__(self, text):
+        self.text = text
+        self.ents = []
+
+
+class _NLP(object):
+    def __init__(self):
+        self.pipe_names = ["ner"]
+        self.parsed = []
+
+    def add_pipe(self, name):
+        self.pipe_names.append(name)
+
+    def __call__(self, text):
+        self.parsed.append(text)
+        return _Doc(text)
+
+    def pipe(self, texts, batch_size=1, n_process=1):
+        for text in texts:
+            yield self(text)
+
+
+@pytest.fixture
+def annotator(monkeypatch):
+    monkeypatch.setattr(annotation.spacy, "load", lambda model_name: _NLP())
+    return LinguisticAnnotator(cache_size=2)
+
+
+def test_sentencizer_is_added(annotator):
+    assert annotator.nlp.pipe_names == ["ner", "sentencizer"]
+
+
+def test_parses_are_shared_between_calls(annotator):
+    doc = annotator("tsar")
+    assert annotator("tsar") is doc
+    assert annotator.batch(["tsar", "duma"])[0] is doc
+    assert annotator.nlp.parsed == ["tsar", "duma"]
+
+
+def test_kept_parses_are_bounded(annotator):
+    annotator.batch(["a", "b", "c"])
+    annotator("a")
+    assert annotator.nlp.parsed == ["a", "b", "c", "a"]
+    annotator.clear()
+    annotator("c")
+    assert annotator.nlp.parsed[-1] == "c"
+
+
+def test_kept_parses_are_thread_safe(annotator):
+    errors = []
+
+    def parse(offset):
+        try:
+            for i in range(500):
+                annotator(str((i + offset) % 7))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=parse, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(annotator._docs) <= annotator.cache_size
+
+
+def test_entities_of_raw_text_with_the_full_pipeline():
+    pytest.importorskip("en_core_web_sm")
+    annotator = LinguisticAnnotator("en_core_web_sm")
+    assert "ner" in annotator.nlp.pipe_names
+
+    entities = annotator.entities(RAW_TEXT)
+    assert "Vladimir Lenin" in entities
+    assert "Petrograd" in entities
+    # the sentences come from the same parse
+    assert [sentence.text for sentence in annotator(RAW_TEXT).sents] == [
+        "Vladimir Lenin returned to Petrograd in April 1917.", "He spoke at the Finland Station."
+    ]
+
+
+def test_fact_checker_looks_entities_up_normalised():
+    pytest.importorskip("en_core_web_sm")
+    pytest.importorskip("sentence_transformers")
+    from backend.AI_services.ai_services.models.fact_checker import FactCheckerPipeline
+
+    # only the NER path is exercised, the models of the checker are not loaded
+    checker = FactCheckerPipeline.__new__(FactCheckerPipeline)
+    checker.enable_ner = True
+    checker.annotator = LinguisticAnnotator("en_core_web_sm")
+
+    entities = checker._get_entities(RAW_TEXT)
+    assert FactCheckerPipeline._process_text("Vladimir Lenin") in entities
+    assert all(entity == FactCheckerPipeline._process_text(entity) for entity in entities)
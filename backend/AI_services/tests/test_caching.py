@@ -0,0 +1,161 @@
+import functools
+import re
+import threading
+
+import pytest
+
+from backend.AI_services.ai_services import caching
+from backend.AI_services.ai_services.caching import StepCache, step_fingerprint
+
+
+class _Upper(object):
+    cacheable = True
+
+    def __init__(self, suffix: str = ""):
+        self._suffix = suffix
+        self.calls = 0
+
+    def __call__(self, text: str) -> str:
+        self.calls += 1
+        return text.upper() + self._suffix
+
+    def cache_key(self) -> str:
+        return f"_Upper|{self._suffix!r}"
+
+
+def test_call_hits_after_first_miss():
+    cache, step = StepCache(), _Upper()
+    assert cache.call("upper", step, "tsar") == "TSAR"
+    assert cache.call("upper", step, "tsar") == "TSAR"
+    assert step.calls == 1
+    assert cache.stats()["upper"] == {"hits": 1, "misses": 1, "hit_ratio": 0.5}
+
+
+def test_configuration_is_part_of_the_key():
+    assert StepCache.make_key("s", _Upper("!"), "x") != StepCache.make_key("s", _Upper("?"), "x")
+    assert step_fingerprint(re.compile("a").split) != step_fingerprint(re.compile("b").split)
+
+
+def test_keys_follow_the_cache_key_of_objects():
+    step = _Upper("!")
+    key = StepCache.make_key("s", step, "x")
+    # runtime state outside of the cache key does not change it
+    step("x")
+    assert StepCache.make_key("s", step, "x") == key
+    # settings inside it do, even when private
+    step._suffix = "?"
+    assert StepCache.make_key("s", step, "x") != key
+
+
+def test_memory_tier_is_bounded():
+    cache, step = StepCache(max_size=2), _Upper()
+    for text in ("a", "b", "c"):
+        cache.call("upper", step, text)
+    assert len(cache) == 2
+    cache.call("upper", step, "a")
+    assert step.calls == 4
+
+
+def test_disk_tier_survives_memory_eviction(tmp_path):
+    step = _Upper()
+    StepCache(max_size=0, directory=str(tmp_path)).call("upper", step, "duma")
+    cache = StepCache(directory=str(tmp_path))
+    assert cache.call("upper", step, "duma") == "DUMA"
+    assert step.calls == 1
+
+
+def test_unpicklable_outputs_are_not_cached():
+    cache = StepCache()
+    cache.call("gen", lambda text: (c for c in text), "abc")
+    assert len(cache) == 0
+
+
+def test_call_batch_computes_only_missing_items():
+    cache, step = StepCache(), _Upper()
+    seen = []
+
+    def batch(items):
+        seen.append(list(items))
+        return [step(item) for item in items]
+
+    assert cache.call_batch("upper", step, batch, ["a", "b"]) == ["A", "B"]
+    assert cache.call_batch("upper", step, batch, ["b", "c", "a"]) == ["B", "C", "A"]
+    assert seen == [["a", "b"], ["c"]]
+
+
+def _make_scaler(factor):
+    def scale(x):
+        return x * factor
+    return scale
+
+
+def _labelled(text, labels):
+    return text
+
+
+def test_partials_are_fingerprinted_by_arguments():
+    assert step_fingerprint(functools.partial(round, ndigits=1)) != step_fingerprint(functools.partial(round, ndigits=3))
+    assert step_fingerprint(functools.partial(round, ndigits=1)) == step_fingerprint(functools.partial(round, ndigits=1))
+
+
+def test_closures_are_fingerprinted_by_cell_contents():
+    assert step_fingerprint(_make_scaler(2)) != step_fingerprint(_make_scaler(3))
+    assert step_fingerprint(_make_scaler(2)) == step_fingerprint(_make_scaler(2))
+
+
+def test_container_arguments_are_fingerprinted():
+    def labelled(labels):
+        return functools.partial(_labelled, labels=labels)
+
+    for a, b in [({"PER"}, {"ORG"}), (frozenset({1}), frozenset({2})), ([[1]], [[2]]), ({"k": [1]}, {"k": [2]})]:
+        assert step_fingerprint(labelled(a)) != step_fingerprint(labelled(b))
+    assert step_fingerprint(labelled({"b", "a"})) == step_fingerprint(labelled({"a", "b"}))
+
+
+def test_objects_need_a_cache_key():
+    class _Config(object):
+        def __init__(self, labels):
+            self.labels = labels
+
+        def __call__(self, text):
+            return text
+
+    with pytest.raises(TypeError):
+        step_fingerprint(_Config({"PER"}))
+    # objects reached through bound methods and closures as well
+    with pytest.raises(TypeError):
+        step_fingerprint(_Config({"PER"}).__call__)
+    assert step_fingerprint(_Upper("!").__call__) != step_fingerprint(_Upper("?").__call__)
+
+
+def test_call_batch_fingerprints_the_step_once(monkeypatch):
+    fingerprints = []
+
+    def counting_fingerprint(func):
+        fingerprints.append(func)
+        return step_fingerprint(func)
+
+    monkeypatch.setattr(caching, "step_fingerprint", counting_fingerprint)
+    cache, step = StepCache(), _Upper()
+    cache.call_batch("upper", step, lambda items: [step(item) for item in items], ["a", "b", "c"])
+    assert fingerprints == [step]
+
+
+def test_steps_that_can_not_be_fingerprinted_are_not_cached():
+    class _Opaque(object):
+        def __init__(self):
+            self.handle = threading.Lock()
+            self.calls = 0
+
+        def __call__(self, text):
+            self.calls += 1
+            return text
+
+    step = _Opaque()
+    with pytest.raises(TypeError):
+        step_fingerprint(step)
+    assert StepCache.make_key("opaque", step, "x") is None
+    cache = StepCache()
+    cache.call("opaque", step, "x")
+    cache.call("opaque", step, "x")
+    assert step.calls == 2 and len(cache) == 0
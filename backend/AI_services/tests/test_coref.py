@@ -0,0 +1,153 @@
+import re
+
+import pytest
+
+from backend.AI_services.ai_services.models import coref
+from backend.AI_services.ai_services.models.coref import CorefResolver
+
+PREFIX_END = "</CONTEXT> "
+
+
+class _Result(object):
+    def __init__(self, text, clusters):
+        self.text = text
+        self.clusters = clusters
+
+    def get_clusters(self, as_strings=True):
+        if not as_strings:
+            return self.clusters
+        return [[self.text[start:end] for start, end in spans] for spans in self.clusters]
+
+
+class _Model(object):
+    """
+    Stand-in for ``LingMessCoref``, resolving the clusters returned by ``resolve`` for a window.
+    """
+
+    def __init__(self, resolve):
+        self.resolve = resolve
+        self.texts = []
+
+    def predict(self, texts, max_tokens_in_batch=10000):
+        self.texts.extend(texts)
+        return [_Result(text, self.resolve(text)) for text in texts]
+
+
+class _Sentence(object):
+    def __init__(self, start_char, end_char):
+        self.start_char = start_char
+        self.end_char = end_char
+
+
+class _Doc(object):
+    def __init__(self, text):
+        self.sents = [_Sentence(0, len(text))]
+
+
+class _Annotator(object):
+    model_name = "stub"
+
+    def __call__(self, text):
+        return _Doc(text)
+
+    def batch(self, texts, batch_size=None, n_process=None):
+        return [_Doc(text) for text in texts]
+
+
+def _by_names(*groups):
+    # every group is one entity, clustered when it is mentioned at least twice in the window
+    patterns = [re.compile(r"\b(?:" + "|".join(sorted(group, key=len, reverse=True)) + r")\b") for group in groups]
+
+    def resolve(text):
+        clusters = [[match.span() for match in pattern.finditer(text)] for pattern in patterns]
+        return [spans for spans in clusters if len(spans) > 1]
+
+    return resolve
+
+
+LENIN = ("Vladimir Lenin", "Lenin", "He")
+
+
+def _resolver(monkeypatch, resolve):
+    model = _Model(resolve)
+    monkeypatch.setattr(coref, "LingMessCoref", lambda *args, **kwargs: model)
+    return CorefResolver(annotator=_Annotator()), model
+
+
+def _texts(proposals):
+    return [" ".join(sentences) for sentences in proposals]
+
+
+def test_only_the_first_windows_hold_the_context(monkeypatch):
+    resolver, model = _resolver(monkeypatch, _by_names(LENIN))
+    paragraphs = ["Vladimir Lenin returned.", "He spoke.", "Crowds cheered."]
+    resolver.resolve_document(paragraphs, context="Petrograd, 1917.")
+
+    assert model.texts == [
+        "Petrograd, 1917.\n\n" + PREFIX_END + "Vladimir Lenin returned.",
+        "Petrograd, 1917.\n\nVladimir Lenin returned.\n\n" + PREFIX_END + "He spoke.",
+        "He spoke.\n\n" + PREFIX_END + "Crowds cheered.",
+    ]
+
+
+def test_overlap_sets_the_preceding_paragraphs_of_a_window(monkeypatch):
+    resolver, model = _resolver(monkeypatch, _by_names(LENIN))
+    paragraphs = ["Vladimir Lenin returned.", "Crowds cheered.", "He spoke."]
+
+    assert _texts(resolver.resolve_document(paragraphs, overlap=0)) == paragraphs
+    assert model.texts[2] == "\n\n" + PREFIX_END + "He spoke."
+
+    model.texts.clear()
+    resolved = _texts(resolver.resolve_document(paragraphs, overlap=2))
+    assert resolved[2] == "Vladimir Lenin spoke."
+    assert model.texts[2] == "Vladimir Lenin returned.\n\nCrowds cheered.\n\n" + PREFIX_END + "He spoke."
+
+    with pytest.raises(ValueError):
+        resolver.resolve_document(paragraphs, overlap=-1)
+
+
+def test_canonical_mentions_are_carried_through_overlapping_paragraphs(monkeypatch):
+    resolver, _ = _resolver(monkeypatch, _by_names(LENIN))
+    paragraphs = ["Vladimir Lenin returned.", "Lenin spoke.", "He left."]
+
+    # the third window does not hold the first paragraph, the name comes through the second one
+    assert _texts(resolver.resolve_document(paragraphs, overlap=1)) == [
+        "Vladimir Lenin returned.", "Vladimir Lenin spoke.", "Vladimir Lenin left."
+    ]
+
+
+def test_pruning_keeps_the_mentions_of_overlapped_paragraphs(monkeypatch):
+    resolver, _ = _resolver(monkeypatch, _by_names(LENIN))
+    paragraphs = ["Vladimir Lenin returned.", "Lenin spoke.", "Crowds cheered.", "He left."]
+
+    # the last window holds the second and third paragraphs, the first one is already pruned
+    assert _texts(resolver.resolve_document(paragraphs, overlap=2))[3] == "Vladimir Lenin left."
+    # without overlap nothing is carried, every paragraph is resolved on its own
+    assert _texts(resolver.resolve_document(paragraphs, overlap=0))[1] == "Lenin spoke."
+
+
+def test_mentions_crossing_the_context_token_are_ignored(monkeypatch):
+    def resolve(text):
+        offset = text.index(PREFIX_END) + len(PREFIX_END)
+        return [[(offset - 3, offset + 2), (offset + 10, offset + 12)]]
+
+    resolver, _ = _resolver(monkeypatch, resolve)
+    assert _texts(resolver.resolve_document(["He spoke. He left."])) == ["He spoke. He left."]
+    assert [str(sentence) for sentence in resolver.batch(["He spoke. He left."])[0]] == ["He spoke. He left."]
+
+
+def test_window_positions_map_to_the_document():
+    paragraphs = ["Lenin returned.", "He spoke."]
+    document_starts = [0, len(paragraphs[0]) + 2]
+    # window of the second paragraph: "Lenin returned.\n\n</CONTEXT> He spoke."
+    layout = [(0, 0)]
+    offset = len(paragraphs[0]) + 2 + len(PREFIX_END)
+
+    assert CorefResolver._window2document_position(0, offset, 1, layout, paragraphs, document_starts) == 0
+    assert CorefResolver._window2document_position(
+        offset, offset, 1, layout, paragraphs, document_starts
+    ) == document_starts[1]
+    # inside the context token
+    assert CorefResolver._window2document_position(
+        offset - 2, offset, 1, layout, paragraphs, document_starts
+    ) is None
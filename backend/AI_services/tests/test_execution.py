@@ -0,0 +1,278 @@
+import asyncio
+import os
+import threading
+import time
+
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend.AI_services.ai_services.caching import StepCache
+from backend.AI_services.ai_services.execution import AsyncPipelineRunner, ProcessPoolPipelineExecutor
+from backend.AI_services.ai_services.preprocessing import Pipeline
+from backend.AI_services.ai_services.threads import ThreadBudget
+
+
+def _upper(text: str) -> str:
+    return text.upper()
+
+
+def _exclaim(text: str) -> str:
+    return text + "!"
+
+
+class _AsyncReverse(object):
+    cacheable = True
+
+    def __init__(self):
+        self.calls = 0
+
+    def cache_key(self) -> str:
+        return "_AsyncReverse"
+
+    async def __call__(self, text: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0)
+        return text[::-1]
+
+
+def _fail_on_b(text: str) -> str:
+    if text == "b":
+        raise KeyError(text)
+    return text
+
+
+def _upper_pipeline() -> Pipeline:
+    return Pipeline([("upper", _upper), ("exclaim", _exclaim)])
+
+
+def _failing_pipeline() -> Pipeline:
+    return Pipeline([("fail", _fail_on_b), ("upper", _upper)])
+
+
+def _slow_pipeline() -> Pipeline:
+    def slow(text):
+        time.sleep(0.2)
+        return text
+
+    return Pipeline([("slow", slow)])
+
+
+def _broken_factory() -> Pipeline:
+    raise RuntimeError("models missing")
+
+
+def _worker_pipeline() -> Pipeline:
+    # records which pipeline of which process handled an input
+    built = id(object())
+
+    def where(text):
+        return text, os.getpid(), built, os.environ.get("OMP_NUM_THREADS")
+
+    return Pipeline([("where", where)])
+
+
+TEXTS = ["tsar", "duma", "soviet", "bolshevik", "menshevik", "zemstvo", "kulak"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, len(TEXTS) + 1])
+def test_process_pool_matches_call_in_input_order(chunk_size):
+    pipeline = _upper_pipeline()
+    with ProcessPoolPipelineExecutor(_upper_pipeline, 2, chunk_size=chunk_size) as executor:
+        assert list(executor.map(TEXTS)) == [pipeline(text) for text in TEXTS]
+        assert list(executor.map([])) == []
+
+
+def test_process_pool_builds_the_pipeline_once_per_worker():
+    budget = ThreadBudget(intra_op=3)
+    with ProcessPoolPipelineExecutor(_worker_pipeline, 2, chunk_size=1, thread_budget=budget) as executor:
+        outputs = list(executor.map(TEXTS * 4))
+
+    assert [text for text, _, _, _ in outputs] == TEXTS * 4
+    pipelines = {}
+    for _, pid, built, _ in outputs:
+        pipelines.setdefault(pid, set()).add(built)
+    assert all(len(built) == 1 for built in pipelines.values())
+    # the thread budget is applied by the initializer
+    assert {threads for _, _, _, threads in outputs} == {"3"}
+
+
+def test_process_pool_reports_failing_initializers():
+    with ProcessPoolPipelineExecutor(_broken_factory, 1) as executor:
+        with pytest.raises(BrokenProcessPool):
+            list(executor.map(TEXTS))
+
+
+def test_process_pool_step_exceptions_reach_the_caller():
+    with ProcessPoolPipelineExecutor(_failing_pipeline, 2, chunk_size=1) as executor:
+        outputs = executor.map(["a", "b", "c"])
+        assert next(outputs) == "A"
+        with pytest.raises(KeyError):
+            next(outputs)
+
+
+def test_process_pool_cancels_pending_chunks_when_the_consumer_stops():
+    with ProcessPoolPipelineExecutor(_slow_pipeline, 1, chunk_size=1, max_pending_chunks=6) as executor:
+        submitted = []
+        submit = executor._executor.submit
+
+        def record(*args, **kwargs):
+            future = submit(*args, **kwargs)
+            submitted.append(future)
+            return future
+
+        executor._executor.submit = record
+        outputs = executor.map(TEXTS)
+        assert next(outputs) == TEXTS[0]
+        outputs.close()
+
+        # chunks already handed to the worker still run, the others never start
+        assert any(future.cancelled() for future in submitted)
+        assert all(future.cancelled() or future.running() or future.done() for future in submitted)
+
+
+def test_process_pool_rejects_use_after_shutdown():
+    executor = ProcessPoolPipelineExecutor(_upper_pipeline, 1)
+    executor.shutdown()
+    executor.shutdown()
+    with pytest.raises(RuntimeError):
+        next(executor.map(TEXTS))
+    with pytest.raises(ValueError):
+        ProcessPoolPipelineExecutor(_upper_pipeline, 1, chunk_size=0)
+
+
+def _run(pipeline, coroutine_factory, **kwargs):
+    async def main():
+        async with AsyncPipelineRunner(pipeline, **kwargs) as runner:
+            return await coroutine_factory(runner)
+
+    return asyncio.run(main())
+
+
+def test_map_preserves_input_order():
+    def slow_first(text):
+        # earlier inputs finish last
+        time.sleep(0.01 * (5 - len(text)))
+        return text
+
+    pipeline = Pipeline([("slow", slow_first), ("upper", _upper)])
+    texts = ["a", "bb", "ccc", "dddd"]
+
+    async def collect(runner):
+        return [output async for output in runner.map(texts)]
+
+    assert _run(pipeline, collect, workers={"slow": 4}) == [pipeline(text) for text in texts]
+
+
+def test_stages_run_with_their_own_workers():
+    barrier = threading.Barrier(3, timeout=5)
+
+    def wait_for_siblings(text):
+        # only passes when three inputs are in this stage at once
+        barrier.wait()
+        return text
+
+    pipeline = Pipeline([("wait", wait_for_siblings), ("upper", _upper)])
+
+    async def submit_all(runner):
+        return await asyncio.gather(*(runner.submit(text) for text in ("x", "y", "z")))
+
+    assert _run(pipeline, submit_all, workers={"wait": 3}) == ["X", "Y", "Z"]
+
+
+def test_unknown_workers_are_rejected():
+    with pytest.raises(ValueError):
+        AsyncPipelineRunner(Pipeline([("upper", _upper)]), workers={"lower": 2})
+    with pytest.raises(ValueError):
+        AsyncPipelineRunner(Pipeline([("upper", _upper)]), workers={"upper": 0})
+
+
+def test_step_exceptions_reach_the_caller():
+    def fail_on_b(text):
+        if text == "b":
+            raise KeyError(text)
+        return text
+
+    pipeline = Pipeline([("fail", fail_on_b), ("upper", _upper)])
+
+    async def submit_all(runner):
+        return await asyncio.gather(*(runner.submit(text) for text in "abc"), return_exceptions=True)
+
+    a, b, c = _run(pipeline, submit_all)
+    assert (a, c) == ("A", "C")
+    assert isinstance(b, KeyError)
+
+
+def test_cancelled_inputs_are_skipped():
+    seen = []
+
+    async def main():
+        gate = asyncio.Event()
+
+        async def blocked(text):
+            seen.append(text)
+            await gate.wait()
+            return text
+
+        runner = AsyncPipelineRunner(Pipeline([("blocked", blocked), ("upper", _upper)]))
+        async with runner:
+            first = asyncio.ensure_future(runner.submit("first"))
+            second = asyncio.ensure_future(runner.submit("second"))
+            await asyncio.sleep(0.01)
+            second.cancel()
+            gate.set()
+            result = await first
+            with pytest.raises(asyncio.CancelledError):
+                await second
+        return result
+
+    assert asyncio.run(main()) == "FIRST"
+    # the cancelled input is dropped before its step runs
+    assert seen == ["first"]
+
+
+def test_close_on_error_cancels_the_workers():
+    async def main():
+        runner = AsyncPipelineRunner(Pipeline([("upper", _upper)]))
+        with pytest.raises(RuntimeError):
+            async with runner:
+                tasks = list(runner._tasks)
+                raise RuntimeError("stop")
+        return tasks
+
+    assert all(task.cancelled() for task in asyncio.run(main()))
+
+
+def test_async_steps_are_awaited_when_cached():
+    reverse = _AsyncReverse()
+    pipeline = Pipeline([("reverse", reverse), ("exclaim", _exclaim)], cache=StepCache())
+
+    async def submit_twice(runner):
+        return [await runner.submit("abc"), await runner.submit("abc")]
+
+    assert _run(pipeline, submit_twice) == ["cba!", "cba!"]
+    assert reverse.calls == 1
+    assert pipeline.cache.stats()["reverse"]["hits"] == 1
+
+
+def test_every_stage_reports_its_metrics():
+    async def sleepy(text):
+        await asyncio.sleep(0.05)
+        return text
+
+    def deferred(text):
+        # a plain callable returning a coroutine, the awaiting is part of the step
+        return sleepy(text + "!")
+
+    recorded = []
+    pipeline = Pipeline([("sleepy", sleepy), ("deferred", deferred), ("upper", _upper)], sinks=[recorded.append])
+
+    async def submit(runner):
+        return await runner.submit("abc")
+
+    assert _run(pipeline, submit) == "ABC!"
+    metrics = {metrics.step: metrics for metrics in recorded}
+    assert sorted(metrics) == ["deferred", "sleepy", "upper"]
+    assert metrics["sleepy"].wall_time >= 0.05
+    assert metrics["deferred"].wall_time >= 0.05
+    assert metrics["deferred"].output_size == 4
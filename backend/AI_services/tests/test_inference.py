@@ -0,0 +1,178 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("msgpack")
+
+from backend.AI_services.ai_services.inference import (  # noqa: E402
+    InferenceClient,
+    InferenceError,
+    InferenceServer,
+    RemoteVectorStorage,
+)
+from backend.AI_services.ai_services import ipc  # noqa: E402
+from backend.AI_services.ai_services.ipc import pack, unpack  # noqa: E402
+from backend.AI_services.ai_services.sentence import SentenceProposal, Token  # noqa: E402
+
+
+class _Embedder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, show_progress_bar=False):
+        self.batches.append(len(texts))
+        return np.asarray([[len(text), 1.0] for text in texts], dtype="float32")
+
+
+class _NLI:
+    def batch(self, pairs):
+        return [int(claim == evidence) for claim, evidence in pairs]
+
+
+class _Storage:
+    embedder = None
+
+    def __init__(self):
+        self.saved = []
+
+    def save(self, filepath):
+        self.saved.append(filepath)
+
+    def search_many(self, texts, *, k=5, threshold=1.0, ner=None):
+        return [[{"id": i, "score": 0.5, "metadata": {"text": text}}] for i, text in enumerate(texts)]
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = InferenceServer(
+        vector_storage=_Storage(),
+        embedder=_Embedder(),
+        nli_model=_NLI(),
+        max_batch_size=8,
+        max_delay=0.05,
+        storage_directory=str(tmp_path / "storage"),
+    )
+    loop = asyncio.new_event_loop()
+    address = str(tmp_path / "inference.sock")
+    loop.run_until_complete(server.start(address))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield server, address
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_pack_round_trip():
+    array = np.arange(12, dtype="float32").reshape(3, 4)
+    sentence = SentenceProposal([Token("Lenin", 0, 5), Token("returned", 6, 14), Token(".", 14, 15)], 2)
+    decoded = unpack(pack({"array": array, "sentence": sentence, "pair": ("a", 1)}))
+
+    np.testing.assert_array_equal(decoded["array"], array)
+    assert decoded["array"].dtype == array.dtype
+    assert decoded["sentence"] == sentence
+    assert decoded["sentence"].index == 2
+    assert [(t.text, t.start, t.end) for t in decoded["sentence"].tokens] == [
+        ("Lenin", 0, 5), ("returned", 6, 14), (".", 14, 15)
+    ]
+    assert decoded["pair"] == ["a", 1]
+
+
+def test_operations(server):
+    _, address = server
+    with InferenceClient(address) as client:
+        assert set(client.ping()["operations"]) == {"embed", "search", "nli"}
+        np.testing.assert_array_equal(client.embed(["ab", "abc"]), [[2, 1], [3, 1]])
+        assert client.nli([("a", "a"), ("a", "b")]) == [1, 0]
+        assert RemoteVectorStorage(client).search("query")[0]["metadata"] == {"text": "query"}
+        with pytest.raises(InferenceError, match="coref"):
+            client.coref(["text"])
+        # the connection is still usable after an error
+        assert client.nli([("b", "b")]) == [1]
+
+
+def test_concurrent_requests_share_a_batch(server):
+    instance, address = server
+    clients = [InferenceClient(address) for _ in range(4)]
+    results = [None] * len(clients)
+
+    def embed(i):
+        results[i] = clients[i].embed(["x" * (i + 1)] * 2)
+
+    threads = [threading.Thread(target=embed, args=(i,)) for i in range(len(clients))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for client in clients:
+        client.close()
+
+    assert [result[0][0] for result in results] == [1, 2, 3, 4]
+    assert sum(instance.embedder.batches) == 8
+    assert len(instance.embedder.batches) < len(clients)
+
+
+def test_requests_wait_for_warm_up(server):
+    instance, address = server
+    instance.ready = False
+    with InferenceClient(address) as client:
+        assert client.ping()["ready"] is False
+        with pytest.raises(InferenceError, match="warming up"):
+            client.embed(["text"])
+        instance.ready = True
+        assert client.ping()["ready"] is True
+        assert client.embed(["text"]).shape == (1, 2)
+
+
+def test_oversized_results_are_answered_with_an_error(server, monkeypatch):
+    _, address = server
+    monkeypatch.setattr(ipc, "MAX_FRAME_SIZE", 1024)
+    with InferenceClient(address, timeout=5) as client:
+        with pytest.raises(InferenceError, match="ValueError"):
+            client.embed(["x"] * 300)
+        assert client.nli([("a", "a")]) == [1]
+
+
+def test_storage_paths_are_confined(server, tmp_path):
+    instance, address = server
+    with InferenceClient(address) as client:
+        storage = RemoteVectorStorage(client)
+        storage.save("facts")
+        assert instance.vector_storage.saved == [str(tmp_path / "storage" / "facts")]
+        with pytest.raises(InferenceError, match="PermissionError"):
+            storage.save("../facts")
+        with pytest.raises(InferenceError, match="PermissionError"):
+            storage.load("/etc/facts")
+        instance.storage_directory = None
+        with pytest.raises(InferenceError, match="PermissionError"):
+            storage.save("facts")
+
+
+def test_start_replaces_only_stale_sockets(server, tmp_path):
+    _, address = server
+    with pytest.raises(OSError, match="listening"):
+        asyncio.run(InferenceServer().start(address))
+
+    regular_file = tmp_path / "regular"
+    regular_file.write_text("data")
+    with pytest.raises(FileExistsError):
+        asyncio.run(InferenceServer().start(str(regular_file)))
+    assert regular_file.read_text() == "data"
+
+    stale = str(tmp_path / "stale.sock")
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(stale)
+    sock.close()
+
+    async def start_and_close():
+        restarted = InferenceServer()
+        await restarted.start(stale)
+        address = restarted.address
+        await restarted.close()
+        return address
+
+    assert asyncio.run(start_and_close()) == stale
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import tracemalloc
+
+import pytest
+
+from backend.AI_services.ai_services.instrumentation import (
+    StepMetrics,
+    LoggingSink,
+    CounterSink,
+    HistogramSink,
+    measure_step,
+    measure_step_async,
+)
+
+
+def test_measure_step_reports_sizes():
+    output, metrics = measure_step("split", str.split, "a b c")
+    assert output == ["a", "b", "c"]
+    assert metrics.step == "split"
+    assert metrics.input_size == 5
+    assert metrics.output_size == 3
+    assert metrics.wall_time >= 0
+    assert metrics.memory_peak is None
+
+
+def test_measure_step_traces_memory():
+    _, metrics = measure_step("alloc", lambda n: [0] * n, 100_000, trace_memory=True)
+    assert metrics.input_size is None
+    assert metrics.memory_peak >= 100_000 * 8
+    assert not tracemalloc.is_tracing()
+
+
+def test_measure_step_keeps_the_peak_of_other_tracers():
+    tracemalloc.start()
+    try:
+        held = [0] * 200_000
+        del held
+        _, peak_before = tracemalloc.get_traced_memory()
+        kept = []
+        _, metrics = measure_step("alloc", lambda n: kept.append([0] * n), 100_000, trace_memory=True)
+        _, peak_after = tracemalloc.get_traced_memory()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+    # the earlier, larger peak was not reset by the step
+    assert peak_after >= peak_before
+    assert metrics.memory_peak >= 100_000 * 8
+
+
+def test_measure_step_async_times_the_awaiting():
+    async def sleepy(text):
+        await asyncio.sleep(0.05)
+        return text.split()
+
+    output, metrics = asyncio.run(measure_step_async("sleepy", sleepy, "a b", trace_memory=True))
+    assert output == ["a", "b"]
+    assert metrics.wall_time >= 0.05
+    assert (metrics.input_size, metrics.output_size) == (3, 2)
+    assert metrics.memory_peak is not None
+
+
+def test_counter_sink_renders_prometheus_lines():
+    sink = CounterSink(prefix="pp")
+    sink(StepMetrics("coref", 0.5, 0.25, input_size=10, output_size=2))
+    sink(StepMetrics("coref", 1.5, 0.75, input_size=20, output_size=3))
+    lines = sink.render().splitlines()
+    assert 'pp_calls_total{step="coref"} 2' in lines
+    assert 'pp_wall_seconds_total{step="coref"} 2' in lines
+    assert 'pp_output_items_total{step="coref"} 5' in lines
+
+
+def test_histogram_sink_summary():
+    sink = HistogramSink()
+    for i in range(1, 101):
+        sink(StepMetrics("ner", i / 100, 0.0))
+    summary = sink.summary()["ner"]
+    assert summary["count"] == 100
+    assert summary["p50"] == pytest.approx(0.5)
+    assert summary["p95"] == pytest.approx(0.95)
+    assert summary["max"] == pytest.approx(1.0)
+    with pytest.raises(ValueError):
+        sink.percentile("coref", 50)
+
+
+def test_logging_sink(caplog):
+    with caplog.at_level(logging.INFO):
+        LoggingSink()(StepMetrics("coref", 0.1, 0.1))
+    assert "step=coref" in caplog.text
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from backend.AI_services.ai_services.normalisation import normalise_text, normalise_many
+
+
+def _reference(text):
+    return "".join([char for char in text.lower() if char.isalnum() or char.isspace()]).strip()
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "",
+        "  In 1917, the Bolsheviks (led by Lenin) seized power!  ",
+        "snake_case and under_scores",
+        "В 1917 году — «Ленин» вернулся в Петроград.",
+        "İstanbul ǅ ß ΣΑΣ ٣ ½ \x1c  end.",
+    ],
+)
+def test_matches_character_filter(text):
+    assert normalise_text(text) == _reference(text)
+
+
+def test_matches_character_filter_on_random_unicode():
+    rng = random.Random(42)
+    alphabet = [chr(code) for code in range(0x3000) if not 0xD800 <= code < 0xE000]
+    for _ in range(200):
+        text = "".join(rng.choice(alphabet) for _ in range(100))
+        assert normalise_text(text) == _reference(text)
+
+
+def test_normalise_many_keeps_order():
+    assert normalise_many(["B!", "a?"]) == ["b", "a"]
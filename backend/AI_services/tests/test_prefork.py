@@ -0,0 +1,112 @@
+import gc
+import json
+import os
+import sys
+import types
+
+import pytest
+
+from backend.AI_services.ai_services.preprocessing import Pipeline
+from backend.AI_services.ai_services.prefork import MemoryUsage, PreforkServer, _iter_modules, _parse_smaps, freeze_models
+
+SMAPS_ROLLUP = """00400000-7ffd1c5e1000 ---p 00000000 00:00 0                      [rollup]
+Rss:              204800 kB
+Pss:               61440 kB
+Shared_Clean:     143360 kB
+Shared_Dirty:       4096 kB
+Private_Clean:      8192 kB
+Private_Dirty:     49152 kB
+Referenced:       204800 kB
+"""
+
+
+def test_parse_smaps():
+    assert _parse_smaps(SMAPS_ROLLUP) == MemoryUsage(
+        rss=204800 * 1024,
+        shared=(143360 + 4096) * 1024,
+        private=(8192 + 49152) * 1024,
+        pss=61440 * 1024,
+    )
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="fork and /proc are required")
+def test_workers_share_the_loaded_object():
+    read_fd, write_fd = os.pipe()
+
+    def load():
+        return bytearray(32 * 1024 * 1024)
+
+    def worker(loaded, sock):
+        report = {"size": len(loaded), "port": sock.getsockname()[1]}
+        os.write(write_fd, (json.dumps(report) + "\n").encode())
+
+    server = PreforkServer(load, worker, port=0, n_workers=2, restart_workers=False)
+    server.run()
+    os.close(write_fd)
+    with os.fdopen(read_fd) as pipe:
+        reports = [json.loads(line) for line in pipe]
+
+    assert len(reports) == 2
+    assert all(report == {"size": 32 * 1024 * 1024, "port": server.port} for report in reports)
+    assert not server.workers
+
+
+class _Module(object):
+    """
+    Stand-in for ``torch.nn.Module``.
+    """
+
+    def __init__(self):
+        self.training = True
+        self.requires_grad = True
+        self.submodule = None
+
+    def eval(self):
+        self.training = False
+
+    def requires_grad_(self, requires_grad):
+        self.requires_grad = requires_grad
+
+
+class _Holder(object):
+    def __init__(self, **attrs):
+        self.__dict__.update(attrs)
+
+
+def _fact_checker():
+    # FactCheckerPipeline -> processing_pipeline -> steps -> CorefResolver -> LingMessCoref -> model
+    coref_model = _Module()
+    coref_model.submodule = _Module()
+    resolver = _Holder(model=_Holder(model=coref_model), annotator=_Holder(nlp=_Holder()))
+    checker = _Holder(
+        model=_Holder(model=_Module()),
+        processing_pipeline=Pipeline([("coref", resolver)]),
+        storage=_Holder(metadata=[{"id": i} for i in range(3)]),
+        module_ref=os,
+        class_ref=_Module,
+    )
+    checker.itself = checker
+    return checker, coref_model
+
+
+def test_modules_deep_in_pipelines_are_found():
+    checker, coref_model = _fact_checker()
+    modules = list(_iter_modules(checker, _Module, set()))
+    assert modules == [checker.model.model, coref_model]
+
+
+def test_freeze_models_reaches_every_model(monkeypatch):
+    grad_enabled = []
+    torch = types.SimpleNamespace(nn=types.SimpleNamespace(Module=_Module), set_grad_enabled=grad_enabled.append)
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    checker, coref_model = _fact_checker()
+    try:
+        assert freeze_models(checker) == 2
+    finally:
+        gc.unfreeze()
+
+    assert grad_enabled == [False]
+    for module in (checker.model.model, coref_model):
+        assert not module.training and not module.requires_grad
+    # submodules are frozen by their root module
+    assert coref_model.submodule.training
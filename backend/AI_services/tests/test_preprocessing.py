@@ -0,0 +1,148 @@
+import pytest
+
+from backend.AI_services.ai_services import caching
+from backend.AI_services.ai_services.caching import StepCache
+from backend.AI_services.ai_services.preprocessing import Pipeline
+
+
+def _upper(text: str) -> str:
+    return text.upper()
+
+
+def _exclaim(text: str) -> str:
+    return text + "!"
+
+
+class _BatchReverse(object):
+    cacheable = True
+
+    def __init__(self):
+        self.batches = []
+
+    def cache_key(self) -> str:
+        return "_BatchReverse"
+
+    def __call__(self, text: str) -> str:
+        return text[::-1]
+
+    def batch(self, texts):
+        self.batches.append(list(texts))
+        return [text[::-1] for text in texts]
+
+
+class _Consumed(object):
+    """
+    Iterable counting how many items were read from it.
+    """
+
+    def __init__(self, items):
+        self.items = items
+        self.read = 0
+
+    def __iter__(self):
+        for item in self.items:
+            self.read += 1
+            yield item
+
+
+TEXTS = ["tsar", "duma", "soviet", "bolshevik", "menshevik", "zemstvo", "kulak"]
+
+
+def _pipeline(**kwargs):
+    return Pipeline([("upper", _upper), ("reverse", _BatchReverse()), ("exclaim", _exclaim)], **kwargs)
+
+
+def test_batch_matches_call_per_item():
+    pipeline = _pipeline()
+    assert pipeline.batch(TEXTS) == [pipeline(text) for text in TEXTS]
+    assert pipeline.batch([]) == []
+
+
+def test_batch_steps_receive_the_whole_list():
+    pipeline = _pipeline()
+    pipeline.batch(TEXTS)
+    assert pipeline["reverse"].batches == [[text.upper() for text in TEXTS]]
+
+
+class _FirstOnly(object):
+    def __call__(self, text):
+        return text
+
+    def batch(self, texts):
+        return texts[:1]
+
+
+def test_batch_rejects_steps_losing_items():
+    pipeline = Pipeline([("first", _FirstOnly())])
+    with pytest.raises(ValueError):
+        pipeline.batch(TEXTS)
+
+
+def test_nested_pipelines_are_batched():
+    inner = _pipeline()
+    outer = Pipeline([("inner", inner), ("exclaim", _exclaim)])
+    assert outer.batch(TEXTS) == [outer(text) for text in TEXTS]
+    assert len(inner["reverse"].batches) == 1
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3, len(TEXTS), len(TEXTS) + 1])
+def test_map_matches_call_in_input_order(batch_size):
+    pipeline = _pipeline()
+    assert list(pipeline.map(TEXTS, batch_size=batch_size)) == [pipeline(text) for text in TEXTS]
+    # the last batch holds the remainder when the batch size does not divide the input
+    sizes = [len(batch) for batch in pipeline["reverse"].batches]
+    assert sum(sizes) == len(TEXTS)
+    assert all(size == batch_size for size in sizes[:-1])
+
+
+def test_map_reads_one_batch_at_a_time():
+    pipeline, texts = _pipeline(), _Consumed(TEXTS)
+    outputs = pipeline.map(texts, batch_size=3)
+    assert texts.read == 0
+    assert next(outputs) == pipeline(TEXTS[0])
+    assert texts.read == 3
+    assert len(list(outputs)) == len(TEXTS) - 1
+
+
+def test_map_rejects_empty_batches():
+    with pytest.raises(ValueError):
+        list(_pipeline().map(TEXTS, batch_size=0))
+
+
+def test_batch_reports_every_step():
+    recorded = []
+    _pipeline(sinks=[recorded.append]).batch(TEXTS)
+    assert [metrics.step for metrics in recorded] == ["upper", "reverse", "exclaim"]
+    assert all(metrics.input_size == len(TEXTS) for metrics in recorded)
+
+
+def test_batch_goes_through_the_cache():
+    pipeline = _pipeline(cache=StepCache())
+    pipeline.batch(TEXTS[:3])
+    assert pipeline.batch(TEXTS) == [pipeline(text) for text in TEXTS]
+    # only the inputs not seen before reach the batch step
+    assert pipeline["reverse"].batches == [
+        [text.upper() for text in TEXTS[:3]], [text.upper() for text in TEXTS[3:]]
+    ]
+
+
+def test_steps_are_only_cached_when_cacheable():
+    pipeline = _pipeline(cache=StepCache())
+    pipeline.register("lower", str.lower, cacheable=True)
+    assert [name for name, _ in pipeline if pipeline.is_cached(name)] == ["reverse", "lower"]
+    pipeline(TEXTS[0])
+    assert sorted(pipeline.cache.stats()) == ["lower", "reverse"]
+
+
+def test_cached_item_steps_are_fingerprinted_once_per_batch(monkeypatch):
+    fingerprints, step_fingerprint = [], caching.step_fingerprint
+
+    def counting_fingerprint(func):
+        fingerprints.append(func)
+        return step_fingerprint(func)
+
+    monkeypatch.setattr(caching, "step_fingerprint", counting_fingerprint)
+    pipeline = Pipeline(cache=StepCache())
+    pipeline.register("upper", _upper, cacheable=True)
+    assert pipeline.batch(TEXTS) == [text.upper() for text in TEXTS]
+    assert fingerprints == [_upper]
@@ -0,0 +1,45 @@
+import pickle
+
+import pytest
+
+from backend.AI_services.ai_services.sentence import Token, SentenceProposal
+
+
+def test_token_has_no_instance_dict():
+    token = Token("word", 0, 4)
+    assert not hasattr(token, "__dict__")
+    with pytest.raises(AttributeError):
+        token.label = "NOUN"
+
+
+def test_token_rejects_negative_span():
+    with pytest.raises(ValueError):
+        Token("word", 4, 0)
+
+
+def test_sentence_proposal_joins_words_and_punctuation():
+    tokens = [
+        Token("Lenin", 0, 5),
+        Token("returned", 6, 14),
+        Token("in", 15, 17),
+        Token("1917", 18, 22),
+        Token(".", 22, 23),
+    ]
+    sentence = SentenceProposal(tokens=tokens, index=3)
+    assert sentence == "Lenin returned in 1917."
+    assert sentence.index == 3
+    assert sentence.tokens[0].start == 0
+    assert sentence.tokens[-1].end == 23
+
+
+def test_sentence_proposal_keeps_empty_tokens():
+    sentence = SentenceProposal(tokens=[Token("", 0, 0), Token("war", 1, 4)], index=0)
+    assert sentence == " war"
+
+
+def test_sentence_proposal_pickles():
+    sentence = SentenceProposal(tokens=[Token("Stalin", 0, 6), Token("died", 7, 11)], index=2)
+    restored = pickle.loads(pickle.dumps(sentence))
+    assert restored == sentence
+    assert restored.index == 2
+    assert [(t.text, t.start, t.end) for t in restored.tokens] == [("Stalin", 0, 6), ("died", 7, 11)]
@@ -0,0 +1,71 @@
+import os
+import sys
+import types
+
+import pytest
+
+from backend.AI_services.ai_services.threads import (
+    THREAD_ENV_VARIABLES,
+    ThreadBudget,
+    limit_threads,
+    set_thread_budget,
+    split_thread_budget,
+)
+
+
+@pytest.mark.parametrize(
+    "n_workers, total, expected",
+    [
+        (1, 8, ThreadBudget(intra_op=8, inter_op=None)),
+        (2, 8, ThreadBudget(intra_op=4, inter_op=1)),
+        (3, 8, ThreadBudget(intra_op=2, inter_op=1)),
+        (16, 8, ThreadBudget(intra_op=1, inter_op=1)),
+    ],
+)
+def test_split_thread_budget(n_workers, total, expected):
+    assert split_thread_budget(n_workers, total) == expected
+
+
+def test_split_thread_budget_rejects_no_workers():
+    with pytest.raises(ValueError):
+        split_thread_budget(0)
+
+
+def test_set_thread_budget_exports_environment(monkeypatch):
+    for variable in THREAD_ENV_VARIABLES:
+        monkeypatch.delenv(variable, raising=False)
+    current = split_thread_budget(1)
+    try:
+        set_thread_budget(ThreadBudget(intra_op=2))
+        assert all(os.environ[variable] == "2" for variable in THREAD_ENV_VARIABLES)
+    finally:
+        set_thread_budget(current, set_environment=False)
+
+
+def test_invalid_budgets_are_rejected():
+    with pytest.raises(ValueError):
+        set_thread_budget(ThreadBudget(intra_op=0))
+    with pytest.raises(ValueError):
+        with limit_threads(0):
+            pass
+
+
+def test_limits_are_restored_when_a_later_limit_fails(monkeypatch):
+    torch = types.ModuleType("torch")
+    torch.threads = 8
+    torch.get_num_threads = lambda: torch.threads
+    torch.set_num_threads = lambda n: setattr(torch, "threads", n)
+
+    def fail(_):
+        raise RuntimeError("OpenMP is not available")
+
+    faiss = types.ModuleType("faiss")
+    faiss.omp_get_max_threads = lambda: 8
+    faiss.omp_set_num_threads = fail
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "faiss", faiss)
+
+    with pytest.raises(RuntimeError):
+        with limit_threads(2):
+            pass
+    assert torch.threads == 8
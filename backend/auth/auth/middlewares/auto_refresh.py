@@ -1,8 +1,10 @@
 import logging
 
-from fastapi import Request
+from fastapi import Response
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from supabase import Client, create_client
 
 from ..config.cfg import (
@@ -21,51 +23,70 @@ logger = logging.getLogger(__name__)
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-class AutoRefreshTokenMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        access_token = request.cookies.get(ACCESS_TOKEN)
-        refresh_token = request.cookies.get(REFRESH_TOKEN)
+class AutoRefreshTokenMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
 
-        if not access_token and not refresh_token:
-            return await self.handle_no_tokens(request, call_next)
-
-        if not access_token and refresh_token:
-            return await self.handle_only_refresh_token(
-                request, call_next, refresh_token
-            )
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        if access_token and not refresh_token:
-            return await self.handle_only_access_token(request, call_next)
+        cookies = HTTPConnection(scope).cookies
+        access_token = cookies.get(ACCESS_TOKEN)
+        refresh_token = cookies.get(REFRESH_TOKEN)
 
-        return await call_next(request)
+        if not access_token and not refresh_token:
+            await self.handle_no_tokens(scope, receive, send)
+        elif not access_token and refresh_token:
+            await self.handle_only_refresh_token(scope, receive, send, refresh_token)
+        elif access_token and not refresh_token:
+            await self.handle_only_access_token(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
-    async def handle_no_tokens(self, request: Request, call_next):
+    async def handle_no_tokens(self, scope: Scope, receive: Receive, send: Send) -> None:
         logger.info(
             "No access or refresh token found, proceeding without authentication"
         )
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
     async def handle_only_refresh_token(
-        self, request: Request, call_next, refresh_token: str
-    ):
+        self, scope: Scope, receive: Receive, send: Send, refresh_token: str
+    ) -> None:
         logger.info("No access token found, proceeding update with refresh token")
         try:
-            res = supabase.auth.refresh_session(refresh_token)
-            logger.info("Token refreshed successfully")
-            response = await call_next(request)
-            set_auth_cookies(
-                response,
-                res.session.access_token,
-                res.session.refresh_token,
-            )
-            return response
+            # the supabase client is blocking
+            res = await run_in_threadpool(supabase.auth.refresh_session, refresh_token)
+            # a refresh without a session, e.g. a revoked token, fails here as well
+            access_token, new_refresh_token = res.session.access_token, res.session.refresh_token
         except Exception as e:
             logger.error(f"Failed to refresh token: {str(e)}")
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=401,
                 content={"detail": "Failed to refresh token"},
             )
+            await response(scope, receive, send)
+            return
+        logger.info("Token refreshed successfully")
+
+        cookies = [
+            header
+            for header in set_auth_cookies(
+                Response(),
+                access_token,
+                new_refresh_token,
+            ).raw_headers
+            if header[0] == b"set-cookie"
+        ]
+
+        async def send_with_cookies(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *cookies]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookies)
 
-    async def handle_only_access_token(self, request: Request, call_next):
+    async def handle_only_access_token(self, scope: Scope, receive: Receive, send: Send) -> None:
         logger.info("No refresh token found, access token found. How the fu-")
-        return await call_next(request)
+        await self.app(scope, receive, send)
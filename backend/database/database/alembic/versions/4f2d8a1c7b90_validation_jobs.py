@@ -0,0 +1,48 @@
+"""validation jobs
+
+Revision ID: 4f2d8a1c7b90
+Revises: cc1a45386328
+Create Date: 2025-06-12 10:14:02.318211
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4f2d8a1c7b90'
+down_revision: Union[str, None] = 'cc1a45386328'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('validations', sa.Column('status', sa.String(), server_default='created', nullable=False))
+    op.add_column('validations', sa.Column('progress', sa.Float(), server_default='0', nullable=False))
+    op.create_table('validation_jobs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('validation_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('worker', sa.String(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['validation_id'], ['validations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_validation_jobs_queued', 'validation_jobs', ['id'],
+        postgresql_where=sa.text("status = 'queued'")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_validation_jobs_queued', table_name='validation_jobs')
+    op.drop_table('validation_jobs')
+    op.drop_column('validations', 'progress')
+    op.drop_column('validations', 'status')
@@ -0,0 +1,44 @@
+"""foreign key indexes
+
+Revision ID: d1c5e7a9b3f2
+Revises: 9b3e6f0d2a41
+Create Date: 2025-06-18 14:22:51.870316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1c5e7a9b3f2'
+down_revision: Union[str, None] = '9b3e6f0d2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # documents are paged by keyset on (was_created, id), which skips NULL creation times
+    op.execute("UPDATE documents SET was_created = now() WHERE was_created IS NULL")
+    op.alter_column('documents', 'was_created', existing_type=sa.DateTime(), nullable=False,
+                    existing_server_default=sa.text('now()'))
+    op.create_index('ix_documents_user_id_was_created', 'documents', ['user_id', 'was_created', 'id'], unique=False)
+    op.create_index(op.f('ix_validations_user_id'), 'validations', ['user_id'], unique=False)
+    op.create_index(op.f('ix_validations_document_id'), 'validations', ['document_id'], unique=False)
+    op.create_index(op.f('ix_errors_validation_id'), 'errors', ['validation_id'], unique=False)
+    op.create_index(op.f('ix_validation_jobs_validation_id'), 'validation_jobs', ['validation_id'], unique=False)
+    op.create_index(op.f('ix_document_sections_validation_id'), 'document_sections', ['validation_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_document_sections_validation_id'), table_name='document_sections')
+    op.drop_index(op.f('ix_validation_jobs_validation_id'), table_name='validation_jobs')
+    op.drop_index(op.f('ix_errors_validation_id'), table_name='errors')
+    op.drop_index(op.f('ix_validations_document_id'), table_name='validations')
+    op.drop_index(op.f('ix_validations_user_id'), table_name='validations')
+    op.drop_index('ix_documents_user_id_was_created', table_name='documents')
+    op.alter_column('documents', 'was_created', existing_type=sa.DateTime(), nullable=True,
+                    existing_server_default=sa.text('now()'))
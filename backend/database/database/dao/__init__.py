@@ -2,3 +2,5 @@ from .document import DocumentDAO
 from .user import UserDAO
 from .error import ErrorDAO
 from .validation import ValidationDAO
+from .validation_job import ValidationJobDAO
+from .document_section import DocumentSectionDAO
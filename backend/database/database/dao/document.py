@@ -1,7 +1,10 @@
 from ..models.documents import Document
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy import Result, ScalarResult
+import datetime
+from collections.abc import Sequence
+from typing import Optional
+from sqlalchemy import select, update, delete, insert, tuple_
+from sqlalchemy import Result, Row, ScalarResult
 
 from ..db.dao import TemplateDAO, construct_dao
 
@@ -23,5 +26,48 @@ class _DocumentDAO(_document_dao):
         result = await sess.execute(stmt)
         return result.scalars().all()
 
+    @staticmethod
+    async def get_document_page_by_user_id(
+        user_id: int, limit: int, after: Optional[tuple[datetime.datetime, int]], sess: AsyncSession
+    ) -> Sequence[Row]:
+        """
+        Returns a page of the documents of a given user ID, newest first, without their content.
+        Pages are read by keyset on (was_created, id), so deep pages cost as little as the first one.
+
+        :param user_id: The ID of the user whose documents are to be fetched.
+        :param limit: The maximum number of documents to return.
+        :param after: The (was_created, id) of the last document of the previous page, None for the first page.
+        :param sess: The AsyncSession instance.
+        :return: Rows with the id, the title and the creation date of the documents.
+        """
+        stmt = (
+            select(Document.id, Document.title, Document.was_created)
+            .where(Document.user_id == user_id)
+            .order_by(Document.was_created.desc(), Document.id.desc())
+            .limit(limit)
+        )
+        if after is not None:
+            stmt = stmt.where(tuple_(Document.was_created, Document.id) < tuple_(*after))
+        return (await sess.execute(stmt)).all()
+
+    @staticmethod
+    async def insert_returning(user_id: int, title: str, content: str, sess: AsyncSession) -> Row:
+        """
+        Inserts a document with a single INSERT ... RETURNING statement, without
+        loading the content back into an ORM instance.
+
+        :param user_id: The ID of the user owning the document.
+        :param title: The title of the document.
+        :param content: The content of the document.
+        :param sess: The AsyncSession instance.
+        :return: A row with the id, the title and the creation date of the document.
+        """
+        stmt = (
+            insert(Document)
+            .values(user_id=user_id, title=title, content=content)
+            .returning(Document.id, Document.title, Document.was_created)
+        )
+        return (await sess.execute(stmt)).one()
+
 
 DocumentDAO = _DocumentDAO(Document)
@@ -1,14 +1,68 @@
-from models.document_sections import DocumentSection
-from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+from ..models.document_sections import DocumentSection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete
+from sqlalchemy import ScalarResult
 
-from db.dao import TemplateDAO, construct_dao
+from ..db.dao import TemplateDAO, construct_dao
 
 
 _document_section_dao = construct_dao(DocumentSection)
 
-class _Document_SectionDAO(_document_section_dao):
-    ...
+class _DocumentSectionDAO(_document_section_dao):
 
+    @staticmethod
+    async def get_where_document_id(document_id: int, sess: AsyncSession) -> ScalarResult[DocumentSection]:
+        """
+        Returns the sections of a given document as they were last checked, in document order.
 
-Document_SectionDAO = _Document_SectionDAO(DocumentSection)
+        :param document_id: The ID of the document whose sections are to be fetched.
+        :param sess: The AsyncSession instance.
+        :return: A list of DocumentSection objects.
+        """
+        stmt = (
+            select(DocumentSection)
+            .where(DocumentSection.document_id == document_id)
+            .order_by(DocumentSection.position)
+        )
+        result = await sess.execute(stmt)
+        return result.scalars().all()
+
+    @staticmethod
+    async def delete_where_document_id(document_id: int, sess: AsyncSession) -> None:
+        """
+        Deletes the sections of a given document, so that its next validation checks every section.
+
+        :param document_id: The ID of the document whose sections are to be deleted.
+        :param sess: The AsyncSession instance.
+        """
+        await sess.execute(delete(DocumentSection).where(DocumentSection.document_id == document_id))
+
+    async def replace_for_document(
+        self, document_id: int, validation_id: int, sections: list[tuple[int, int, str]], sess: AsyncSession
+    ) -> None:
+        """
+        Replaces the sections of a document by the sections checked by a validation.
+
+        :param document_id: The ID of the document.
+        :param validation_id: The ID of the validation holding the errors of the sections.
+        :param sections: The offset, the length and the hash of every section, in document order.
+        :param sess: The AsyncSession instance.
+        """
+        await self.delete_where_document_id(document_id, sess)
+        await self.insert_many(
+            [
+                {
+                    "document_id": document_id,
+                    "validation_id": validation_id,
+                    "position": position,
+                    "offset": offset,
+                    "length": length,
+                    "hash": section_hash,
+                }
+                for position, (offset, length, section_hash) in enumerate(sections)
+            ],
+            sess,
+        )
+
+
+DocumentSectionDAO = _DocumentSectionDAO(DocumentSection)
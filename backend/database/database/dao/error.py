@@ -1,7 +1,8 @@
 from ..models.errors import Error
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, update, delete, insert
 from sqlalchemy import Result, ScalarResult
+from typing import Optional
 
 from ..db.dao import TemplateDAO, construct_dao
 
@@ -21,5 +22,38 @@ class _ErrorDAO(_error_dao):
         stmt = delete(Error).where(Error.validation_id == validation_id)
         await sess.execute(stmt)
 
+    @staticmethod
+    async def get_where_validation_id(validation_id: int, sess: AsyncSession) -> ScalarResult[Error]:
+        """
+        Returns all errors associated with a given validation ID.
+
+        :param validation_id: The ID of the validation whose errors are to be fetched.
+        :param sess: The AsyncSession instance.
+        :return: A list of Error objects.
+        """
+        stmt = select(Error).where(Error.validation_id == validation_id).order_by(Error.id)
+        result = await sess.execute(stmt)
+        return result.scalars().all()
+
+    async def create_for_validation(
+        self, validation_id: int, errors: list[str], sess: AsyncSession, resolved: Optional[list[bool]] = None
+    ) -> None:
+        """
+        Inserts the errors found by a validation with a single executemany statement.
+
+        :param validation_id: The ID of the validation the errors belong to.
+        :param errors: The serialized errors.
+        :param sess: The AsyncSession instance.
+        :param resolved: Whether each error is resolved, e.g. for errors carried forward. None if none is.
+        """
+        resolved = resolved or [False] * len(errors)
+        await self.insert_many(
+            [
+                {"validation_id": validation_id, "error": error, "resolved": is_resolved}
+                for error, is_resolved in zip(errors, resolved)
+            ],
+            sess,
+        )
+
 
 ErrorDAO = _ErrorDAO(Error)
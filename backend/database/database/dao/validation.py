@@ -1,7 +1,9 @@
 from ..models.validations import Validation
+from ..models.errors import Error
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
-from sqlalchemy import Result, ScalarResult
+from sqlalchemy import select, update, delete, func
+from sqlalchemy import Result, Row, ScalarResult
+from sqlalchemy.orm import joinedload
 from typing import Optional
 
 from ..db.dao import TemplateDAO, construct_dao
@@ -22,5 +24,74 @@ class _ValidationDAO(_validation_dao):
         result = await sess.execute(stmt)
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_for_update(pk: int, sess: AsyncSession) -> Optional[Validation]:
+        """
+        Returns a validation and locks its row until the end of the transaction,
+        so concurrent transactions changing the same validation are serialised.
+
+        :param pk: The ID of the validation.
+        :param sess: The AsyncSession instance.
+        :return: A Validation object if found, otherwise None.
+        """
+        stmt = (
+            select(Validation)
+            .where(Validation.id == pk)
+            .with_for_update()
+            # a copy already loaded by the session is refreshed with the locked row
+            .execution_options(populate_existing=True)
+        )
+        result = await sess.execute(stmt)
+        return result.scalar_one_or_none()
+
+    @staticmethod
+    async def get_with_errors(pk: int, sess: AsyncSession) -> Optional[Validation]:
+        """
+        Returns a validation with its errors loaded by the same joined query.
+
+        :param pk: The ID of the validation.
+        :param sess: The AsyncSession instance.
+        :return: A Validation object with its errors if found, otherwise None.
+        """
+        stmt = select(Validation).where(Validation.id == pk).options(joinedload(Validation.errors))
+        result = await sess.execute(stmt)
+        return result.unique().scalar_one_or_none()
+
+    @staticmethod
+    async def get_error_counts(pk: int, sess: AsyncSession) -> Optional[Row]:
+        """
+        Counts the errors of a validation without loading them.
+
+        :param pk: The ID of the validation.
+        :param sess: The AsyncSession instance.
+        :return: A row with the total and the unresolved number of errors, None if the validation is not found.
+        """
+        stmt = (
+            select(
+                func.count(Error.id).label("total"),
+                func.count(Error.id).filter(Error.resolved.is_(False)).label("unresolved"),
+            )
+            .select_from(Validation)
+            .outerjoin(Error, Error.validation_id == Validation.id)
+            .where(Validation.id == pk)
+            .group_by(Validation.id)
+        )
+        result = await sess.execute(stmt)
+        return result.one_or_none()
+
+    @staticmethod
+    async def set_progress(pk: int, progress: float, sess: AsyncSession, status: Optional[str] = None) -> None:
+        """
+        Updates the progress of a running validation.
+
+        :param pk: The ID of the validation.
+        :param progress: The share of the document already checked, between 0 and 1.
+        :param sess: The AsyncSession instance.
+        :param status: The new status of the validation, left unchanged if None.
+        """
+        values = {"progress": progress} if status is None else {"progress": progress, "status": status}
+        stmt = update(Validation).where(Validation.id == pk).values(**values)
+        await sess.execute(stmt)
+
 
 ValidationDAO = _ValidationDAO(Validation)
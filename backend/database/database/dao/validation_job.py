@@ -0,0 +1,148 @@
+from datetime import timedelta
+from ..models.validation_jobs import ValidationJob
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from typing import Optional
+
+from ..db.dao import TemplateDAO, construct_dao
+
+
+ACTIVE_JOB_STATUSES: tuple[str, ...] = ("queued", "running")
+
+_validation_job_dao = construct_dao(ValidationJob)
+
+class _ValidationJobDAO(_validation_job_dao):
+    async def enqueue(self, validation_id: int, sess: AsyncSession) -> ValidationJob:
+        """
+        Adds a job for a given validation ID to the queue.
+
+        :param validation_id: The ID of the validation to run.
+        :param sess: The AsyncSession instance.
+        :return: The queued ValidationJob.
+        """
+        return await self.create(ValidationJob(validation_id=validation_id, status="queued", attempts=0), sess)
+
+    async def get_active_by_validation_id(self, validation_id: int, sess: AsyncSession) -> Optional[ValidationJob]:
+        """
+        Returns the queued or running job of a given validation ID.
+
+        :param validation_id: The ID of the validation.
+        :param sess: The AsyncSession instance.
+        :return: A ValidationJob object if found, otherwise None.
+        """
+        stmt = (
+            select(ValidationJob)
+            .where(ValidationJob.validation_id == validation_id)
+            .where(ValidationJob.status.in_(ACTIVE_JOB_STATUSES))
+            .limit(1)
+        )
+        return (await sess.execute(stmt)).scalar_one_or_none()
+
+    async def claim(self, worker: str, sess: AsyncSession) -> Optional[ValidationJob]:
+        """
+        Takes the oldest queued job and marks it as running.
+        Rows locked by other workers are skipped, so concurrent workers never claim the same job.
+        The claim is only visible to other workers once the session is committed.
+
+        :param worker: The name of the worker claiming the job.
+        :param sess: The AsyncSession instance.
+        :return: The claimed ValidationJob, or None if the queue is empty.
+        """
+        stmt = (
+            select(ValidationJob)
+            .where(ValidationJob.status == "queued")
+            .order_by(ValidationJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        job: Optional[ValidationJob] = (await sess.execute(stmt)).scalar_one_or_none()
+        if job is None:
+            return None
+        job.status = "running"
+        job.worker = worker
+        job.attempts = job.attempts + 1
+        job.heartbeat_at = func.now()
+        await sess.flush()
+        return job
+
+    @staticmethod
+    async def heartbeat(job_id: int, sess: AsyncSession) -> None:
+        """
+        Records that the worker running a job is still alive.
+
+        :param job_id: The ID of the running job.
+        :param sess: The AsyncSession instance.
+        """
+        stmt = update(ValidationJob).where(ValidationJob.id == job_id).values(heartbeat_at=func.now())
+        await sess.execute(stmt)
+
+    @staticmethod
+    async def finish(job_id: int, sess: AsyncSession) -> None:
+        """
+        Marks a job as done.
+
+        :param job_id: The ID of the running job.
+        :param sess: The AsyncSession instance.
+        """
+        stmt = update(ValidationJob).where(ValidationJob.id == job_id).values(status="done", last_error=None)
+        await sess.execute(stmt)
+
+    async def fail(self, job_id: int, error: str, max_attempts: int, sess: AsyncSession) -> bool:
+        """
+        Records the failure of a job. The job is queued again until it has run ``max_attempts`` times.
+
+        :param job_id: The ID of the running job.
+        :param error: A description of the failure.
+        :param max_attempts: The number of runs after which the job is marked as failed.
+        :param sess: The AsyncSession instance.
+        :return: True if the job was queued again, False if it is marked as failed.
+        """
+        job: ValidationJob = await self.get_scalar(job_id, sess)
+        job.status = "queued" if job.attempts < max_attempts else "failed"
+        job.last_error = error
+        await sess.flush()
+        return job.status == "queued"
+
+    @staticmethod
+    async def fail_stale(timeout: timedelta, max_attempts: int, sess: AsyncSession) -> list[int]:
+        """
+        Marks as failed the running jobs whose worker stopped sending heartbeats
+        and which already ran ``max_attempts`` times, e.g. jobs crashing their worker.
+
+        :param timeout: Time without a heartbeat after which a job is considered abandoned.
+        :param max_attempts: The number of runs after which a job is marked as failed.
+        :param sess: The AsyncSession instance.
+        :return: The validation IDs of the failed jobs.
+        """
+        stmt = (
+            update(ValidationJob)
+            .where(ValidationJob.status == "running")
+            .where(ValidationJob.heartbeat_at < func.now() - timeout)
+            .where(ValidationJob.attempts >= max_attempts)
+            .values(status="failed", worker=None, last_error="Worker stopped sending heartbeats")
+            .returning(ValidationJob.validation_id)
+        )
+        return list((await sess.execute(stmt)).scalars())
+
+    @staticmethod
+    async def requeue_stale(timeout: timedelta, max_attempts: int, sess: AsyncSession) -> int:
+        """
+        Queues again the running jobs whose worker stopped sending heartbeats, e.g. after a crash.
+        Jobs which already ran ``max_attempts`` times are left to ``fail_stale``.
+
+        :param timeout: Time without a heartbeat after which a job is considered abandoned.
+        :param max_attempts: The number of runs after which a job is no longer queued again.
+        :param sess: The AsyncSession instance.
+        :return: The number of jobs queued again.
+        """
+        stmt = (
+            update(ValidationJob)
+            .where(ValidationJob.status == "running")
+            .where(ValidationJob.heartbeat_at < func.now() - timeout)
+            .where(ValidationJob.attempts < max_attempts)
+            .values(status="queued", worker=None)
+        )
+        return (await sess.execute(stmt)).rowcount
+
+
+ValidationJobDAO = _ValidationJobDAO(ValidationJob)
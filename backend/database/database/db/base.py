@@ -2,3 +2,5 @@ from ..models.users import User
 from ..models.documents import Document
 from ..models.validations import Validation
 from ..models.errors import Error
+from ..models.validation_jobs import ValidationJob
+from ..models.document_sections import DocumentSection
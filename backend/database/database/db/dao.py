@@ -1,13 +1,15 @@
 from .database import Base
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Type, TypeVar, Generic
+from typing import Iterable, Optional, Sequence, Type, TypeVar, Generic
 
-from sqlalchemy import select, delete, update
+from sqlalchemy import select, delete, update, insert
+from sqlalchemy.dialects import postgresql, sqlite
 
 
 T = TypeVar("T", bound=Base)
 
+_UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class TemplateDAO(Generic[T]):
     def __init__(self, db_model: T) -> None:
@@ -21,18 +23,37 @@ class TemplateDAO(Generic[T]):
         stmt = select(self.db_model).where(self.db_model.id == id)
         return (await sess.execute(stmt)).scalar_one()
 
+    async def get_many(self, ids: Iterable[int], sess: AsyncSession) -> Sequence[T]:
+        stmt = select(self.db_model).where(self.db_model.id.in_(list(ids))).order_by(self.db_model.id)
+        return (await sess.execute(stmt)).scalars().all()
+
     async def delete(self, id: int, sess: AsyncSession) -> None:
         stmt = self.db_model.__table__.delete().where(self.db_model.id == id)
         await sess.execute(stmt)
 
+    async def delete_many(self, ids: Iterable[int], sess: AsyncSession) -> None:
+        stmt = delete(self.db_model).where(self.db_model.id.in_(list(ids)))
+        await sess.execute(stmt, execution_options={"synchronize_session": False})
+
     async def update(self, id: int, values: dict, sess: AsyncSession) -> T:
+        # RETURNING the row saves selecting it again, and refreshes it if already in the session
         stmt = (
-            self.db_model.__table__.update()
+            update(self.db_model)
             .where(self.db_model.id == id)
             .values(**values)
+            .returning(self.db_model)
+            .execution_options(populate_existing=True)
         )
-        await sess.execute(stmt)
-        return await self.get_scalar(id, sess)
+        return (await sess.execute(stmt)).scalar_one()
+
+    async def update_many(self, values: list[dict], sess: AsyncSession) -> None:
+        """
+        Updates rows by primary key in a single executemany statement.
+        Every dict holds the ``id`` of the row and the new values of its columns.
+        """
+        if not values:
+            return
+        await sess.execute(update(self.db_model), values)
 
     async def create(self, instance: T, sess: AsyncSession) -> T:
         sess.add(instance)
@@ -44,6 +65,56 @@ class TemplateDAO(Generic[T]):
         await sess.flush()
         return instances
 
+    async def insert_many(self, values: list[dict], sess: AsyncSession, returning: bool = False) -> Sequence[T]:
+        """
+        Inserts rows in a single statement, without creating ORM instances first.
+
+        :param values: The values of the columns of every row.
+        :param sess: The AsyncSession instance.
+        :param returning: Whether to return the inserted rows, loaded with ``INSERT ... RETURNING``.
+        :return: The inserted rows if ``returning`` is set, otherwise an empty list.
+        """
+        if not values:
+            return []
+        if not returning:
+            await sess.execute(insert(self.db_model), values)
+            return []
+        return (await sess.scalars(insert(self.db_model).returning(self.db_model), values)).all()
+
+    async def upsert(
+        self,
+        values: list[dict],
+        index_elements: list[str],
+        sess: AsyncSession,
+        update_columns: Optional[list[str]] = None,
+    ) -> Sequence[T]:
+        """
+        Inserts rows, or updates them when they conflict on a unique index, with ``INSERT ... ON CONFLICT``.
+
+        :param values: The values of the columns of every row.
+        :param index_elements: The columns of the unique index identifying existing rows.
+        :param sess: The AsyncSession instance.
+        :param update_columns: The columns updated on conflict. Defaults to every given column outside the index.
+        :return: The inserted or updated rows.
+        """
+        if not values:
+            return []
+        dialect: str = sess.bind.dialect.name
+        if dialect not in _UPSERT_DIALECTS:
+            raise NotImplementedError(f"Upsert is not supported on {dialect}")
+        stmt = _UPSERT_DIALECTS[dialect](self.db_model).values(values)
+        if update_columns is None:
+            update_columns = [column for column in values[0] if column not in index_elements]
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        stmt = stmt.returning(self.db_model).execution_options(populate_existing=True)
+        return (await sess.scalars(stmt)).all()
+
 
 def construct_dao(db_model: Type[T]) -> Type[TemplateDAO[T]]:
     class CustomDAO(TemplateDAO[T]):
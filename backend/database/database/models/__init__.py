@@ -2,8 +2,10 @@ from .documents import Document
 from .users import User
 from .validations import Validation
 from .errors import Error
+from .validation_jobs import ValidationJob
+from .document_sections import DocumentSection
 
 
 
 
-__all__ = ["Document", "User", "Validation", "Error"]
+__all__ = ["Document", "User", "Validation", "Error", "ValidationJob", "DocumentSection"]
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from db.database import Base
+
+
+class DocumentSection(Base):
+    """
+    A section of a document as it was last checked, identified by the hash of its text.
+    Errors of a section whose hash did not change are carried forward by the next validation.
+    """
+    __tablename__ = "document_sections"
+    __table_args__ = (
+        Index("ix_document_sections_document_id_position", "document_id", "position", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    # the validation holding the errors found in the section
+    validation_id = Column(Integer, ForeignKey("validations.id"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)
+    offset = Column(Integer, nullable=False)
+    length = Column(Integer, nullable=False)
+    hash = Column(String(64), nullable=False)
+
+    # Relationships
+    document = relationship("Document", back_populates="sections")
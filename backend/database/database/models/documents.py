@@ -1,17 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from db.database import Base
 
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        # documents are listed per user, newest first, by keyset on (was_created, id)
+        Index("ix_documents_user_id_was_created", "user_id", "was_created", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False, server_default="")
-    was_created = Column(DateTime, server_default=func.now())
+    was_created = Column(DateTime, nullable=False, server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="documents")
     validations = relationship("Validation", back_populates="document")
+    sections = relationship("DocumentSection", back_populates="document", order_by="DocumentSection.position")
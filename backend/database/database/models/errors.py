@@ -7,7 +7,7 @@ class Error(Base):
     __tablename__ = "errors"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    validation_id = Column(Integer, ForeignKey("validations.id"), nullable=False)
+    validation_id = Column(Integer, ForeignKey("validations.id"), nullable=False, index=True)
     error = Column(String, nullable=False)
     resolved = Column(Boolean, default=False, nullable=False)
 
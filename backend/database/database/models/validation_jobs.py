@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, DateTime, Index, func, text
+from sqlalchemy.orm import relationship
+from db.database import Base
+
+
+class ValidationJob(Base):
+    __tablename__ = "validation_jobs"
+    __table_args__ = (
+        # workers poll for the oldest queued job
+        Index("ix_validation_jobs_queued", "id", postgresql_where=text("status = 'queued'")),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    validation_id = Column(Integer, ForeignKey("validations.id"), nullable=False, index=True)
+    # queued -> running -> done | failed, running jobs are queued again on failure
+    status = Column(String, nullable=False, server_default="queued")
+    attempts = Column(Integer, nullable=False, server_default="0")
+    worker = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, server_default=func.now())
+    heartbeat_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    validation = relationship("Validation", back_populates="jobs")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, Boolean, Float, ForeignKey, String
 from sqlalchemy.orm import relationship
 from db.database import Base
 
@@ -7,11 +7,15 @@ class Validation(Base):
     __tablename__ = "validations"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=False, index=True)
     validated = Column(Boolean, default=False, nullable=False)
     is_valid = Column(Boolean, default=False, nullable=False)
+    # created -> queued -> running -> done | failed, updated by the validation workers
+    status = Column(String, nullable=False, server_default="created")
+    progress = Column(Float, nullable=False, server_default="0")
 
     # Relationships
     document = relationship("Document", back_populates="validations")
-    errors = relationship("Error", back_populates="validation")
+    errors = relationship("Error", back_populates="validation", order_by="Error.id")
+    jobs = relationship("ValidationJob", back_populates="validation")
@@ -0,0 +1,163 @@
+"""
+Flags the DAO queries that Postgres can only answer with a sequential scan.
+
+Every DAO query is run once against the database, inside a transaction that is rolled back,
+to capture the SQL it sends. The captured statements are then planned with
+``EXPLAIN (FORMAT JSON)`` and sequential scans are reported. Sequential scans are disabled
+while planning, so the report does not depend on the size of the tables: a local database
+with a handful of rows shows the same missing indexes as production.
+
+Usage:
+    SQLALCHEMY_DATABASE_URL=postgresql+asyncpg://... python -m database.utils.index_advisor
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+
+from ..dao import DocumentDAO, DocumentSectionDAO, ErrorDAO, UserDAO, ValidationDAO, ValidationJobDAO
+
+
+# the DAO queries served on hot paths, called with arbitrary keys
+QUERIES: dict[str, Callable[[AsyncSession], Awaitable[Any]]] = {
+    "UserDAO.get": lambda sess: UserDAO.get(1, sess),
+    "DocumentDAO.get": lambda sess: DocumentDAO.get(1, sess),
+    "DocumentDAO.get_documents_by_user_id": lambda sess: DocumentDAO.get_documents_by_user_id(1, sess),
+    "DocumentDAO.get_document_page_by_user_id": lambda sess: DocumentDAO.get_document_page_by_user_id(
+        1, 50, (datetime.datetime.now(), 1), sess
+    ),
+    "ValidationDAO.get_validation_by_document_id": lambda sess: ValidationDAO.get_validation_by_document_id(1, sess),
+    "ErrorDAO.get_where_validation_id": lambda sess: ErrorDAO.get_where_validation_id(1, sess),
+    "ErrorDAO.delete_where_validation_id": lambda sess: ErrorDAO.delete_where_validation_id(1, sess),
+    "DocumentSectionDAO.get_where_document_id": lambda sess: DocumentSectionDAO.get_where_document_id(1, sess),
+    "DocumentSectionDAO.delete_where_document_id": lambda sess: DocumentSectionDAO.delete_where_document_id(1, sess),
+    "ValidationJobDAO.get_active_by_validation_id": lambda sess: ValidationJobDAO.get_active_by_validation_id(1, sess),
+    "ValidationJobDAO.claim": lambda sess: ValidationJobDAO.claim("index-advisor", sess),
+    "ValidationJobDAO.fail_stale": lambda sess: ValidationJobDAO.fail_stale(datetime.timedelta(minutes=10), 3, sess),
+    "ValidationJobDAO.requeue_stale": lambda sess: ValidationJobDAO.requeue_stale(
+        datetime.timedelta(minutes=10), 3, sess
+    ),
+}
+
+
+@dataclass
+class QueryReport:
+    name: str
+    statement: str
+    seq_scans: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def iter_seq_scans(plan: dict[str, Any]) -> Iterator[str]:
+    """
+    Yield a description of every sequential scan of an ``EXPLAIN (FORMAT JSON)`` plan node and its children.
+    """
+    if plan.get("Node Type") == "Seq Scan":
+        description = plan.get("Relation Name", "?")
+        if "Filter" in plan:
+            description += f" (filter: {plan['Filter']})"
+        yield description
+    for child in plan.get("Plans", ()):
+        yield from iter_seq_scans(child)
+
+
+async def capture_statements(
+    conn: AsyncConnection, query: Callable[[AsyncSession], Awaitable[Any]]
+) -> list[tuple[str, Any]]:
+    """
+    Run a DAO query in a transaction that is rolled back, and return the statements it sent.
+    """
+    captured: list[tuple[str, Any]] = []
+
+    def before_cursor_execute(_conn, _cursor, statement, parameters, _context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(conn.sync_engine, "before_cursor_execute", before_cursor_execute)
+    transaction = await conn.begin()
+    sess = AsyncSession(bind=conn)
+    try:
+        await query(sess)
+    finally:
+        await sess.close()
+        await transaction.rollback()
+        event.remove(conn.sync_engine, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+async def explain(conn: AsyncConnection, statement: str, parameters: Any) -> dict[str, Any]:
+    transaction = await conn.begin()
+    try:
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+        plan = result.scalar_one()
+    finally:
+        await transaction.rollback()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+async def advise(database_url: str) -> list[QueryReport]:
+    """
+    Plan every DAO query of ``QUERIES`` and report its sequential scans.
+
+    :param database_url: The URL of a Postgres database migrated to the latest revision.
+    :return: One report per statement sent by the DAO queries.
+    """
+    engine = create_async_engine(database_url)
+    reports: list[QueryReport] = []
+    try:
+        async with engine.connect() as conn:
+            for name, query in QUERIES.items():
+                try:
+                    statements = await capture_statements(conn, query)
+                except Exception as e:
+                    reports.append(QueryReport(name, "", error=repr(e)))
+                    continue
+                for statement, parameters in statements:
+                    report = QueryReport(name, " ".join(statement.split()))
+                    try:
+                        report.seq_scans = list(iter_seq_scans(await explain(conn, statement, parameters)))
+                    except Exception as e:
+                        report.error = repr(e)
+                    reports.append(report)
+    finally:
+        await engine.dispose()
+    return reports
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Report the DAO queries planned with sequential scans.")
+    parser.add_argument("--database-url", default=os.getenv("SQLALCHEMY_DATABASE_URL"))
+    parser.add_argument("--verbose", action="store_true", help="Also print the queries using indexes.")
+    args = parser.parse_args(argv)
+    if not args.database_url:
+        parser.error("--database-url or SQLALCHEMY_DATABASE_URL must be set")
+
+    reports = asyncio.run(advise(args.database_url))
+    flagged = 0
+    for report in reports:
+        if report.error:
+            print(f"ERROR    {report.name}: {report.error}")
+        elif report.seq_scans:
+            flagged += 1
+            print(f"SEQSCAN  {report.name}: {', '.join(report.seq_scans)}")
+            print(f"         {report.statement}")
+        elif args.verbose:
+            print(f"OK       {report.name}")
+    print(f"{flagged} of {len(reports)} statements need a sequential scan")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
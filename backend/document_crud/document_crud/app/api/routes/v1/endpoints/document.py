@@ -1,20 +1,23 @@
-from fastapi import APIRouter, UploadFile, File, Request, Response, status
-from typing import List
+from fastapi import APIRouter, UploadFile, File, Query, Request, Response, status
+from typing import List, Optional
+from app.core.config.api import documents_page_size, documents_max_page_size
+from app.core.db.session import DbSession, ReadOnlySession
 from app.core.types import AsyncSession, idType
 
-from ..schemas.response.document import DocumentResponse, DocumentExtendedResponse
+from ..schemas.response.document import DocumentResponse, DocumentExtendedResponse, DocumentPageResponse
 from app.api.services import document as document_service
 from app.api.routes.v1.schemas.request.document import CreateDocumentRequest, DocumentUpdateRequest
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 
 @router.post("/", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
-async def create_document(request: Request, response: Response, schema: CreateDocumentRequest) -> DocumentResponse:
+async def create_document(request: Request, sess: DbSession, response: Response, schema: CreateDocumentRequest) -> DocumentResponse:
     """
     Create a new document for the authenticated user.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        request (Request): The HTTP request object containing user information.
+        sess (AsyncSession): The database session, committed if the request wrote anything.
         response (Response): The HTTP response object to set the status code.
         schema (CreateDocumentRequest): The schema containing the document data to be created.
 
@@ -22,32 +25,39 @@ async def create_document(request: Request, response: Response, schema: CreateDo
         DocumentResponse: The response model containing the details of the created document.
     """
     user_id: idType = request.state.user_id
-    sess: AsyncSession = request.state.sess
     response.status_code = status.HTTP_201_CREATED
     return await document_service.create_document(user_id, schema, sess)
 
-@router.get("/", response_model=List[DocumentResponse])
-async def get_documents(request: Request) -> List[DocumentResponse]:
+@router.get("/", response_model=DocumentPageResponse)
+async def get_documents(
+    request: Request,
+    sess: ReadOnlySession,
+    limit: int = Query(documents_page_size, ge=1, le=documents_max_page_size),
+    cursor: Optional[str] = None,
+) -> DocumentPageResponse:
     """
-    Retrieve a list of documents for the authenticated user.
+    Retrieve a page of documents for the authenticated user, newest first.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        request (Request): The HTTP request object containing user information.
+        sess (AsyncSession): A read-only database session.
+        limit (int): The maximum number of documents in the page.
+        cursor (Optional[str]): The ``next_cursor`` of the previous page, omitted for the first page.
 
     Returns:
-        List[DocumentResponse]: A list of response models containing the details of the documents.
+        DocumentPageResponse: The documents of the page and the cursor of the next page.
     """
     user_id: idType = request.state.user_id
-    sess: AsyncSession = request.state.sess
-    return await document_service.get_documents(user_id, sess)
+    return await document_service.get_documents(user_id, limit, cursor, sess)
 
 @router.post("/from-file", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
-async def create_document_from_file(request: Request, response: Response, file: UploadFile = File(...)) -> DocumentResponse:
+async def create_document_from_file(request: Request, sess: DbSession, response: Response, file: UploadFile = File(...)) -> DocumentResponse:
     """
     Create a new document from an uploaded file for the authenticated user.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        request (Request): The HTTP request object containing user information.
+        sess (AsyncSession): The database session, committed if the request wrote anything.
         response (Response): The HTTP response object to set the status code.
         file (UploadFile): The uploaded file to be used for creating the document.
 
@@ -55,35 +65,33 @@ async def create_document_from_file(request: Request, response: Response, file:
         DocumentResponse: The response model containing the details of the created document.
     """
     user_id: idType = request.state.user_id
-    sess: AsyncSession = request.state.sess
     response.status_code = status.HTTP_201_CREATED
     return await document_service.create_document_from_file(user_id, file, sess)
 
 @router.delete("/{pk}", response_model=None)
-async def delete_document(request: Request, response: Response, pk: idType) -> Response:
+async def delete_document(sess: DbSession, response: Response, pk: idType) -> Response:
     """
     Delete a document by its primary key.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        sess (AsyncSession): The database session, committed if the request wrote anything.
         response (Response): The HTTP response object to set the status code.
         pk (int): The primary key of the document to be deleted.
 
     Returns:
         Response: The HTTP response object with a status code indicating the result of the operation.
     """
-    sess: AsyncSession = request.state.sess
     await document_service.delete_document(pk, sess)
     response.status_code = status.HTTP_204_NO_CONTENT
     return response
 
 @router.put("/{pk}", response_model=DocumentResponse)
-async def update_document(request: Request, response: Response, pk: idType, schema: DocumentUpdateRequest) -> DocumentResponse:
+async def update_document(sess: DbSession, response: Response, pk: idType, schema: DocumentUpdateRequest) -> DocumentResponse:
     """
     Update an existing document by its primary key.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        sess (AsyncSession): The database session, committed if the request wrote anything.
         response (Response): The HTTP response object to set the status code.
         pk (int): The primary key of the document to be updated.
         schema (DocumentUpdateRequest): The schema containing the updated document data.
@@ -91,7 +99,6 @@ async def update_document(request: Request, response: Response, pk: idType, sche
     Returns:
         DocumentResponse: The response model containing the details of the updated document.
     """
-    sess: AsyncSession = request.state.sess
     document: DocumentExtendedResponse = await document_service.get_document(pk, sess)
     if DocumentUpdateRequest(**document.model_dump()) == schema:
         response.status_code = status.HTTP_304_NOT_MODIFIED
@@ -99,16 +106,15 @@ async def update_document(request: Request, response: Response, pk: idType, sche
     return await document_service.update_document(pk, schema, sess)
 
 @router.get("/{pk}", response_model=DocumentExtendedResponse)
-async def get_document(request: Request, pk: idType) -> DocumentExtendedResponse:
+async def get_document(sess: ReadOnlySession, pk: idType) -> DocumentExtendedResponse:
     """
     Retrieve a document by its primary key.
 
     Args:
-        request (Request): The HTTP request object containing user and session information.
+        sess (AsyncSession): A read-only database session.
         pk (int): The primary key of the document to be retrieved.
 
     Returns:
         DocumentExtendedResponse: The response model containing the details of the retrieved document.
     """
-    sess: AsyncSession = request.state.sess
     return await document_service.get_document(pk, sess)
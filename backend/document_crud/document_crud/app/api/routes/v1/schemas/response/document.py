@@ -1,6 +1,7 @@
 
 
 import datetime
+from typing import Optional
 from app.core.pydantic import BaseConfig
 
 
@@ -11,3 +12,7 @@ class DocumentResponse(BaseConfig):
 
 class DocumentExtendedResponse(DocumentResponse):
     content: str
+
+class DocumentPageResponse(BaseConfig):
+    items: list[DocumentResponse]
+    next_cursor: Optional[str] = None
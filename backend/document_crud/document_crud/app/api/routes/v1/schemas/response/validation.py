@@ -7,7 +7,15 @@ class DocumentValidationResponse(BaseConfig):
     id: int
     validated: bool
     is_valid: bool
+    status: str = "created"
+    progress: float = 0.0
 
 
 class DocumentValidationErrorsResponse(BaseConfig):
     errors: list[ValidationErrorResponse]
+
+
+class DocumentValidationErrorsCountResponse(BaseConfig):
+    id: int
+    total: int
+    unresolved: int
@@ -1,9 +1,13 @@
-from collections.abc import Iterable
+import os
+
 from typing import Optional
+from app.core.config.api import max_upload_size, upload_chunk_size
 from app.core.dao import DocumentDAO, Document
 from app.core.types import AsyncSession, idType, EXCEPTED_FILE_EXTENSIONS
+from app.core.utils.pagination import encode_cursor, decode_cursor
+from app.core.utils.upload import UploadTooLargeError, read_upload_text
 
-from app.api.routes.v1.schemas.response.document import DocumentResponse, DocumentExtendedResponse
+from app.api.routes.v1.schemas.response.document import DocumentResponse, DocumentExtendedResponse, DocumentPageResponse
 from app.api.routes.v1.schemas.request.document import CreateDocumentRequest, DocumentUpdateRequest
 from fastapi import HTTPException, status
 
@@ -28,23 +32,43 @@ async def create_document(user_id: idType, item: CreateDocumentRequest, sess: As
     document: Document = await DocumentDAO.create(instance, sess)
     return DocumentResponse(**document.__dict__)
 
-async def get_documents(user_id: idType, sess: AsyncSession) -> list[DocumentResponse]:
+async def get_documents(
+    user_id: idType, limit: int, cursor: Optional[str], sess: AsyncSession
+) -> DocumentPageResponse:
     """
-    Retrieve all documents associated with a specified user.
+    Retrieve a page of the documents associated with a specified user, newest first.
 
     Parameters:
     user_id (idType): The ID of the user whose documents are to be retrieved.
+    limit (int): The maximum number of documents in the page.
+    cursor (Optional[str]): The ``next_cursor`` of the previous page, None for the first page.
     sess (AsyncSession): The asynchronous session for database operations.
 
     Returns:
-    list[DocumentResponse]: A list of response objects containing the details of each document.
+    DocumentPageResponse: The documents of the page and the cursor of the next page, None on the last page.
+
+    Raises:
+    HTTPException: If the cursor is malformed.
     """
-    documents: Iterable[Document] = await DocumentDAO.get_documents_by_user_id(user_id, sess)
-    return [DocumentResponse(**doc.__dict__) for doc in documents]
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # one more row tells whether there is a next page
+    rows = await DocumentDAO.get_document_page_by_user_id(user_id, limit + 1, after, sess)
+    items: list[DocumentResponse] = [
+        DocumentResponse(id=pk, title=title, was_created=was_created) for pk, title, was_created in rows[:limit]
+    ]
+    next_cursor: Optional[str] = (
+        encode_cursor(items[-1].was_created, items[-1].id) if len(rows) > limit else None
+    )
+    return DocumentPageResponse(items=items, next_cursor=next_cursor)
 
 async def create_document_from_file(user_id: idType, file: UploadFile, sess: AsyncSession) -> DocumentResponse:
     """
     Create a new document from an uploaded file for a specified user.
+    The file is read in chunks and rejected as soon as it exceeds the maximum upload size;
+    the text of RTF files is extracted while reading.
 
     Parameters:
     user_id (idType): The ID of the user creating the document.
@@ -55,26 +79,38 @@ async def create_document_from_file(user_id: idType, file: UploadFile, sess: Asy
     DocumentResponse: The response object containing the created document's details.
 
     Raises:
-    HTTPException: If no file is provided or if the file extension is not supported.
+    HTTPException: If no file is provided, if the file extension is not supported,
+    if the file is too large or if it is not valid UTF-8.
     """
     if not file.filename:
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail="No file provided."
         )
-    if file.filename.split(".")[-1] not in EXCEPTED_FILE_EXTENSIONS:
+    extension: str = os.path.splitext(file.filename)[1].lower()
+    if extension not in EXCEPTED_FILE_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Only .txt and .rtf files are supported."
         )
-    content: bytes = await file.read()
-    instance: Document = Document(
-        user_id = user_id,
-        title = file.filename,
-        content = content.decode()
-    )
-    document: Document = await DocumentDAO.create(instance, sess)
-    return DocumentResponse(**document.__dict__)
+    if file.size is not None and file.size > max_upload_size:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Files larger than {max_upload_size} bytes are not supported."
+        )
+    try:
+        content: str = await read_upload_text(
+            file, rtf=extension == ".rtf", max_size=max_upload_size, chunk_size=upload_chunk_size
+        )
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Files must be UTF-8 encoded."
+        )
+    document = await DocumentDAO.insert_returning(user_id, file.filename, content, sess)
+    return DocumentResponse(id=document.id, title=document.title, was_created=document.was_created)
 
 async def delete_document(pk: idType, sess: AsyncSession) -> None:
     """
@@ -1,14 +1,27 @@
 from typing import Optional
 from fastapi import HTTPException, status
-
-from app.core.dao import ValidationDAO, ErrorDAO, DocumentDAO, Validation, Document
+from fastapi.responses import StreamingResponse
+
+from app.core.dao import (
+    ValidationDAO,
+    ErrorDAO,
+    DocumentDAO,
+    ValidationJobDAO,
+    DocumentSectionDAO,
+    Validation,
+    Document,
+    ValidationJob,
+)
 from app.api.routes.v1.schemas.request.validation import CreateValidationRequest
 from app.api.routes.v1.schemas.response.validation import (
     DocumentValidationResponse,
     DocumentValidationErrorsResponse,
+    DocumentValidationErrorsCountResponse,
 )
+from app.core.db.session import open_read_only_session
+from app.core.events import ValidationEventBroker, stream_validation_events
 from app.core.types import AsyncSession, idType
-from app.core.utils.validation import get_validation_schema
+from app.core.utils.validation import get_validation_schema, get_validation_error_schema
 
 
 
@@ -16,15 +29,31 @@ from app.core.utils.validation import get_validation_schema
 async def start_validation(
     pk: idType, sess: AsyncSession
 ) -> DocumentValidationResponse:
-    validation: Optional[Validation] = await ValidationDAO.get(pk, sess)
+    """
+    Queues the AI check of a document. The check itself is run by the validation workers
+    (``app.jobs.validation_worker``), which report their progress on the validation.
+
+    Parameters:
+    pk (idType): The primary key of the validation to start.
+    sess (AsyncSession): The database session used for the operation.
+
+    Returns:
+    DocumentValidationResponse: The queued validation. A validation that is already queued
+    or running is returned as is, without queuing it a second time.
+    Raises an HTTPException if the validation is not found.
+    """
+    # the row lock serialises concurrent starts, so only one of them sees no active job
+    validation: Optional[Validation] = await ValidationDAO.get_for_update(pk, sess)
     if not validation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Validation not found"
         )
-    raise HTTPException(
-        status_code=status.HTTP_400_BAD_REQUEST,
-        detail="Validation implementation for AI check is not ready yet.",
-    )
+    job: Optional[ValidationJob] = await ValidationJobDAO.get_active_by_validation_id(validation.id, sess)
+    if job is None:
+        validation.validated = False
+        validation.status = "queued"
+        validation.progress = 0.0
+        await ValidationJobDAO.enqueue(validation.id, sess)
     return get_validation_schema(validation)
 
 
@@ -37,17 +66,28 @@ async def reset_validation(pk: idType, sess: AsyncSession) -> None:
     sess (AsyncSession): The database session used for the operation.
 
     Returns:
-    None: This function does not return a value. It raises an HTTPException if the validation is not found.
+    None: This function does not return a value. It raises an HTTPException if the validation is not found,
+    or if it is queued or running, since the worker would write its errors and sections back.
     """
-    validation: Optional[Validation] = await ValidationDAO.get(pk, sess)
+    # the row lock serialises the reset with concurrent starts
+    validation: Optional[Validation] = await ValidationDAO.get_for_update(pk, sess)
     if not validation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Validation not found"
         )
+    if await ValidationJobDAO.get_active_by_validation_id(validation.id, sess) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Validation is queued or running"
+        )
 
     validation.validated = False
-    validation.is_valid = None
+    # the column is not nullable, an unchecked validation is not valid
+    validation.is_valid = False
+    validation.status = "created"
+    validation.progress = 0.0
     await ErrorDAO.delete_where_validation_id(validation.id, sess)
+    # without its errors, the sections of the document have to be checked again
+    await DocumentSectionDAO.delete_where_document_id(validation.document_id, sess)
 
 
 async def get_validation(pk: idType, sess: AsyncSession) -> DocumentValidationResponse:
@@ -69,6 +109,45 @@ async def get_validation(pk: idType, sess: AsyncSession) -> DocumentValidationRe
     return get_validation_schema(validation)
 
 
+async def get_validation_events(
+    pk: idType, broker: ValidationEventBroker, sess: AsyncSession
+) -> StreamingResponse:
+    """
+    Streams the progress of a validation as server-sent events.
+    The stream starts with the current state of the validation, then pushes
+    "progress" and "error" events as the workers produce them, and ends with
+    the final "status" event. A validation neither queued nor running only gets
+    its current state. The state is read by a short session of the stream itself,
+    no database session is held while waiting for events.
+
+    Parameters:
+    pk (idType): The primary key of the validation to follow.
+    broker (ValidationEventBroker): The broker receiving the events of the workers.
+    sess (AsyncSession): The database session used to check that the validation exists.
+
+    Returns:
+    StreamingResponse: The ``text/event-stream`` response.
+    Raises an HTTPException if the validation is not found.
+    """
+    validation: Optional[Validation] = await ValidationDAO.get(pk, sess)
+    if not validation:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Validation not found"
+        )
+
+    async def load_snapshot() -> Optional[dict]:
+        # the session of the route is closed once the response starts, the stream reads with its own
+        async with open_read_only_session() as snapshot_sess:
+            current: Optional[Validation] = await ValidationDAO.get(pk, snapshot_sess)
+            return get_validation_schema(current).model_dump() if current else None
+
+    return StreamingResponse(
+        stream_validation_events(broker, pk, load_snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 async def get_validation_errors(
     pk: idType, sess: AsyncSession
 ) -> DocumentValidationErrorsResponse:
@@ -83,12 +162,36 @@ async def get_validation_errors(
     DocumentValidationErrorsResponse: An object containing the validation errors of the document.
     Raises an HTTPException if the validation is not found.
     """
-    validation: Optional[Validation] = await ValidationDAO.get(pk, sess)
+    validation: Optional[Validation] = await ValidationDAO.get_with_errors(pk, sess)
     if not validation:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Validation not found"
         )
-    return DocumentValidationErrorsResponse(errors=validation.awaitable_attrs.errors)
+    return DocumentValidationErrorsResponse(
+        errors=[get_validation_error_schema(error) for error in validation.errors]
+    )
+
+
+async def get_validation_errors_count(
+    pk: idType, sess: AsyncSession
+) -> DocumentValidationErrorsCountResponse:
+    """
+    Counts the validation errors for a given document, without loading them.
+
+    Parameters:
+    pk (idType): The primary key of the validation to count errors for.
+    sess (AsyncSession): The database session used for the operation.
+
+    Returns:
+    DocumentValidationErrorsCountResponse: The total and the unresolved number of errors.
+    Raises an HTTPException if the validation is not found.
+    """
+    counts = await ValidationDAO.get_error_counts(pk, sess)
+    if counts is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Validation not found"
+        )
+    return DocumentValidationErrorsCountResponse(id=pk, total=counts.total, unresolved=counts.unresolved)
 
 
 async def create_validation(
@@ -1,9 +1,20 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .middlewares import *  # contains ONLY middlewares
 
 from .config.api import origins, methods, headers, allow_credentials, max_age
 from .config.metadata import version
+from .db.connection import SQLALCHEMY_DATABASE_URL
+from .events import PostgresValidationEventBroker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await app.state.validation_events.start()
+    yield
+    await app.state.validation_events.stop()
 
 
 app = FastAPI(
@@ -12,12 +23,14 @@ app = FastAPI(
     contact={
         "name": "AIMES Tech",
     },
+    lifespan=lifespan,
 )
+app.state.validation_events = PostgresValidationEventBroker(SQLALCHEMY_DATABASE_URL)
 
-app.add_middleware(DatabaseAsyncSessionManager)
+# routes take their database session as a dependency, see app.core.db.session
+# the last middleware added is the outermost one: errors are turned into responses inside the CORS middlewares
+app.add_middleware(InternalErrorMiddleware)
 app.add_middleware(DynamicCORSMiddleware)
-
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
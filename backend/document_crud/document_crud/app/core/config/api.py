@@ -6,3 +6,10 @@ methods: list[str] = ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"]
 headers: list[str] = ["*"]
 allow_credentials: bool = True
 max_age: int = 3600
+
+# uploads are read in chunks and rejected as soon as they exceed the limit
+max_upload_size: int = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))
+upload_chunk_size: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 64 * 1024))
+
+documents_page_size: int = int(os.getenv("DOCUMENTS_PAGE_SIZE", 50))
+documents_max_page_size: int = int(os.getenv("DOCUMENTS_MAX_PAGE_SIZE", 200))
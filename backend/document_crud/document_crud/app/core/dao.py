@@ -1,2 +1,2 @@
-from database.DAO import DocumentDAO, UserDAO, ErrorDAO, ValidationDAO
-from database.models import Document, User, Error, Validation
+from database.DAO import DocumentDAO, UserDAO, ErrorDAO, ValidationDAO, ValidationJobDAO, DocumentSectionDAO
+from database.models import Document, User, Error, Validation, ValidationJob, DocumentSection
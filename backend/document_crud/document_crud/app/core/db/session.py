@@ -0,0 +1,78 @@
+"""
+Per-route database sessions, injected as FastAPI dependencies.
+
+Routes declare the session they need, so requests that never touch the database
+(CORS preflights, 404s, routes without a session) cost no pool slot. A session only
+checks out a connection when it runs its first statement, and is only committed if it
+wrote something. Read-only sessions run in a ``READ ONLY`` transaction.
+
+Usage:
+    async def get_document(pk: idType, sess: ReadOnlySession) -> DocumentExtendedResponse: ...
+"""
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Annotated
+
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.db.connection import SessionLocal, AsyncSession
+
+
+class WriteTrackingSession(Session):
+    """
+    Records in ``info["written"]`` whether the session flushed or executed anything but a SELECT.
+    """
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _track_statement(orm_execute_state: ORMExecuteState) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["written"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _track_flush(session: Session, flush_context) -> None:
+    session.info["written"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_begin")
+def _begin_read_only(session: Session, transaction, connection) -> None:
+    # must be the first statement of the transaction
+    if session.info.get("read_only") and connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """
+    Yield a session committed after the route if it wrote anything, rolled back otherwise.
+    """
+    async with SessionLocal(sync_session_class=WriteTrackingSession) as sess:
+        yield sess
+        # objects added or changed but never flushed by the route are written here
+        await sess.flush()
+        if sess.sync_session.info.get("written"):
+            await sess.commit()
+
+
+@asynccontextmanager
+async def open_read_only_session() -> AsyncIterator[AsyncSession]:
+    """
+    Open a session running in a read-only transaction, never committed.
+    Unlike the dependencies, it can be used after the route returned, e.g. by a streaming response.
+    """
+    async with SessionLocal(sync_session_class=WriteTrackingSession, info={"read_only": True}) as sess:
+        yield sess
+
+
+async def get_read_only_session() -> AsyncIterator[AsyncSession]:
+    """
+    Yield a session running in a read-only transaction, never committed.
+    """
+    async with open_read_only_session() as sess:
+        yield sess
+
+
+DbSession = Annotated[AsyncSession, Depends(get_session)]
+ReadOnlySession = Annotated[AsyncSession, Depends(get_read_only_session)]
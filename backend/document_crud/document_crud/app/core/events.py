@@ -0,0 +1,209 @@
+"""
+Validation progress events, published by the validation workers and streamed to clients
+by ``GET /validation/{pk}/events``.
+
+Workers publish with ``publish_validation_event`` inside their own transaction, through
+Postgres ``NOTIFY``, so an event is delivered once the progress it describes is committed.
+Every API process keeps a single ``LISTEN`` connection and fans the events out to the
+in-process subscribers of each validation, so streaming clients cost no database session.
+"""
+import asyncio
+import json
+import logging
+
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, Optional
+
+from sqlalchemy import func, select
+
+from app.core.types import AsyncSession, idType
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_EVENTS_CHANNEL: str = "validation_events"
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD: int = 7900
+FINAL_VALIDATION_STATUSES: frozenset[str] = frozenset({"done", "failed"})
+# only these validations still produce events
+ACTIVE_VALIDATION_STATUSES: frozenset[str] = frozenset({"queued", "running"})
+
+
+def encode_event(validation_id: idType, event: str, data: dict[str, Any]) -> str:
+    payload: str = json.dumps({"validation_id": validation_id, "event": event, "data": data}, ensure_ascii=False)
+    if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+        # clients fetch the full data with the regular endpoints
+        payload = json.dumps({"validation_id": validation_id, "event": event, "data": {"truncated": True}})
+    return payload
+
+
+async def publish_validation_event(validation_id: idType, event: str, data: dict[str, Any], sess: AsyncSession) -> None:
+    """
+    Publish a validation event. It is delivered when the session is committed.
+    Without Postgres, e.g. on SQLite, there is no ``NOTIFY`` and the event is dropped.
+
+    Parameters:
+    validation_id (idType): The ID of the validation.
+    event (str): The event type: "status", "progress" or "error".
+    data (dict[str, Any]): The JSON-serializable content of the event.
+    sess (AsyncSession): The session of the transaction the event belongs to.
+    """
+    if sess.bind.dialect.name != "postgresql":
+        return
+    await sess.execute(select(func.pg_notify(VALIDATION_EVENTS_CHANNEL, encode_event(validation_id, event, data))))
+
+
+class ValidationEventBroker:
+    """
+    Fans validation events out to the in-process subscribers of each validation.
+    Used as is, it only carries events published in the same process with ``dispatch``.
+    """
+
+    def __init__(self, queue_size: int = 256) -> None:
+        self.queue_size: int = queue_size
+        self._subscribers: dict[idType, set[asyncio.Queue]] = defaultdict(set)
+
+    async def start(self) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+    def subscribe(self, validation_id: idType) -> asyncio.Queue:
+        """
+        Start receiving the events of a validation.
+
+        Parameters:
+        validation_id (idType): The ID of the validation.
+
+        Returns:
+        asyncio.Queue: The queue the events are put in, as (event, data) tuples.
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[validation_id].add(queue)
+        return queue
+
+    def unsubscribe(self, validation_id: idType, queue: asyncio.Queue) -> None:
+        subscribers: Optional[set[asyncio.Queue]] = self._subscribers.get(validation_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[validation_id]
+
+    def dispatch(self, validation_id: idType, event: str, data: dict[str, Any]) -> None:
+        """
+        Deliver an event to the subscribers of a validation.
+        Subscribers too slow to keep up lose their oldest events.
+        """
+        for queue in self._subscribers.get(validation_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait((event, data))
+
+    def dispatch_payload(self, payload: str) -> None:
+        try:
+            message: dict[str, Any] = json.loads(payload)
+            self.dispatch(message["validation_id"], message["event"], message["data"])
+        except (ValueError, KeyError):
+            logger.warning("Ignoring malformed validation event: %r", payload)
+
+
+class PostgresValidationEventBroker(ValidationEventBroker):
+    """
+    Receives the events published by the validation workers with Postgres ``LISTEN``.
+    """
+
+    def __init__(self, dsn: str, queue_size: int = 256, reconnect_delay: float = 1.0) -> None:
+        """
+        Parameters:
+        dsn (str): The database URL. SQLAlchemy driver suffixes such as ``+asyncpg`` are accepted.
+        queue_size (int): Number of events kept for a subscriber that does not read them.
+        reconnect_delay (float): Seconds to wait before listening again after a lost connection.
+        """
+        super().__init__(queue_size)
+        self.dsn: str = dsn.replace("+asyncpg", "")
+        self.reconnect_delay: float = reconnect_delay
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        import asyncpg
+
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost: asyncio.Event = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(
+                    VALIDATION_EVENTS_CHANNEL, lambda *args: self.dispatch_payload(args[-1])
+                )
+                await lost.wait()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Listening to validation events failed")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+async def stream_validation_events(
+    broker: ValidationEventBroker,
+    validation_id: idType,
+    load_snapshot: Callable[[], Awaitable[Optional[dict[str, Any]]]],
+    keepalive: float = 15.0,
+) -> AsyncIterator[str]:
+    """
+    Format the events of a validation as a server-sent events stream.
+    The stream starts with the current state of the validation and ends with its final status,
+    or right after the current state if the validation is neither queued nor running.
+    The subscription is only taken once the stream is iterated, and always released by it.
+
+    Parameters:
+    broker (ValidationEventBroker): The broker to subscribe to.
+    validation_id (idType): The ID of the validation.
+    load_snapshot (Callable[[], Awaitable[Optional[dict[str, Any]]]]): Reads the state of the validation,
+        None if it does not exist anymore. It is called after subscribing, so no event is missed.
+    keepalive (float): Seconds between comments keeping idle connections open.
+
+    Returns:
+    AsyncIterator[str]: The server-sent events.
+    """
+    queue: asyncio.Queue = broker.subscribe(validation_id)
+    try:
+        snapshot: Optional[dict[str, Any]] = await load_snapshot()
+        if snapshot is None:
+            return
+        yield _format_sse("status", snapshot)
+        if snapshot.get("status") not in ACTIVE_VALIDATION_STATUSES:
+            return
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _format_sse(event, data)
+            if event == "status" and data.get("status") in FINAL_VALIDATION_STATUSES:
+                return
+    finally:
+        broker.unsubscribe(validation_id, queue)
+
+
+def _format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
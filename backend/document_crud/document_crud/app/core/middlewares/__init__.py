@@ -1,5 +1,5 @@
 from .dynamic_cors import DynamicCORSMiddleware
-from .database import DatabaseAsyncSessionManager
+from .errors import InternalErrorMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
-__all__ = ["DynamicCORSMiddleware", "CORSMiddleware", "DatabaseAsyncSessionManager"]
+__all__ = ["DynamicCORSMiddleware", "CORSMiddleware", "InternalErrorMiddleware"]
@@ -0,0 +1,41 @@
+import logging
+
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from ..pydantic import BaseResponse
+
+logger = logging.getLogger(__name__)
+
+
+class InternalErrorMiddleware:
+    """
+    Turns unhandled exceptions into a ``BaseResponse`` with status 500.
+    Unlike an ``Exception`` handler, which Starlette runs in the outermost middleware,
+    it is added inside the CORS middlewares, so error responses carry the CORS headers too.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking_start(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking_start)
+        except Exception as e:
+            if response_started:
+                raise
+            logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+            error_response = BaseResponse(status=500, message=str(e))
+            response = JSONResponse(content=error_response.model_dump())
+            await response(scope, receive, send)
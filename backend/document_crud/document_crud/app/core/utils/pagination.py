@@ -0,0 +1,24 @@
+import base64
+import datetime
+
+
+def encode_cursor(was_created: datetime.datetime, pk: int) -> str:
+    """
+    Encode the sort key of the last item of a page into an opaque cursor.
+    """
+    return base64.urlsafe_b64encode(f"{was_created.isoformat()}|{pk}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.datetime, int]:
+    """
+    Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+    ValueError: If the cursor is malformed.
+    """
+    try:
+        raw: str = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        was_created, pk = raw.rsplit("|", 1)
+        return datetime.datetime.fromisoformat(was_created), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,259 @@
+"""
+Streaming ingest of uploaded documents.
+
+Uploads are read chunk by chunk, decoded with an incremental UTF-8 decoder and, for RTF
+files, converted to plain text by a streaming parser. Neither the raw upload nor its
+decoded form are ever held in full next to the extracted text.
+"""
+import codecs
+
+from collections.abc import AsyncIterator
+from typing import Final, Optional
+
+from fastapi import UploadFile
+
+
+# groups holding metadata, tables or embedded objects instead of document text
+RTF_SKIPPED_DESTINATIONS: Final[frozenset[str]] = frozenset({
+    "author", "buptim", "colortbl", "comment", "creatim", "datastore", "doccomm", "falt",
+    "filetbl", "fldinst", "fonttbl", "footer", "footerf", "footerl", "footerr", "footnote",
+    "ftncn", "ftnsep", "ftnsepc", "generator", "header", "headerf", "headerl", "headerr",
+    "info", "keywords", "listoverridetable", "listtable", "nonshppict", "object", "operator",
+    "pict", "printim", "private", "revtim", "revtbl", "rsidtbl", "stylesheet", "subject",
+    "themedata", "title", "xmlnstbl",
+})
+RTF_CONTROL_WORDS: Final[dict[str, str]] = {
+    "par": "\n",
+    "line": "\n",
+    "sect": "\n",
+    "page": "\n",
+    "row": "\n",
+    "cell": "\t",
+    "tab": "\t",
+    "emdash": "—",
+    "endash": "–",
+    "bullet": "•",
+    "lquote": "‘",
+    "rquote": "’",
+    "ldblquote": "“",
+    "rdblquote": "”",
+}
+RTF_CONTROL_SYMBOLS: Final[dict[str, str]] = {
+    "\\": "\\",
+    "{": "{",
+    "}": "}",
+    "~": "\u00a0",
+    "_": "\u2011",
+    "-": "",
+    "\n": "\n",
+    "\r": "\n",
+}
+
+
+class UploadTooLargeError(ValueError):
+    """
+    Raised when an upload exceeds the maximum size.
+    """
+
+
+class RtfTextExtractor:
+    """
+    Extracts the text of an RTF document fed in chunks of any size.
+    Control words split across chunks are handled, so memory does not depend on the document size.
+    """
+
+    def __init__(self) -> None:
+        self._state: str = "text"
+        self._word: str = ""
+        self._param: str = ""
+        self._hex: str = ""
+        self._binary: int = 0
+        self._skip: bool = False
+        self._unicode_skip: int = 1
+        self._fallback: int = 0
+        self._groups: list[tuple[bool, int]] = []
+        self._group_start: bool = False
+        self._high_surrogate: Optional[int] = None
+        self._codepage: str = "cp1252"
+        self._out: list[str] = []
+
+    def feed(self, chunk: str) -> str:
+        """
+        Parse the next chunk of the document.
+
+        Parameters:
+        chunk (str): The next characters of the document.
+
+        Returns:
+        str: The text extracted so far and not yet returned.
+        """
+        for char in chunk:
+            self._feed_char(char)
+        text = "".join(self._out)
+        self._out.clear()
+        return text
+
+    def close(self) -> str:
+        """
+        Finish parsing the document.
+
+        Returns:
+        str: The remaining text.
+        """
+        if self._state in ("word", "param"):
+            self._end_control_word()
+        self._state = "text"
+        text = "".join(self._out)
+        self._out.clear()
+        return text
+
+    def _feed_char(self, char: str) -> None:
+        state = self._state
+        if state == "binary":
+            self._binary -= 1
+            if self._binary <= 0:
+                self._state = "text"
+        elif state == "text":
+            if char == "\\":
+                self._state = "escape"
+            elif char == "{":
+                self._groups.append((self._skip, self._unicode_skip))
+                self._group_start = True
+            elif char == "}":
+                if self._groups:
+                    self._skip, self._unicode_skip = self._groups.pop()
+                self._group_start = False
+            elif char not in "\r\n":
+                self._group_start = False
+                self._emit(char)
+        elif state == "escape":
+            self._state = "text"
+            if char.isascii() and char.isalpha():
+                self._word = char
+                self._param = ""
+                self._state = "word"
+            elif char == "'":
+                self._hex = ""
+                self._state = "hex"
+            elif char == "*":
+                # ignorable destination, unknown to this parser
+                self._skip = True
+            elif char in RTF_CONTROL_SYMBOLS:
+                self._group_start = False
+                self._emit(RTF_CONTROL_SYMBOLS[char])
+        elif state == "word":
+            if char.isascii() and char.isalpha():
+                self._word += char
+            elif char.isdigit() or char == "-":
+                self._param = char
+                self._state = "param"
+            else:
+                self._end_control_word(char)
+        elif state == "param":
+            if char.isdigit():
+                self._param += char
+            else:
+                self._end_control_word(char)
+        elif state == "hex":
+            self._hex += char
+            if len(self._hex) == 2:
+                self._state = "text"
+                try:
+                    self._emit(bytes([int(self._hex, 16)]).decode(self._codepage, errors="replace"))
+                except ValueError:
+                    pass
+
+    def _end_control_word(self, delimiter: str = " ") -> None:
+        self._state = "text"
+        word = self._word
+        param: Optional[int] = int(self._param) if self._param not in ("", "-") else None
+        group_start, self._group_start = self._group_start, False
+        if group_start and word in RTF_SKIPPED_DESTINATIONS:
+            self._skip = True
+        elif word == "u" and param is not None:
+            self._emit_unicode(param + 65536 if param < 0 else param)
+            self._fallback = self._unicode_skip
+        elif word == "uc" and param is not None:
+            self._unicode_skip = param
+        elif word == "ansicpg" and param is not None:
+            self._codepage = f"cp{param}"
+        elif word == "bin" and param:
+            # the delimiter is not part of the binary data
+            self._binary = param
+            self._state = "binary"
+            return
+        elif word in RTF_CONTROL_WORDS:
+            self._emit(RTF_CONTROL_WORDS[word])
+        # a space ends the control word, anything else is part of the document
+        if delimiter != " ":
+            self._feed_char(delimiter)
+
+    def _emit(self, text: str) -> None:
+        if self._fallback:
+            # characters replacing the preceding \u character in readers without unicode support
+            self._fallback -= 1
+            return
+        if not self._skip:
+            self._out.append(text)
+
+    def _emit_unicode(self, code: int) -> None:
+        if 0xD800 <= code < 0xDC00:
+            self._high_surrogate = code
+            return
+        if 0xDC00 <= code < 0xE000:
+            if self._high_surrogate is None:
+                return
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        if not self._skip:
+            self._out.append(chr(code))
+
+
+async def iter_upload_text(file: UploadFile, max_size: int, chunk_size: int = 64 * 1024) -> AsyncIterator[str]:
+    """
+    Read an uploaded file as UTF-8 text, chunk by chunk.
+
+    Parameters:
+    file (UploadFile): The uploaded file.
+    max_size (int): The maximum size of the file, in bytes.
+    chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+    AsyncIterator[str]: The decoded chunks.
+
+    Raises:
+    UploadTooLargeError: As soon as more than ``max_size`` bytes are read.
+    UnicodeDecodeError: If the file is not valid UTF-8.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    size: int = 0
+    while chunk := await file.read(chunk_size):
+        size += len(chunk)
+        if size > max_size:
+            raise UploadTooLargeError(f"Files larger than {max_size} bytes are not supported.")
+        if text := decoder.decode(chunk):
+            yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+async def read_upload_text(file: UploadFile, rtf: bool, max_size: int, chunk_size: int = 64 * 1024) -> str:
+    """
+    Read the text of an uploaded plain text or RTF file.
+
+    Parameters:
+    file (UploadFile): The uploaded file.
+    rtf (bool): Whether the file is an RTF document, whose text is extracted.
+    max_size (int): The maximum size of the file, in bytes.
+    chunk_size (int): The number of bytes read at a time.
+
+    Returns:
+    str: The text of the document.
+    """
+    parts: list[str] = []
+    extractor: Optional[RtfTextExtractor] = RtfTextExtractor() if rtf else None
+    async for text in iter_upload_text(file, max_size, chunk_size):
+        parts.append(extractor.feed(text) if extractor else text)
+    if extractor:
+        parts.append(extractor.close())
+    return "".join(parts)
@@ -1,5 +1,9 @@
+from typing import Optional
+from pydantic import ValidationError as PydanticValidationError
+
 from app.api.routes.v1.schemas.response.validation import DocumentValidationResponse
-from app.core.dao import Validation
+from app.api.routes.v1.schemas.response.validation_error import ValidationError, ValidationErrorResponse
+from app.core.dao import Error, Validation
 
 
 def get_validation_schema(validation: Validation) -> DocumentValidationResponse:
@@ -7,4 +11,15 @@ def get_validation_schema(validation: Validation) -> DocumentValidationResponse:
         id=validation.id,
         validated=validation.validated,
         is_valid=validation.is_valid,
+        status=validation.status,
+        progress=validation.progress,
     )
+
+
+def get_validation_error_schema(error: Error) -> ValidationErrorResponse:
+    # the error column holds the ValidationError fields as JSON, written by the validation workers
+    try:
+        details: Optional[ValidationError] = ValidationError.model_validate_json(error.error)
+    except PydanticValidationError:
+        details = None
+    return ValidationErrorResponse(id=error.id, is_resolved=error.resolved, error=details)
@@ -0,0 +1,439 @@
+"""
+Background workers running the validations queued by ``POST /validation/{pk}/start``.
+
+The queue is the ``validation_jobs`` table: workers claim the oldest queued job with
+``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of worker processes, on any
+number of nodes, can pull from it. Each worker loads its own fact checker once.
+
+Validations are incremental: documents are checked paragraph by paragraph, with the
+preceding paragraphs as coreference context. The hashes of the sections checked last,
+context included, are kept in ``document_sections``, and only sections whose hash changed
+are checked again, so the result is the same as checking the whole document.
+The errors of the other sections are carried forward, shifted to their new offsets.
+
+Usage:
+    FACT_CHECKER_FACTORY="my_package.checkers:build" python -m app.jobs.validation_worker --processes 4
+"""
+import argparse
+import asyncio
+import contextlib
+import hashlib
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import re
+import socket
+
+from collections.abc import AsyncIterator
+from datetime import timedelta
+from typing import Any, Optional
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.core.dao import (
+    DocumentDAO,
+    DocumentSectionDAO,
+    ErrorDAO,
+    ValidationDAO,
+    ValidationJobDAO,
+    Document,
+    DocumentSection,
+    Error,
+    Validation,
+    ValidationJob,
+)
+from app.core.db.connection import SessionLocal
+from app.core.events import publish_validation_event
+
+logger = logging.getLogger(__name__)
+
+FACT_CHECKER_FACTORY_ENV: str = "FACT_CHECKER_FACTORY"
+SECTION_SEPARATOR = re.compile(r"\n\s*\n")
+# joins the context sections like ``CorefResolver.resolve_document`` joins the paragraphs of a window
+CONTEXT_SEPARATOR = "\n\n"
+
+
+def load_fact_checker(path: str) -> Any:
+    """
+    Build the fact checker from a ``module:callable`` path, e.g. a function returning
+    a warmed-up ``FactCheckerPipeline``.
+
+    Parameters:
+    path (str): The import path of the factory.
+
+    Returns:
+    Any: An object with an ``evaluate_text(text, *, context)`` method.
+    """
+    module_name, _, factory_name = path.partition(":")
+    if not module_name or not factory_name:
+        raise ValueError(f"Fact checker factory must be given as 'module:callable', got '{path}'")
+    return getattr(importlib.import_module(module_name), factory_name)()
+
+
+def split_sections(content: str) -> list[tuple[int, str]]:
+    """
+    Split a document into the sections checked one by one: its paragraphs, separated by blank lines.
+
+    Parameters:
+    content (str): The content of the document.
+
+    Returns:
+    list[tuple[int, str]]: The character offset and the text of every non-empty section.
+    """
+    sections: list[tuple[int, str]] = []
+    start: int = 0
+    for separator in SECTION_SEPARATOR.finditer(content):
+        if content[start:separator.start()].strip():
+            sections.append((start, content[start:separator.start()]))
+        start = separator.end()
+    if content[start:].strip():
+        sections.append((start, content[start:]))
+    return sections
+
+
+def section_context(sections: list[tuple[int, str]], index: int, context_sections: int) -> str:
+    """
+    Build the coreference context of a section from the sections preceding it.
+
+    Parameters:
+    sections (list[tuple[int, str]]): The sections returned by ``split_sections``.
+    index (int): The index of the section.
+    context_sections (int): The number of preceding sections in the context.
+
+    Returns:
+    str: The text of the preceding sections, empty for the first section.
+    """
+    return CONTEXT_SEPARATOR.join(text for _, text in sections[max(0, index - context_sections):index])
+
+
+def hash_section(text: str, context: str = "") -> str:
+    """
+    Hash a section with its context, to find the sections that changed since the last validation.
+    A section whose context changed is checked again, since its coreferences may resolve differently.
+
+    Parameters:
+    text (str): The text of the section.
+    context (str): The context the section is checked with.
+
+    Returns:
+    str: The hex digest of the section and its context.
+    """
+    return hashlib.sha256(f"{context}\0{text}".encode()).hexdigest()
+
+
+def carried_errors(
+    previous_sections: list[DocumentSection], previous_errors: list[Error]
+) -> dict[str, list[tuple[dict[str, Any], bool]]]:
+    """
+    Group the errors of the last validation by the hash of the section they were found in,
+    with their offsets made relative to the section.
+
+    Parameters:
+    previous_sections (list[DocumentSection]): The sections checked by the last validation.
+    previous_errors (list[Error]): The errors found by the last validation.
+
+    Returns:
+    dict[str, list[tuple[dict[str, Any], bool]]]: The errors and whether they are resolved, by section hash.
+    Sections with the same text and context share the errors of the first of them.
+    """
+    by_hash: dict[str, list[tuple[dict[str, Any], bool]]] = {}
+    for section in previous_sections:
+        if section.hash in by_hash:
+            continue
+        section_errors: list[tuple[dict[str, Any], bool]] = []
+        for error in previous_errors:
+            fields: dict[str, Any] = json.loads(error.error)
+            if section.offset <= fields["loc_index_ch_start"] < section.offset + section.length:
+                fields["loc_index_ch_start"] -= section.offset
+                fields["loc_index_ch_end"] -= section.offset
+                section_errors.append((fields, error.resolved))
+        by_hash[section.hash] = section_errors
+    return by_hash
+
+
+def suggestion_to_error(suggestion: Any, offset: int) -> dict[str, Any]:
+    """
+    Convert a suggestion of the fact checker into the fields of ``ValidationError``.
+
+    Parameters:
+    suggestion (SuggestionResponse): A suggestion returned by the fact checker.
+    offset (int): The character offset of the checked section in the document.
+
+    Returns:
+    dict[str, Any]: The error, serialized with ``json.dumps`` into the ``error`` column of an ``Error`` row.
+    """
+    position = suggestion.position
+    return {
+        "suggestion": "",
+        "explanation": suggestion.explanation,
+        "wrong_fragment": str(suggestion.fact),
+        "loc_index_ch_start": offset + position.start_char_index,
+        "loc_index_ch_end": offset + position.end_char_index,
+    }
+
+
+class ValidationWorker:
+    """
+    Pulls validation jobs from the queue and runs the fact checker on the changed sections
+    of their documents. Progress is written to the validation after every section, and
+    heartbeats are sent on the job while a section is checked. Jobs of a worker that stops
+    sending heartbeats are queued again.
+    Database errors outside of a job, e.g. while the database restarts, are logged and
+    retried with an exponential backoff instead of stopping the worker.
+    """
+
+    def __init__(
+        self,
+        fact_checker: Any,
+        *,
+        name: Optional[str] = None,
+        poll_interval: float = 1.0,
+        max_attempts: int = 3,
+        stale_timeout: timedelta = timedelta(minutes=10),
+        max_backoff: float = 60.0,
+        context_sections: int = 1,
+    ) -> None:
+        """
+        Parameters:
+        fact_checker (Any): An object with an ``evaluate_text(text, *, context)`` method.
+        name (Optional[str]): The name recorded on claimed jobs. Defaults to ``host:pid``.
+        poll_interval (float): Seconds to wait before polling an empty queue again.
+        max_attempts (int): Number of runs after which a failing job is marked as failed.
+        stale_timeout (timedelta): Time without a heartbeat after which a running job is queued again.
+            Heartbeats are sent every third of it, and stale jobs are looked for every half of it.
+        max_backoff (float): Maximum number of seconds to wait before retrying after a database error.
+        context_sections (int): Number of preceding sections given to the fact checker as context.
+        """
+        self.fact_checker = fact_checker
+        self.name: str = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval: float = poll_interval
+        self.max_attempts: int = max_attempts
+        self.stale_timeout: timedelta = stale_timeout
+        self.max_backoff: float = max_backoff
+        self.context_sections: int = context_sections
+        self._stopping: bool = False
+        self._next_recovery: float = 0.0
+
+    async def run(self) -> None:
+        """
+        Process jobs until ``stop`` is called.
+        """
+        loop = asyncio.get_running_loop()
+        failures: int = 0
+        while not self._stopping:
+            try:
+                # every worker polls, the stale jobs only need to be looked for once in a while
+                if loop.time() >= self._next_recovery:
+                    await self.recover_stale_jobs()
+                    self._next_recovery = loop.time() + self.stale_timeout.total_seconds() / 2
+                processed: bool = await self.run_once()
+            except (SQLAlchemyError, OSError):
+                failures += 1
+                delay: float = min(self.poll_interval * 2 ** (failures - 1), self.max_backoff)
+                logger.exception("Database error in validation worker, retrying in %.1f s", delay)
+                await asyncio.sleep(delay)
+                continue
+            failures = 0
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def recover_stale_jobs(self) -> None:
+        """
+        Queue again the jobs of workers that stopped sending heartbeats, or mark them
+        as failed once they ran ``max_attempts`` times, so a job crashing its worker
+        is not retried forever.
+        """
+        async with SessionLocal() as sess:
+            failed: list[int] = await ValidationJobDAO.fail_stale(self.stale_timeout, self.max_attempts, sess)
+            for validation_id in failed:
+                await ValidationDAO.set_progress(validation_id, 0.0, sess, status="failed")
+                await publish_validation_event(validation_id, "status", {"status": "failed", "progress": 0.0}, sess)
+            requeued: int = await ValidationJobDAO.requeue_stale(self.stale_timeout, self.max_attempts, sess)
+            await sess.commit()
+        if failed:
+            logger.warning("Marked %d abandoned validation jobs as failed", len(failed))
+        if requeued:
+            logger.warning("Queued %d abandoned validation jobs again", requeued)
+
+    def stop(self) -> None:
+        """
+        Stop after the current job.
+        """
+        self._stopping = True
+
+    async def run_once(self) -> bool:
+        """
+        Claim and process a single job.
+
+        Returns:
+        bool: True if a job was processed, False if the queue is empty.
+        """
+        async with SessionLocal() as sess:
+            job: Optional[ValidationJob] = await ValidationJobDAO.claim(self.name, sess)
+            if job is None:
+                return False
+            job_id, validation_id = job.id, job.validation_id
+            await sess.commit()
+
+        try:
+            await self._process(job_id, validation_id)
+        except Exception as e:
+            logger.exception("Validation job %d failed", job_id)
+            async with SessionLocal() as sess:
+                requeued: bool = await ValidationJobDAO.fail(job_id, repr(e), self.max_attempts, sess)
+                status: str = "queued" if requeued else "failed"
+                await ValidationDAO.set_progress(validation_id, 0.0, sess, status=status)
+                await publish_validation_event(validation_id, "status", {"status": status, "progress": 0.0}, sess)
+                await sess.commit()
+        return True
+
+    async def _process(self, job_id: int, validation_id: int) -> None:
+        async with SessionLocal() as sess:
+            validation: Validation = await ValidationDAO.get_scalar(validation_id, sess)
+            document_id: int = validation.document_id
+            document: Document = await DocumentDAO.get_scalar(document_id, sess)
+            content: str = document.content
+            previous_sections: list[DocumentSection] = list(
+                await DocumentSectionDAO.get_where_document_id(document_id, sess)
+            )
+            previous_errors: list[Error] = (
+                list(await ErrorDAO.get_where_validation_id(previous_sections[0].validation_id, sess))
+                if previous_sections else []
+            )
+            await ValidationDAO.set_progress(validation_id, 0.0, sess, status="running")
+            await publish_validation_event(validation_id, "status", {"status": "running", "progress": 0.0}, sess)
+            await sess.commit()
+
+        known: dict[str, list[tuple[dict[str, Any], bool]]] = carried_errors(previous_sections, previous_errors)
+        sections: list[tuple[int, str]] = split_sections(content)
+        checked_sections: list[tuple[int, int, str]] = []
+        errors: list[tuple[dict[str, Any], bool]] = []
+        rechecked: int = 0
+        for i, (offset, text) in enumerate(sections, start=1):
+            context: str = section_context(sections, i - 1, self.context_sections)
+            section_hash: str = hash_section(text, context)
+            checked_sections.append((offset, len(text), section_hash))
+            if section_hash in known:
+                section_errors = [
+                    (
+                        {
+                            **fields,
+                            "loc_index_ch_start": offset + fields["loc_index_ch_start"],
+                            "loc_index_ch_end": offset + fields["loc_index_ch_end"],
+                        },
+                        resolved,
+                    )
+                    for fields, resolved in known[section_hash]
+                ]
+            else:
+                async with self._heartbeats(job_id):
+                    suggestions = await asyncio.to_thread(self.fact_checker.evaluate_text, text, context=context)
+                section_errors = [(suggestion_to_error(s, offset), False) for s in suggestions if not s.is_correct]
+                rechecked += 1
+            errors.extend(section_errors)
+            progress: float = i / len(sections)
+            async with SessionLocal() as sess:
+                await ValidationDAO.set_progress(validation_id, progress, sess)
+                await ValidationJobDAO.heartbeat(job_id, sess)
+                for error, _ in section_errors:
+                    await publish_validation_event(validation_id, "error", error, sess)
+                await publish_validation_event(
+                    validation_id, "progress", {"progress": progress, "sections": len(sections), "checked": i}, sess
+                )
+                await sess.commit()
+
+        async with SessionLocal() as sess:
+            # replaced in the same transaction as the sections, so a failed run keeps the previous state
+            await ErrorDAO.delete_where_validation_id(validation_id, sess)
+            await ErrorDAO.create_for_validation(
+                validation_id,
+                [json.dumps(error, ensure_ascii=False) for error, _ in errors],
+                sess,
+                resolved=[resolved for _, resolved in errors],
+            )
+            await DocumentSectionDAO.replace_for_document(document_id, validation_id, checked_sections, sess)
+            validation = await ValidationDAO.get_scalar(validation_id, sess)
+            validation.validated = True
+            validation.is_valid = all(resolved for _, resolved in errors)
+            validation.status = "done"
+            validation.progress = 1.0
+            await ValidationJobDAO.finish(job_id, sess)
+            await publish_validation_event(
+                validation_id,
+                "status",
+                {"status": "done", "progress": 1.0, "is_valid": validation.is_valid, "errors": len(errors)},
+                sess,
+            )
+            await sess.commit()
+        logger.info(
+            "Validation %d done with %d errors, %d of %d sections checked",
+            validation_id, len(errors), rechecked, len(sections),
+        )
+
+    @contextlib.asynccontextmanager
+    async def _heartbeats(self, job_id: int) -> AsyncIterator[None]:
+        # a section can take longer to check than the stale timeout
+        task: asyncio.Task = asyncio.create_task(self._send_heartbeats(job_id))
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _send_heartbeats(self, job_id: int) -> None:
+        interval: float = self.stale_timeout.total_seconds() / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with SessionLocal() as sess:
+                    await ValidationJobDAO.heartbeat(job_id, sess)
+                    await sess.commit()
+            except (SQLAlchemyError, OSError):
+                logger.exception("Heartbeat of validation job %d failed", job_id)
+
+
+def run_worker(factory_path: str, poll_interval: float, max_attempts: int, context_sections: int = 1) -> None:
+    """
+    Entry point of a worker process.
+    """
+    logging.basicConfig(level=logging.INFO)
+    worker = ValidationWorker(
+        load_fact_checker(factory_path),
+        poll_interval=poll_interval,
+        max_attempts=max_attempts,
+        context_sections=context_sections,
+    )
+    try:
+        asyncio.run(worker.run())
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run validation workers.")
+    parser.add_argument("--processes", type=int, default=1, help="Number of worker processes.")
+    parser.add_argument("--factory", default=os.getenv(FACT_CHECKER_FACTORY_ENV), help="module:callable building the fact checker.")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--context-sections", type=int, default=1, help="Preceding sections used as context.")
+    args = parser.parse_args(argv)
+    if not args.factory:
+        parser.error(f"--factory or {FACT_CHECKER_FACTORY_ENV} must be set")
+
+    worker_args = (args.factory, args.poll_interval, args.max_attempts, args.context_sections)
+    if args.processes == 1:
+        run_worker(*worker_args)
+        return
+    context = multiprocessing.get_context("spawn")
+    processes = [context.Process(target=run_worker, args=worker_args) for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Benchmark of the middleware stack overhead.
+
+Serves a trivial GET endpoint, which only touches the request session, through the
+middleware stack of the API, once with the former ``BaseHTTPMiddleware`` implementations
+and once with the pure ASGI ones, and reports requests per second. The session middlewares
+only exist here: the API itself takes its sessions as route dependencies. Requests go through
+``httpx.ASGITransport``, so no server nor network is involved, and the session factory
+uses a throwaway SQLite database, so no Postgres is needed.
+
+Usage:
+    python -m benchmarks.middleware
+    python -m benchmarks.middleware --requests 20000 --concurrency 64
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault(
+    "SQLALCHEMY_DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'middleware_benchmark.db')}"
+)
+
+import httpx
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config.api import origins, methods, headers, allow_credentials, max_age
+from app.core.db.connection import SessionLocal, AsyncSession
+from app.core.middlewares import DynamicCORSMiddleware
+from app.core.middlewares.dynamic_cors import origins_cfg
+from app.core.pydantic import BaseResponse
+
+
+class LegacyDatabaseAsyncSessionManager(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        async with SessionLocal() as session:
+            request.state.sess = session
+            try:
+                response = await call_next(request)
+                await session.commit()
+            except Exception as e:
+                await session.rollback()
+                response = JSONResponse(content=BaseResponse(status=500, message=str(e)).model_dump())
+            return response
+
+
+class DatabaseAsyncSessionManager:
+    """
+    Opens a database session per request, available as ``request.state.sess``.
+    The session is committed right before the response starts, so the client only sees
+    committed changes, and rolled back if the request fails.
+    """
+
+    def __init__(self, app: ASGIApp, session_factory: async_sessionmaker[AsyncSession] = SessionLocal) -> None:
+        self.app = app
+        self.session_factory = session_factory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async with self.session_factory() as session:
+            scope.setdefault("state", {})["sess"] = session
+            response_started = False
+
+            async def send_after_commit(message: Message) -> None:
+                nonlocal response_started
+                if message["type"] == "http.response.start":
+                    await session.commit()
+                    response_started = True
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_after_commit)
+            except Exception as e:
+                await session.rollback()
+                if response_started:
+                    raise
+                error_response = BaseResponse(status=500, message=str(e))
+                response = JSONResponse(content=error_response.model_dump())
+                await response(scope, receive, send)
+
+
+class LegacyDynamicCORSMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        response = await call_next(request)
+        if request.method != "OPTIONS":
+            origin = request.headers.get("origin")
+            if origin in origins_cfg:
+                response.headers["Access-Control-Allow-Origin"] = origin
+        return response
+
+
+def build_app(session_middleware: type, cors_middleware: type) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping(request: Request) -> dict:
+        return {"session": request.state.sess is not None}
+
+    app.add_middleware(session_middleware)
+    app.add_middleware(cors_middleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_methods=methods,
+        allow_headers=headers,
+        allow_credentials=allow_credentials,
+        max_age=max_age,
+    )
+    return app
+
+
+async def measure(app: FastAPI, n_requests: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        # warm up routing, validation and the connection pool
+        for _ in range(100):
+            (await client.get("/ping")).raise_for_status()
+
+        remaining = n_requests
+
+        async def worker() -> None:
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                (await client.get("/ping", headers={"origin": "http://localhost"})).raise_for_status()
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return n_requests / (time.perf_counter() - start)
+
+
+async def run(n_requests: int, concurrency: int, repeat: int) -> None:
+    stacks = {
+        "BaseHTTPMiddleware": build_app(LegacyDatabaseAsyncSessionManager, LegacyDynamicCORSMiddleware),
+        "pure ASGI": build_app(DatabaseAsyncSessionManager, DynamicCORSMiddleware),
+    }
+    print(f"{'stack':<20}{'req/s':>10}")
+    for name, app in stacks.items():
+        best = max([await measure(app, n_requests, concurrency) for _ in range(repeat)])
+        print(f"{name:<20}{best:>10.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stack, the best is reported.")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
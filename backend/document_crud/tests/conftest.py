@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+# the application is imported as ``app``, from the directory of main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "document_crud"))
+os.environ.setdefault(
+    "SQLALCHEMY_DATABASE_URL", f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'document_crud_tests.db')}"
+)
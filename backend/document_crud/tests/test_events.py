@@ -0,0 +1,82 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.core.events import ValidationEventBroker, publish_validation_event, stream_validation_events
+
+
+def _snapshot(status):
+    async def load_snapshot():
+        return {"id": 1, "status": status, "progress": 0.0}
+
+    return load_snapshot
+
+
+async def _collect(stream):
+    return [message async for message in stream]
+
+
+def test_stream_subscribes_only_once_iterated():
+    broker = ValidationEventBroker()
+    stream = stream_validation_events(broker, 1, _snapshot("running"))
+    assert not broker._subscribers
+
+    async def first_message():
+        message = await stream.__anext__()
+        subscribed = bool(broker._subscribers)
+        await stream.aclose()
+        return message, subscribed
+
+    message, subscribed = asyncio.run(first_message())
+    assert message.startswith("event: status\n")
+    assert subscribed
+    assert not broker._subscribers
+
+
+def test_stream_ends_after_the_snapshot_of_inactive_validations():
+    for status in ("created", "done", "failed"):
+        broker = ValidationEventBroker()
+        messages = asyncio.run(_collect(stream_validation_events(broker, 1, _snapshot(status))))
+        assert len(messages) == 1
+        assert not broker._subscribers
+
+
+def test_stream_ends_with_the_final_status():
+    broker = ValidationEventBroker()
+
+    async def follow():
+        stream = stream_validation_events(broker, 1, _snapshot("queued"), keepalive=0.01)
+        messages = [await stream.__anext__()]
+        broker.dispatch(1, "progress", {"progress": 0.5})
+        broker.dispatch(2, "progress", {"progress": 0.1})
+        broker.dispatch(1, "status", {"status": "done", "progress": 1.0})
+        messages.extend([message async for message in stream])
+        return messages
+
+    messages = asyncio.run(follow())
+    assert [message.split("\n")[0] for message in messages] == ["event: status", "event: progress", "event: status"]
+    assert '"progress": 0.5' in messages[1]
+    assert not broker._subscribers
+
+
+def test_stream_of_a_deleted_validation_is_empty():
+    broker = ValidationEventBroker()
+
+    async def load_snapshot():
+        return None
+
+    assert asyncio.run(_collect(stream_validation_events(broker, 1, load_snapshot))) == []
+    assert not broker._subscribers
+
+
+def test_publish_is_a_no_op_without_postgres(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'events.db'}")
+
+    async def publish():
+        async with AsyncSession(engine) as sess:
+            await publish_validation_event(1, "progress", {"progress": 0.5}, sess)
+            # no statement was run, so no transaction was started
+            return sess.in_transaction()
+
+    assert asyncio.run(publish()) is False
+    asyncio.run(engine.dispose())
@@ -0,0 +1,94 @@
+import json
+
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("database")
+
+from app.jobs.validation_worker import carried_errors, hash_section, section_context, split_sections
+
+
+def _hashes(content, context_sections=1):
+    sections = split_sections(content)
+    return [hash_section(text, section_context(sections, i, context_sections)) for i, (_, text) in enumerate(sections)]
+
+
+def _sections(content):
+    return [
+        SimpleNamespace(offset=offset, length=len(text), hash=section_hash)
+        for (offset, text), section_hash in zip(split_sections(content), _hashes(content))
+    ]
+
+
+def _error(start, end, fragment, resolved=False):
+    return SimpleNamespace(
+        error=json.dumps({"wrong_fragment": fragment, "loc_index_ch_start": start, "loc_index_ch_end": end}),
+        resolved=resolved,
+    )
+
+
+def test_sections_are_paragraphs():
+    content = "Lenin returned.\nHe spoke.\n\nCrowds cheered."
+    sections = split_sections(content)
+    # a line break does not separate the pronoun from its antecedent
+    assert [text for _, text in sections] == ["Lenin returned.\nHe spoke.", "Crowds cheered."]
+    assert all(content[offset:offset + len(text)] == text for offset, text in sections)
+
+
+def test_blank_sections_are_skipped():
+    assert split_sections("") == []
+    assert split_sections("\n \n\n") == []
+    assert split_sections("\n\nTsar.\n  \n\nDuma.") == [(2, "Tsar."), (12, "Duma.")]
+
+
+def test_sections_are_checked_with_the_preceding_ones():
+    sections = split_sections("Lenin returned.\n\nHe spoke.\n\nCrowds cheered.")
+    assert section_context(sections, 0, 1) == ""
+    assert section_context(sections, 2, 1) == "He spoke."
+    # joined like the paragraphs of a ``CorefResolver.resolve_document`` window
+    assert section_context(sections, 2, 2) == "Lenin returned.\n\nHe spoke."
+    assert section_context(sections, 2, 0) == ""
+
+
+def test_sections_are_checked_again_when_their_context_changes():
+    previous = _hashes("Lenin returned.\n\nHe spoke.\n\nCrowds cheered.")
+    current = _hashes("Trotsky returned.\n\nHe spoke.\n\nCrowds cheered.")
+    assert previous[0] != current[0]
+    assert previous[1] != current[1]
+    # beyond the context, nothing changed
+    assert previous[2] == current[2]
+
+
+def test_errors_are_made_relative_to_their_section():
+    content = "Lenin returned.\n\nHe spoke in 1905."
+    errors = [_error(12, 16, "1905"), _error(29, 33, "1905", resolved=True)]
+    by_hash = carried_errors(_sections(content), errors)
+
+    first, second = _hashes(content)
+    assert by_hash[first] == [({"wrong_fragment": "1905", "loc_index_ch_start": 12, "loc_index_ch_end": 16}, False)]
+    assert by_hash[second] == [({"wrong_fragment": "1905", "loc_index_ch_start": 12, "loc_index_ch_end": 16}, True)]
+
+
+def test_errors_follow_their_section_when_it_moves():
+    previous = "Crowds cheered.\n\nHe spoke in 1905."
+    current = "A new opening section.\n\nCrowds cheered.\n\nHe spoke in 1905."
+    by_hash = carried_errors(_sections(previous), [_error(29, 33, "1905")])
+
+    offset, _ = split_sections(current)[2]
+    fields, _ = by_hash[_hashes(current)[2]][0]
+    assert current[offset + fields["loc_index_ch_start"]:offset + fields["loc_index_ch_end"]] == "1905"
+
+
+def test_duplicate_sections_share_the_errors_of_the_first():
+    content = "Tsar.\n\nHe spoke in 1905.\n\nTsar.\n\nHe spoke in 1905."
+    errors = [_error(19, 23, "first"), _error(45, 49, "second")]
+    by_hash = carried_errors(_sections(content), errors)
+
+    hashes = _hashes(content)
+    assert hashes[1] == hashes[3]
+    assert [fields["wrong_fragment"] for fields, _ in by_hash[hashes[1]]] == ["first"]
+
+
+def test_sections_without_errors_carry_nothing():
+    assert carried_errors(_sections("Tsar.\n\nDuma."), []) == {section_hash: [] for section_hash in _hashes("Tsar.\n\nDuma.")}
@@ -0,0 +1,70 @@
+import asyncio
+import io
+
+import pytest
+
+from fastapi import UploadFile
+
+from app.core.utils.upload import RtfTextExtractor, UploadTooLargeError, read_upload_text
+
+DOCUMENT = (
+    r"{\rtf1\ansi\ansicpg1252\uc1"
+    r"{\fonttbl{\f0\froman Times New Roman;}}{\info{\title Secret}{\author Okhrana}}{\*\generator Word;}"
+    r"\f0 Lenin returned\emdash  in 1917.\par He said: \ldblquote Caf\'e9\rdblquote  and na\u239?ve \{quotes\}."
+    r"\line {\header Page 1}End\u-10179?\u-8704?}"
+)
+TEXT = "Lenin returned— in 1917.\nHe said: “Café” and naïve {quotes}.\nEnd\U0001F600"
+
+
+def _extract(*chunks):
+    extractor = RtfTextExtractor()
+    return "".join(extractor.feed(chunk) for chunk in chunks) + extractor.close()
+
+
+def test_text_is_extracted():
+    assert _extract(DOCUMENT) == TEXT
+
+
+def test_chunk_boundaries_do_not_matter():
+    for i in range(len(DOCUMENT) + 1):
+        assert _extract(DOCUMENT[:i], DOCUMENT[i:]) == TEXT, f"split at {i}"
+    assert _extract(*DOCUMENT) == TEXT
+
+
+def test_unicode_fallbacks_are_skipped():
+    assert _extract(r"{\rtf1 Caf\u233?!}") == "Café!"
+    # the fallback length is set by \uc and restored at the end of the group
+    assert _extract(r"{\rtf1 {\uc2 Caf\u233??}Caf\u233?!}") == "CaféCafé!"
+    assert _extract(r"{\rtf1\uc0 Caf\u233!}") == "Café!"
+    # a hex escape is a single fallback character
+    assert _extract(r"{\rtf1 Caf\u233\'e9!}") == "Café!"
+
+
+def test_hex_escapes_use_the_document_codepage():
+    assert _extract(r"{\rtf1 na\'efve}") == "naïve"
+    assert _extract(r"{\rtf1\ansicpg1251 \'c4\'f3\'ec\'e0}") == "Дума"
+
+
+def test_skipped_destinations_end_with_their_group():
+    assert _extract(r"{\rtf1{\fonttbl{\f0 Arial;}}{\*\unknown {nested} text}{\pict 0a1b}Tsar}") == "Tsar"
+    # only a destination opening its group is skipped
+    assert _extract(r"{\rtf1 Tsar \title Duma}") == "Tsar Duma"
+
+
+def test_binary_data_is_skipped():
+    assert _extract(r"{\rtf1 {\bin4 }{\\}Tsar}") == "Tsar"
+
+
+def _upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="document")
+
+
+def test_uploads_are_decoded_across_chunks():
+    text = "Дума " * 10
+    assert asyncio.run(read_upload_text(_upload(text.encode()), rtf=False, max_size=1024, chunk_size=3)) == text
+    assert asyncio.run(read_upload_text(_upload(DOCUMENT.encode()), rtf=True, max_size=1024, chunk_size=5)) == TEXT
+
+
+def test_uploads_larger_than_the_limit_are_rejected():
+    with pytest.raises(UploadTooLargeError):
+        asyncio.run(read_upload_text(_upload(b"x" * 11), rtf=False, max_size=10, chunk_size=4))